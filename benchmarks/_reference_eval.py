@@ -0,0 +1,88 @@
+# benchmarks/_reference_eval.py
+"""The pure-Python hand evaluator cogs/poker.py used before poker_eval.
+
+Kept only as the reference the benchmarks check ``poker_eval`` against:
+``best_7`` tries all 21 five-card subsets and returns the rank tuples
+``poker_eval.to_rank_tuple`` reproduces.
+"""
+from itertools import combinations
+
+RANK_ORDER = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '0': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14}
+
+
+def parse_card(code: str):
+    r, s = code[0], code[1]
+    return RANK_ORDER[r], s
+
+
+def _straight_high(uniq_desc):
+    for i in range(len(uniq_desc) - 4):
+        seq = uniq_desc[i:i + 5]
+        if seq[0] - seq[4] == 4:
+            return True, seq[0]
+    if set([14, 5, 4, 3, 2]).issubset(set(uniq_desc)):
+        return True, 5
+    return False, 0
+
+
+def hand_rank_5(cards):
+    ranks = sorted((c[0] for c in cards), reverse=True)
+    suits = [c[1] for c in cards]
+    counts = {r: ranks.count(r) for r in set(ranks)}
+    by_count = sorted(counts.items(), key=lambda x: (x[1], x[0]), reverse=True)
+
+    flush_suit = None
+    for s in "SHDC":
+        if suits.count(s) == 5:
+            flush_suit = s
+            break
+
+    uniq = sorted(set(ranks), reverse=True)
+    straight, sh = _straight_high(uniq)
+
+    if flush_suit:
+        rs = sorted([c[0] for c in cards if c[1] == flush_suit], reverse=True)
+        u = sorted(set(rs), reverse=True)
+        sf, sfh = _straight_high(u)
+        if sf:
+            return (8, sfh)
+
+    kinds = sorted(counts.values(), reverse=True)
+    if kinds == [4, 1]:
+        quad = by_count[0][0]
+        kicker = max([r for r in ranks if r != quad])
+        return (7, quad, kicker)
+    if kinds == [3, 2]:
+        trips = by_count[0][0]
+        pair = by_count[1][0]
+        return (6, trips, pair)
+    if flush_suit:
+        return (5, ranks)
+    if straight:
+        return (4, sh)
+    if kinds == [3, 1, 1]:
+        trips = by_count[0][0]
+        kick = [r for r in ranks if r != trips][:2]
+        return (3, trips, kick)
+    if kinds == [2, 2, 1]:
+        p1, p2 = sorted([r for r, c in by_count if c == 2], reverse=True)
+        k = max([r for r in ranks if r not in (p1, p2)])
+        return (2, p1, p2, k)
+    if kinds == [2, 1, 1, 1]:
+        p = by_count[0][0]
+        kick = [r for r in ranks if r != p][:3]
+        return (1, p, kick)
+    return (0, ranks)
+
+
+def best_7(cards7):
+    best = None
+    for comb in combinations(cards7, 5):
+        val = hand_rank_5(comb)
+        if not best or val > best:
+            best = val
+    return best
+
+
+def codes_to_tuples(codes):
+    return [parse_card(c) for c in codes]
@@ -0,0 +1,51 @@
+# benchmarks/bench_airports.py
+"""Load time, memory and lookup speed of the bundled airport index.
+
+The index loads lazily (first lookup, in a worker thread from the cog), so
+bot startup only pays for importing the module; this measures what the
+first lookup pays and what the index keeps resident.
+
+Run from the repo root:  python -m benchmarks.bench_airports
+"""
+import time
+import tracemalloc
+
+from functionality.airports import AirportIndex
+
+CODES = ["KJFK", "JFK", "EGLL", "LHR", "RJTT", "HND", "YSSY", "SYD", "XXXX"]
+QUERIES = ["london", "new york", "san fran", "heathrow", "sao paulo", "londn"]
+
+
+def per_call(fn, args, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for a in args:
+            fn(a)
+    return (time.perf_counter() - start) / (repeat * len(args))
+
+
+def main():
+    import cogs.flight
+    print(f"loaded by import   : {cogs.flight.airport_index.loaded}")
+
+    index = AirportIndex()
+    t = time.perf_counter()
+    index.load()
+    print(f"load               : {(time.perf_counter() - t) * 1e3:7.1f} ms ({len(index):,} airports, "
+          f"{len(index._keys):,} search words)")
+
+    tracemalloc.start()
+    fresh = AirportIndex()
+    fresh.load()
+    resident, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"memory             : {resident / 1e6:7.1f} MB resident, {peak / 1e6:.1f} MB peak while loading "
+          f"(index.nbytes() {fresh.nbytes() / 1e6:.1f} MB)")
+
+    print(f"code lookup        : {per_call(index.get, CODES, 2000) * 1e6:7.1f} us")
+    print(f"name search        : {per_call(index.search, QUERIES, 200) * 1e6:7.1f} us "
+          f"(typo fallback included)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+# benchmarks/bench_equity.py
+"""Wall time of equity() for each street (100k samples where sampled).
+
+Run from the repo root:  python -m benchmarks.bench_equity
+"""
+import time
+
+from functionality import poker_eval
+from functionality.poker_equity import equity
+
+SPOTS = [
+    ("pre-flop, 1 opp", ["AS", "AH"], [], 1),
+    ("pre-flop, 4 opp", ["AS", "KS"], [], 4),
+    ("flop, 1 opp", ["AS", "KS"], ["QS", "JS", "2D"], 1),
+    ("turn, 1 opp", ["AS", "KS"], ["QS", "JS", "2D", "3C"], 1),
+    ("river, 2 opp", ["7H", "7C"], ["AS", "AD", "KC", "KH", "3S"], 2),
+]
+
+
+def main():
+    poker_eval.warm()
+    for label, hole, board, opp in SPOTS:
+        t = time.perf_counter()
+        eq = equity(hole, board, opp, seed=1)
+        dt = time.perf_counter() - t
+        kind = "exact" if eq.exhaustive else "sampled"
+        print(f"{label:16} win {eq.win:6.1%} tie {eq.tie:5.1%}  {eq.trials:>7,} {kind:7}  {dt * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_flight_states.py
+"""Memory and lookup cost of a global OpenSky snapshot: list-of-lists vs columnar.
+
+Builds a synthetic ``states/all`` payload shaped like the real one (about 12k
+aircraft, the usual share of missing callsigns/altitudes, ~10% on the
+ground), round-trips it through JSON so every value is a separate object as
+it would be after ``resp.json()``, then compares:
+
+  * deep size of the parsed lists vs ``StateSnapshot.nbytes``
+  * a callsign lookup by linear scan vs the sorted index
+  * a 100 km radius query by haversine over every aircraft vs the grid index
+  * the cost of parsing into the structured array
+
+Run from the repo root:  python -m benchmarks.bench_flight_states
+"""
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+from functionality.flight_states import StateSnapshot, haversine_km
+
+AIRCRAFT = 12000
+COUNTRIES = ["United States", "China", "Germany", "United Kingdom", "France", "Canada", "Brazil",
+             "Japan", "India", "Australia", "Spain", "Turkey", "Ireland", "Mexico", "Russian Federation"]
+
+
+def synthetic_payload(n: int = AIRCRAFT, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    now = 1_735_000_000
+    states = []
+    for i in range(n):
+        on_ground = rng.random() < 0.1
+        callsign = None if rng.random() < 0.03 else f"{rng.choice(['AAL', 'UAL', 'DLH', 'BAW', 'CES', 'N'])}{rng.randint(1, 9999):<5}"
+        alt = None if on_ground else rng.uniform(300, 12500)
+        states.append([
+            f"{rng.randrange(1 << 24):06x}", callsign, rng.choice(COUNTRIES),
+            now - rng.randint(0, 15), now - rng.randint(0, 10),
+            round(rng.uniform(-180, 180), 4), round(rng.uniform(-60, 70), 4),
+            alt, on_ground, round(rng.uniform(0, 260), 2), round(rng.uniform(0, 360), 2),
+            None if on_ground else round(rng.uniform(-15, 15), 2), None,
+            None if alt is None or rng.random() < 0.05 else alt + rng.uniform(-60, 60),
+            None if rng.random() < 0.4 else f"{rng.randint(0, 7777):04d}", False, 0,
+        ])
+    return json.loads(json.dumps({"time": now, "states": states}))
+
+
+def deep_size(obj, seen=None) -> int:
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple)):
+        size += sum(deep_size(x, seen) for x in obj)
+    return size
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    payload = synthetic_payload()
+    states = payload["states"]
+    # None/True/False/small ints are shared singletons; count them once like the interpreter does
+    lists = deep_size(states, {id(None), id(True), id(False)})
+
+    parse = timed(lambda: StateSnapshot(payload), 5)
+    snapshot = StateSnapshot(payload)
+    print(f"{len(states):,} aircraft")
+    print(f"list of lists : {lists / 1e6:6.2f} MB ({lists / len(states):,.0f} B/aircraft)")
+    print(f"columnar      : {snapshot.nbytes / 1e6:6.2f} MB ({snapshot.nbytes / len(states):,.0f} B/aircraft, "
+          f"{snapshot.nbytes / lists:.1%} of the lists, indexes included)")
+    print(f"parse         : {parse * 1e3:6.1f} ms")
+
+    target = next(st[1] for st in states if st[1]).strip()
+    scan = timed(lambda: [st for st in states if (st[1] or "").strip().upper() == target], 50)
+    index = timed(lambda: snapshot.callsign(target), 2000)
+    print(f"lookup        : scan {scan * 1e6:,.0f} us, sorted index {index * 1e6:,.1f} us")
+
+    lat, lon, radius = 40.64, -73.78, 100.0
+    rows = snapshot.states
+
+    def brute():
+        dist = haversine_km(lat, lon, rows["lat"], rows["lon"])
+        keep = np.flatnonzero(dist <= radius)
+        return keep[np.argsort(dist[keep])]
+
+    assert len(brute()) == len(snapshot.nearby(lat, lon, radius)[0])
+    print(f"radius query  : all rows {timed(brute, 200) * 1e6:,.0f} us, "
+          f"grid {timed(lambda: snapshot.nearby(lat, lon, radius), 2000) * 1e6:,.0f} us")
+
+
+if __name__ == "__main__":
+    main()
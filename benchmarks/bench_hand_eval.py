@@ -0,0 +1,82 @@
+# benchmarks/bench_hand_eval.py
+"""7-card evaluation: the old best_7 (21 x hand_rank_5) vs the lookup-table evaluator.
+
+Also checks, on random hands, that the table evaluator reproduces exactly
+the value best_7 gives, so both orderings are identical.
+
+Run from the repo root:  python -m benchmarks.bench_hand_eval
+"""
+import random
+import time
+
+import numpy as np
+
+from benchmarks._reference_eval import best_7, codes_to_tuples
+from functionality import poker_eval
+
+CHECK_HANDS = 20_000
+SLOW_HANDS = 20_000
+BATCH_HANDS = 1_000_000
+
+CODES = [r + s for s in "SHDC" for r in poker_eval.RANK_CHARS]
+
+
+def _norm(v):
+    return tuple(tuple(x) if isinstance(x, list) else x for x in v)
+
+
+def check_ordering(rng: random.Random):
+    for n in (5, 6, 7):
+        for _ in range(CHECK_HANDS // 3):
+            hand = rng.sample(CODES, n)
+            fast = poker_eval.evaluate_codes(hand)
+            slow = best_7(codes_to_tuples(hand))
+            assert _norm(poker_eval.to_rank_tuple(fast)) == _norm(slow), (hand, fast, slow)
+
+    # pairwise ordering on shared boards, as in a showdown
+    for _ in range(CHECK_HANDS):
+        cards = rng.sample(CODES, 9)
+        a, b = cards[:2] + cards[4:], cards[2:4] + cards[4:]
+        fa, fb = poker_eval.evaluate_codes(a), poker_eval.evaluate_codes(b)
+        sa, sb = best_7(codes_to_tuples(a)), best_7(codes_to_tuples(b))
+        assert (fa > fb) == (sa > sb) and (fa == fb) == (sa == sb), (a, b)
+    print(f"ordering check: {CHECK_HANDS * 2} hands identical to best_7")
+
+
+def main():
+    rng = random.Random(1234)
+
+    t = time.perf_counter()
+    poker_eval.warm()
+    print(f"table build   : {time.perf_counter() - t:8.3f} s")
+
+    check_ordering(rng)
+
+    hands = [rng.sample(CODES, 7) for _ in range(SLOW_HANDS)]
+    tuples = [codes_to_tuples(h) for h in hands]
+    ints = [poker_eval.codes_to_ints(h) for h in hands]
+
+    t = time.perf_counter()
+    for h in tuples:
+        best_7(h)
+    slow = SLOW_HANDS / (time.perf_counter() - t)
+
+    t = time.perf_counter()
+    for h in ints:
+        poker_eval.evaluate(h)
+    fast = SLOW_HANDS / (time.perf_counter() - t)
+
+    deck = np.array(poker_eval.FULL_DECK, dtype=np.int64)
+    idx = np.random.default_rng(1).random((BATCH_HANDS, 52)).argpartition(7, axis=1)[:, :7]
+    batch = deck[idx]
+    t = time.perf_counter()
+    poker_eval.evaluate_batch(batch)
+    vec = BATCH_HANDS / (time.perf_counter() - t)
+
+    print(f"best_7         : {slow:12,.0f} hands/s")
+    print(f"evaluate       : {fast:12,.0f} hands/s  ({fast / slow:.0f}x)")
+    print(f"evaluate_batch : {vec:12,.0f} hands/s  ({vec / slow:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# benchmarks/bench_langid.py
+"""Accuracy and throughput of the offline language identifier.
+
+Two test sets:
+  * a small built-in set of chat-style sentences (always available)
+  * translated UI strings from the system's gettext catalogs
+    (/usr/share/locale/*/LC_MESSAGES/*.mo), when present; the profiles were
+    trained on Wikipedia, so this is held-out text from another domain
+
+If ``langdetect`` is installed it is run on the same texts for reference.
+
+Run from the repo root:  python -m benchmarks.bench_langid
+"""
+import collections
+import gettext
+import glob
+import random
+import re
+import time
+
+from functionality.langid import langid
+
+PER_LANG = 300
+MIN_LEN = 25
+LOCALE_CODES = {"zh_CN": "zh-cn", "zh_TW": "zh-tw", "pt_BR": "pt", "nb": "no"}
+
+SENTENCES = {
+    "en": ["Hey, are you coming to the game tonight?", "I can't believe how good that movie was",
+           "Does anyone know when the server restarts?"],
+    "de": ["Hast du heute Abend Zeit für ein Spiel?", "Ich kann nicht glauben, wie gut der Film war",
+           "Weiß jemand, wann der Server neu startet?"],
+    "fr": ["Tu viens au match ce soir ?", "Je n'arrive pas à croire à quel point ce film était bien",
+           "Quelqu'un sait quand le serveur redémarre ?"],
+    "es": ["¿Vienes al partido esta noche?", "No puedo creer lo buena que fue esa película",
+           "¿Alguien sabe cuándo se reinicia el servidor?"],
+    "it": ["Vieni alla partita stasera?", "Non riesco a credere quanto fosse bello quel film",
+           "Qualcuno sa quando si riavvia il server?"],
+    "pt": ["Você vem para o jogo hoje à noite?", "Não acredito como aquele filme foi bom",
+           "Alguém sabe quando o servidor reinicia?"],
+    "nl": ["Kom je vanavond naar de wedstrijd?", "Ik kan niet geloven hoe goed die film was",
+           "Weet iemand wanneer de server opnieuw opstart?"],
+    "pl": ["Przyjdziesz dziś wieczorem na mecz?", "Nie mogę uwierzyć, jak dobry był ten film",
+           "Czy ktoś wie, kiedy serwer się zrestartuje?"],
+    "ru": ["Ты придёшь сегодня вечером на игру?", "Не могу поверить, насколько хорош был этот фильм",
+           "Кто-нибудь знает, когда перезапустится сервер?"],
+    "uk": ["Ти прийдеш сьогодні ввечері на гру?", "Не можу повірити, наскільки гарним був цей фільм",
+           "Хтось знає, коли перезапуститься сервер?"],
+    "sv": ["Kommer du till matchen ikväll?", "Jag kan inte tro hur bra den filmen var",
+           "Vet någon när servern startar om?"],
+    "tr": ["Bu akşam maça geliyor musun?", "O filmin ne kadar iyi olduğuna inanamıyorum",
+           "Sunucunun ne zaman yeniden başlayacağını bilen var mı?"],
+    "vi": ["Tối nay bạn có đến xem trận đấu không?", "Tôi không thể tin bộ phim đó hay đến vậy",
+           "Có ai biết khi nào máy chủ khởi động lại không?"],
+    "id": ["Apakah kamu datang ke pertandingan malam ini?", "Saya tidak percaya betapa bagusnya film itu",
+           "Ada yang tahu kapan servernya dimulai ulang?"],
+    "ja": ["今夜の試合に来ますか？", "あの映画がどれほど良かったか信じられない",
+           "サーバーがいつ再起動するか知っている人はいますか？"],
+    "ko": ["오늘 밤 경기에 올 거야?", "그 영화가 얼마나 좋았는지 믿을 수가 없어",
+           "서버가 언제 재시작되는지 아는 사람 있어?"],
+    "zh-cn": ["你今晚来看比赛吗？", "我不敢相信那部电影有多好看", "有人知道服务器什么时候重启吗？"],
+    "ar": ["هل ستأتي إلى المباراة الليلة؟", "لا أصدق كم كان ذلك الفيلم رائعا",
+           "هل يعرف أحد متى سيتم إعادة تشغيل الخادم؟"],
+    "hi": ["क्या तुम आज रात मैच देखने आ रहे हो?", "मुझे विश्वास नहीं हो रहा कि वह फिल्म कितनी अच्छी थी",
+           "क्या किसी को पता है कि सर्वर कब फिर से शुरू होगा?"],
+    "el": ["Θα έρθεις στον αγώνα απόψε;", "Δεν μπορώ να πιστέψω πόσο καλή ήταν αυτή η ταινία",
+           "Ξέρει κανείς πότε θα γίνει επανεκκίνηση του διακομιστή;"],
+}
+
+_PLACEHOLDERS = re.compile(r"%[-#0-9.]*[a-zA-Z]|\{[^}]*\}|<[^>]+>|--?[a-z-]+|\S*[/@]\S*")
+
+
+def gettext_corpus(langs, per_lang: int = PER_LANG):
+    found = collections.defaultdict(set)
+    for d in glob.glob("/usr/share/locale/*/LC_MESSAGES"):
+        loc = d.split("/")[-2]
+        code = LOCALE_CODES.get(loc, loc)
+        if code not in langs:
+            continue
+        for mo in glob.glob(d + "/*.mo"):
+            try:
+                with open(mo, "rb") as f:
+                    catalog = gettext.GNUTranslations(f)._catalog
+            except Exception:
+                continue
+            for key, text in catalog.items():
+                msgid = key[0] if isinstance(key, tuple) else key
+                if not isinstance(text, str) or not msgid:
+                    continue
+                text = _PLACEHOLDERS.sub("", text).strip()
+                # skip short strings and ones left untranslated
+                if len(text) >= MIN_LEN and text != msgid.strip():
+                    found[code].add(text)
+    rng = random.Random(0)
+    return {code: rng.sample(sorted(texts), min(per_lang, len(texts))) for code, texts in found.items()}
+
+
+def evaluate(name, detect, corpus):
+    total = correct = 0
+    per_lang = {}
+    confusions = collections.Counter()
+    start = time.perf_counter()
+    for lang, texts in corpus.items():
+        ok = 0
+        for text in texts:
+            got = detect(text)
+            if got == lang:
+                ok += 1
+            else:
+                confusions[(lang, got)] += 1
+        per_lang[lang] = ok / len(texts)
+        total += len(texts)
+        correct += ok
+    elapsed = time.perf_counter() - start
+    print(f"{name:11}: accuracy {correct / total:6.1%} on {total} texts, {total / elapsed:9,.0f} texts/s")
+    worst = sorted(per_lang.items(), key=lambda kv: kv[1])[:5]
+    print(f"{'':11}  weakest: " + ", ".join(f"{l} {a:.0%}" for l, a in worst))
+    print(f"{'':11}  top confusions: " + ", ".join(f"{a}->{b} x{n}" for (a, b), n in confusions.most_common(4)))
+
+
+def main():
+    t = time.perf_counter()
+    langid.load()
+    print(f"profile load: {time.perf_counter() - t:.3f} s ({len(langid.langs)} languages)")
+
+    def local(text):
+        d = langid.detect(text)
+        return d.lang if d else None
+
+    try:
+        import langdetect
+        langdetect.DetectorFactory.seed = 0
+
+        def reference(text):
+            try:
+                return langdetect.detect(text)
+            except Exception:
+                return None
+    except ImportError:
+        reference = None
+
+    sets = [("built-in", SENTENCES)]
+    mo = gettext_corpus(set(langid.langs))
+    if mo:
+        sets.append(("gettext", mo))
+    for label, corpus in sets:
+        print(f"\n== {label} ==")
+        evaluate("langid", local, corpus)
+        if reference is not None:
+            evaluate("langdetect", reference, corpus)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/bench_prefix.py
+"""Per-message prefix resolution: JSON file read vs the cached GuildStore.
+
+Run from the repo root:  python -m benchmarks.bench_prefix
+"""
+import json
+import os
+import random
+import tempfile
+import timeit
+
+from storage.guild_store import GuildStore
+
+GUILDS = 500
+LOOKUPS = 20_000
+
+
+def _old_get_prefix(path: str, guild_id: int) -> str:
+    try:
+        with open(path, "r") as f:
+            prefixes = json.load(f)
+        return prefixes.get(str(guild_id), "$")
+    except (FileNotFoundError, json.JSONDecodeError):
+        return "$"
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "prefixes.json")
+        ids = [random.getrandbits(60) for _ in range(GUILDS)]
+        with open(path, "w") as f:
+            json.dump({str(g): random.choice("$!?.%") for g in ids}, f, indent=4)
+
+        store = GuildStore(path=os.path.join(tmp, "guilds.db"))
+        store.open()
+        for g in ids:
+            store.set_prefix(g, _old_get_prefix(path, g))
+        sample = [random.choice(ids) for _ in range(LOOKUPS)]
+
+        old = timeit.timeit(lambda: [_old_get_prefix(path, g) for g in sample], number=1)
+        new = timeit.timeit(lambda: [store.get_prefix(g) for g in sample], number=1)
+        store.close()
+
+    print(f"{GUILDS} guilds, {LOOKUPS} lookups")
+    print(f"json file per message : {old / LOOKUPS * 1e6:9.2f} us/lookup")
+    print(f"GuildStore.get_prefix : {new / LOOKUPS * 1e6:9.2f} us/lookup")
+    print(f"speedup               : {old / new:9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,41 @@
 # cogs/flight.py
 import os
 import math
+import time
+import random
 import asyncio
+import collections
 import aiohttp
 import discord
 import contextlib
 from datetime import datetime, timezone, date, timedelta
-from discord.ext import commands
+from discord.ext import commands, tasks
 from typing import Optional, Tuple, Dict, Any, List
 
+from functionality.airports import Airport, airports as airport_index
+from functionality.flight_states import StateSnapshot, display_units
+from storage.flight_cache import flight_cache
+
 BASE = "https://opensky-network.org/api"
 
-AIRPORTS = {
-    "KJFK": {"name": "John F. Kennedy International", "city": "New York"},
-    "KLAX": {"name": "Los Angeles International", "city": "Los Angeles"},
-    "KORD": {"name": "O'Hare International", "city": "Chicago"},
-    "KATL": {"name": "Hartsfield-Jackson", "city": "Atlanta"},
-    "EGLL": {"name": "London Heathrow", "city": "London"},
-    "LFPG": {"name": "Paris Charles de Gaulle", "city": "Paris"},
-}
+SNAPSHOT_INTERVAL = 60      # background refresh of states/all while the commands are in use
+SNAPSHOT_MAX_AGE = 90       # a lookup on an older snapshot waits for a fresh one
+SNAPSHOT_IDLE = 15 * 60     # stop refreshing this long after the last lookup
+MIN_FETCH_GAP = 10          # OpenSky updates anonymous state vectors every 10 s at most
+
+TOKEN_URL = "https://auth.opensky-network.org/auth/realms/opensky-network/protocol/openid-connect/token"
+REQUEST_RATE = 1.0          # sustained requests per second to OpenSky
+REQUEST_BURST = 4
+RETRIES = 2
+BACKOFF = 1.0
+MAX_RETRY_WAIT = 10         # a longer server-imposed wait fails the command instead of holding it
+
+NEARBY_RADIUS_KM = 50
+MAX_RADIUS_KM = 500
+OVERHEAD_RADIUS_KM = 25
+NEARBY_SHOWN = 15
+
+COMMON_AIRPORTS = ["KJFK", "KLAX", "KORD", "KATL", "EGLL", "LFPG"]
 
 
 def _fmt_dt_unix(ts: Optional[int]) -> str:
@@ -38,6 +55,21 @@ def _parse_date_str(s: str) -> date:
     return datetime.strptime(s, "%Y-%m-%d").date()
 
 
+def _fmt_num(value, fmt: str) -> str:
+    """``fmt`` applied to a number, or "—" for None/NaN"""
+    if value is None or not math.isfinite(value):
+        return "—"
+    return fmt.format(int(value))
+
+
+def _fmt_wait(seconds: float) -> str:
+    if seconds < 120:
+        return f"{math.ceil(seconds)} s"
+    if seconds < 7200:
+        return f"{math.ceil(seconds / 60)} min"
+    return f"{seconds / 3600:.1f} h"
+
+
 def _heading_to_compass(deg: float) -> str:
     if deg is None:
         return "—"
@@ -45,25 +77,228 @@ def _heading_to_compass(deg: float) -> str:
     return directions[round(deg / 22.5) % 16]
 
 
+class OpenSkyError(RuntimeError):
+    pass
+
+
+class RateLimited(OpenSkyError):
+    def __init__(self, retry_after: float):
+        super().__init__(f"OpenSky rate limit reached, try again in {_fmt_wait(retry_after)}")
+        self.retry_after = retry_after
+
+
+class _TokenBucket:
+    """``rate`` requests a second on average, bursts of up to ``burst``"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def take(self):
+        async with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self.tokens = 1.0
+                self.updated = time.monotonic()
+            self.tokens -= 1
+
+
 class OpenSkyAPI:
-    async def _get(self, session, path, params=None):
+    """OpenSky REST client with one pooled session for the cog's lifetime.
+
+    Requests go through a token bucket. A 429 is retried after OpenSky's
+    X-Rate-Limit-Retry-After-Seconds when that is short; otherwise calls
+    fail fast until it passes. Connection errors and 5xx are retried with
+    backoff. Set OPENSKY_CLIENT_ID / OPENSKY_CLIENT_SECRET (or, for older
+    accounts, OPENSKY_USERNAME / OPENSKY_PASSWORD) to spend an account's
+    larger daily credit allowance instead of the anonymous one.
+    """
+
+    def __init__(self):
+        self.client_id = os.getenv("OPENSKY_CLIENT_ID")
+        self.client_secret = os.getenv("OPENSKY_CLIENT_SECRET")
+        username, password = os.getenv("OPENSKY_USERNAME"), os.getenv("OPENSKY_PASSWORD")
+        self._basic = aiohttp.BasicAuth(username, password) if username and password else None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._bucket = _TokenBucket(REQUEST_RATE, REQUEST_BURST)
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._login_lock = asyncio.Lock()
+        self._blocked_until = 0.0
+        # metrics
+        self.requests = 0
+        self.failures = 0
+        self.rate_limited = 0
+        self.credits_left: Optional[int] = None
+        self._latencies: "collections.deque[float]" = collections.deque(maxlen=200)
+
+    @property
+    def authenticated(self) -> bool:
+        return bool(self.client_id and self.client_secret) or self._basic is not None
+
+    async def open(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=8, ttl_dns_cache=300)
+            timeout = aiohttp.ClientTimeout(total=30, connect=10)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _auth_headers(self) -> Dict[str, str]:
+        if not (self.client_id and self.client_secret):
+            return {}
+        async with self._login_lock:
+            if self._token is None or time.monotonic() >= self._token_expires:
+                data = {"grant_type": "client_credentials",
+                        "client_id": self.client_id, "client_secret": self.client_secret}
+                async with self._session.post(TOKEN_URL, data=data) as resp:
+                    if resp.status != 200:
+                        raise OpenSkyError(f"OpenSky login failed: HTTP {resp.status}")
+                    body = await resp.json(content_type=None)
+                self._token = body["access_token"]
+                # renew a minute early
+                self._token_expires = time.monotonic() + max(60, body.get("expires_in", 1800) - 60)
+        return {"Authorization": f"Bearer {self._token}"}
+
+    async def _get(self, path, params=None):
+        await self.open()
         url = f"{BASE}/{path}"
-        async with session.get(url, params=params or {}, timeout=30) as resp:
-            if resp.status != 200:
-                raise RuntimeError(f"HTTP {resp.status}")
-            return await resp.json(content_type=None)
-
-    async def states_all(self, session):
-        return await self._get(session, "states/all")
+        attempt = 0
+        while True:
+            blocked = self._blocked_until - time.monotonic()
+            if blocked > 0:
+                raise RateLimited(blocked)
+            await self._bucket.take()
+            headers = await self._auth_headers()
+            delay = BACKOFF * 2 ** attempt + random.uniform(0, BACKOFF)
+            self.requests += 1
+            start = time.monotonic()
+            try:
+                async with self._session.get(url, params=params or {}, headers=headers, auth=self._basic) as resp:
+                    self._latencies.append(time.monotonic() - start)
+                    remaining = resp.headers.get("X-Rate-Limit-Remaining", "")
+                    if remaining.isdigit():
+                        self.credits_left = int(remaining)
+                    if resp.status == 200:
+                        return await resp.json(content_type=None)
+                    if resp.status == 404:
+                        # flights endpoints answer 404 when nothing matched the window
+                        return []
+                    if resp.status == 429:
+                        self.rate_limited += 1
+                        try:
+                            delay = float(resp.headers["X-Rate-Limit-Retry-After-Seconds"])
+                        except (KeyError, ValueError):
+                            pass
+                        if delay > MAX_RETRY_WAIT or attempt >= RETRIES:
+                            self._blocked_until = time.monotonic() + delay
+                            raise RateLimited(delay)
+                    elif resp.status < 500 or attempt >= RETRIES:
+                        self.failures += 1
+                        raise OpenSkyError(f"HTTP {resp.status}")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= RETRIES:
+                    self.failures += 1
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = sorted(self._latencies)
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "rate_limited": self.rate_limited,
+            "credits_left": self.credits_left,
+            "latency_avg_ms": 1000 * sum(latencies) / len(latencies) if latencies else None,
+            "latency_p95_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+            "blocked_for": max(0.0, self._blocked_until - time.monotonic()),
+            "authenticated": self.authenticated,
+        }
+
+    async def states_all(self):
+        return await self._get("states/all")
+
+    async def flights_arrival(self, airport, begin, end):
+        return await self._get("flights/arrival", {"airport": airport.upper(), "begin": begin, "end": end})
+
+    async def flights_departure(self, airport, begin, end):
+        return await self._get("flights/departure", {"airport": airport.upper(), "begin": begin, "end": end})
+
+    async def flights_aircraft(self, icao24, begin, end):
+        return await self._get("flights/aircraft", {"icao24": icao24.lower(), "begin": begin, "end": end})
+
+
+class SnapshotService:
+    """Latest states/all snapshot, shared by every flight command.
+
+    At most one upstream fetch runs at a time: lookups that arrive while one
+    is in flight wait for it instead of starting their own, and a failed
+    fetch falls back to the previous snapshot.
+    """
+
+    def __init__(self, api: OpenSkyAPI):
+        self.api = api
+        self.snapshot: Optional[StateSnapshot] = None
+        self.last_used = float("-inf")
+        self.fetches = 0
+        self._last_fetch = float("-inf")
+        self._inflight: Optional[asyncio.Future] = None
+
+    async def _fetch(self) -> StateSnapshot:
+        data = await self.api.states_all()
+        if not isinstance(data, dict) or "states" not in data:
+            # a 404 (which _get turns into []) or an empty body isn't "no aircraft
+            # anywhere"; fail so refresh() keeps serving the previous snapshot
+            raise OpenSkyError("states/all returned no state vectors")
+        # parsing tens of thousands of rows takes a while; keep it off the event loop
+        snapshot = await asyncio.to_thread(StateSnapshot, data)
+        self.snapshot = snapshot
+        self.fetches += 1
+        return snapshot
+
+    def _fetch_done(self, fut: asyncio.Future):
+        self._inflight = None
+        if not fut.cancelled():
+            fut.exception()   # waiters get it; don't warn when there were none
+
+    async def refresh(self, max_age: float = 0.0) -> StateSnapshot:
+        """The snapshot, fetching a new one first if it is older than ``max_age``."""
+        snapshot = self.snapshot
+        now = time.monotonic()
+        if snapshot is not None and (snapshot.age <= max_age or now - self._last_fetch < MIN_FETCH_GAP):
+            return snapshot
+        if self._inflight is None:
+            self._last_fetch = now
+            self._inflight = asyncio.ensure_future(self._fetch())
+            self._inflight.add_done_callback(self._fetch_done)
+        try:
+            return await asyncio.shield(self._inflight)
+        except Exception:
+            if snapshot is not None:
+                return snapshot
+            raise
 
-    async def flights_arrival(self, session, airport, begin, end):
-        return await self._get(session, "flights/arrival", {"airport": airport.upper(), "begin": begin, "end": end})
+    async def get(self, max_age: float = SNAPSHOT_MAX_AGE) -> StateSnapshot:
+        self.last_used = time.monotonic()
+        return await self.refresh(max_age)
 
-    async def flights_departure(self, session, airport, begin, end):
-        return await self._get(session, "flights/departure", {"airport": airport.upper(), "begin": begin, "end": end})
+    @property
+    def wanted(self) -> bool:
+        return time.monotonic() - self.last_used < SNAPSHOT_IDLE
 
-    async def flights_aircraft(self, session, icao24, begin, end):
-        return await self._get(session, "flights/aircraft", {"icao24": icao24.lower(), "begin": begin, "end": end})
+    def close(self):
+        if self._inflight is not None:
+            self._inflight.cancel()
 
 
 class FlightDetailView(discord.ui.View):
@@ -73,15 +308,15 @@ class FlightDetailView(discord.ui.View):
 
     @discord.ui.button(label="📍 Map", style=discord.ButtonStyle.primary)
     async def map_link(self, interaction: discord.Interaction, button):
-        lat, lon = self.state[6], self.state[5]
-        if lat and lon:
+        lat, lon = float(self.state["lat"]), float(self.state["lon"])
+        if math.isfinite(lat) and math.isfinite(lon):
             await interaction.response.send_message(f"[View on Map](https://www.google.com/maps?q={lat},{lon})", ephemeral=True)
         else:
             await interaction.response.send_message("No position data", ephemeral=True)
 
     @discord.ui.button(label="🔗 FlightRadar24", style=discord.ButtonStyle.secondary)
     async def fr24(self, interaction: discord.Interaction, button):
-        cs = (self.state[1] or "").strip()
+        cs = self.state["callsign"].decode()
         if cs:
             await interaction.response.send_message(f"https://www.flightradar24.com/{cs}", ephemeral=True)
         else:
@@ -116,37 +351,55 @@ class Flight(commands.Cog):
     def __init__(self, client):
         self.client = client
         self.api = OpenSkyAPI()
-
-    def _create_flight_embed(self, state) -> discord.Embed:
-        icao24 = state[0] or "—"
-        callsign = (state[1] or "").strip() or "—"
-        country = state[2] or "Unknown"
-        on_ground = state[8]
-        geo_alt = state[13]
-        velocity = state[9]
-        heading = state[10]
-        vert_rate = state[11]
-        last_contact = state[4]
-
-        alt_ft = f"{int(geo_alt * 3.28084):,} ft" if isinstance(geo_alt, (int, float)) else "—"
-        gs_kts = f"{int(velocity * 1.94384):,} kts" if isinstance(velocity, (int, float)) else "—"
-        heading_str = f"{int(heading)}° ({_heading_to_compass(heading)})" if isinstance(heading, (int, float)) else "—"
-        vr_fpm = f"{int(vert_rate * 196.85):+,} fpm" if isinstance(vert_rate, (int, float)) else "—"
-        status = "🛬 On Ground" if on_ground else "✈️ In Flight"
-
-        embed = discord.Embed(
-            title=f"✈️ {callsign}",
-            description=f"{status} | {country}",
-            color=0x1e90ff if not on_ground else 0x2ecc71
-        )
-        embed.add_field(name="🔢 Hex", value=f"`{icao24}`", inline=True)
-        embed.add_field(name="📏 Altitude", value=alt_ft, inline=True)
-        embed.add_field(name="💨 Speed", value=gs_kts, inline=True)
-        embed.add_field(name="🧭 Heading", value=heading_str, inline=True)
-        embed.add_field(name="📈 Vert Rate", value=vr_fpm, inline=True)
-        embed.add_field(name="🕐 Last Contact", value=_fmt_dt_unix(last_contact), inline=True)
-        embed.set_footer(text="Data from OpenSky Network")
-        return embed
+        self.states = SnapshotService(self.api)
+        self._flight_queries: Dict[tuple, asyncio.Task] = {}
+
+    async def cog_load(self):
+        flight_cache.open()
+        await self.api.open()
+        self.refresh_states.start()
+
+    async def cog_unload(self):
+        self.refresh_states.cancel()
+        self.states.close()
+        await self.api.close()
+        flight_cache.close()
+
+    @tasks.loop(seconds=SNAPSHOT_INTERVAL)
+    async def refresh_states(self):
+        # OpenSky rations anonymous requests per day, so only poll while someone is looking
+        if not self.states.wanted:
+            return
+        try:
+            await self.states.refresh(max_age=SNAPSHOT_INTERVAL / 2)
+        except Exception as e:
+            print(f"OpenSky refresh failed: {e}")
+
+    def _create_flight_embeds(self, snapshot: StateSnapshot, rows) -> List[discord.Embed]:
+        units = display_units(rows)
+        embeds = []
+        for i, state in enumerate(rows):
+            callsign = state["callsign"].decode() or "—"
+            country = snapshot.country(state) or "Unknown"
+            on_ground = bool(state["on_ground"])
+            heading = float(state["heading"])
+            heading_str = f"{int(heading)}° ({_heading_to_compass(heading)})" if math.isfinite(heading) else "—"
+            status = "🛬 On Ground" if on_ground else "✈️ In Flight"
+
+            embed = discord.Embed(
+                title=f"✈️ {callsign}",
+                description=f"{status} | {country}",
+                color=0x1e90ff if not on_ground else 0x2ecc71
+            )
+            embed.add_field(name="🔢 Hex", value=f"`{state['icao24'].decode() or '—'}`", inline=True)
+            embed.add_field(name="📏 Altitude", value=_fmt_num(units["alt_ft"][i], "{:,} ft"), inline=True)
+            embed.add_field(name="💨 Speed", value=_fmt_num(units["speed_kts"][i], "{:,} kts"), inline=True)
+            embed.add_field(name="🧭 Heading", value=heading_str, inline=True)
+            embed.add_field(name="📈 Vert Rate", value=_fmt_num(units["vert_fpm"][i], "{:+,} fpm"), inline=True)
+            embed.add_field(name="🕐 Last Contact", value=_fmt_dt_unix(int(state["last_contact"])), inline=True)
+            embed.set_footer(text="Data from OpenSky Network")
+            embeds.append(embed)
+        return embeds
 
     @commands.command(name="flight", aliases=["fl"], help="Track a flight by callsign. Example: flight UAL123")
     async def flight(self, ctx, *, code: Optional[str] = None):
@@ -155,24 +408,21 @@ class Flight(commands.Cog):
         
         callsign = _callsign_norm(code)
         async with ctx.typing():
-            async with aiohttp.ClientSession() as s:
-                try:
-                    data = await self.api.states_all(s)
-                except Exception as e:
-                    return await ctx.send(f"❌ Error: {e}")
+            try:
+                snapshot = await self.states.get()
+            except Exception as e:
+                return await ctx.send(f"❌ Error: {e}")
         
-        states = data.get("states") or []
-        matches = [st for st in states if _callsign_norm(st[1] or "") == callsign]
+        matches = snapshot.callsign(callsign)
         
-        if not matches:
+        if not len(matches):
             return await ctx.send(f"❌ No live results for **{callsign}**")
         
+        embeds = self._create_flight_embeds(snapshot, matches)
         if len(matches) == 1:
-            embed = self._create_flight_embed(matches[0])
             view = FlightDetailView(matches[0])
-            await ctx.send(embed=embed, view=view)
+            await ctx.send(embed=embeds[0], view=view)
         else:
-            embeds = [self._create_flight_embed(st) for st in matches]
             view = PaginatedView(embeds, ctx.author.id)
             await ctx.send(embed=embeds[0], view=view)
 
@@ -182,28 +432,140 @@ class Flight(commands.Cog):
             return await ctx.send("Usage: `live <callsign>`")
         
         callsign = _callsign_norm(code)
-        async with aiohttp.ClientSession() as s:
-            try:
-                data = await self.api.states_all(s)
-            except Exception as e:
-                return await ctx.send(f"❌ Error: {e}")
+        try:
+            snapshot = await self.states.get()
+        except Exception as e:
+            return await ctx.send(f"❌ Error: {e}")
         
-        states = data.get("states") or []
-        st = next((x for x in states if _callsign_norm(x[1] or "") == callsign), None)
+        matches = snapshot.callsign(callsign)
         
-        if not st:
+        if not len(matches):
             return await ctx.send(f"❌ No live result for **{callsign}**")
         
-        alt = f"{int(st[13] * 3.28084):,}ft" if st[13] else "—"
-        spd = f"{int(st[9] * 1.94384)}kts" if st[9] else "—"
-        status = "🛬" if st[8] else "✈️"
+        st = matches[0]
+        units = display_units(matches[:1])
+        alt = _fmt_num(units["alt_ft"][0], "{:,}ft")
+        spd = _fmt_num(units["speed_kts"][0], "{}kts")
+        status = "🛬" if st["on_ground"] else "✈️"
         
-        await ctx.send(f"{status} **{callsign}** | {st[2]} | Alt: {alt} | Speed: {spd}")
+        await ctx.send(f"{status} **{callsign}** | {snapshot.country(st)} | Alt: {alt} | Speed: {spd}")
+
+    async def _airports(self):
+        if not airport_index.loaded:
+            # first use reads the bundled dataset; keep that off the event loop
+            await asyncio.to_thread(airport_index.load)
+        return airport_index
+
+    async def _airport(self, query: str) -> Optional[Airport]:
+        """Airport by ICAO/IATA code, else best name or city match"""
+        return (await self._airports()).resolve(query)
+
+    async def _airport_code(self, query: str) -> Tuple[str, Optional[Airport]]:
+        """ICAO code to send OpenSky for ``query``: a code, else the best name/city match.
+
+        Only a query that matches nothing passes through as typed.
+        """
+        index = await self._airports()
+        airport = index.resolve(query)
+        return (airport.icao if airport else query.upper()), airport
+
+    def _nearby_embed(self, title: str, snapshot: StateSnapshot, rows, dist, radius_km: float) -> discord.Embed:
+        embed = discord.Embed(
+            title=title,
+            description=f"{len(rows)} aircraft within {radius_km:g} km",
+            color=0x1e90ff
+        )
+        units = display_units(rows[:NEARBY_SHOWN])
+        for i, state in enumerate(rows[:NEARBY_SHOWN]):
+            name = state["callsign"].decode() or state["icao24"].decode().upper()
+            heading = float(state["heading"])
+            where = "on ground" if state["on_ground"] else _fmt_num(units["alt_ft"][i], "{:,} ft")
+            course = _heading_to_compass(heading) if math.isfinite(heading) else "—"
+            embed.add_field(name=name, value=f"{dist[i]:.1f} km | {where} | {course}", inline=True)
+        if len(rows) > NEARBY_SHOWN:
+            embed.set_footer(text=f"Nearest {NEARBY_SHOWN} shown • Data from OpenSky Network")
+        else:
+            embed.set_footer(text="Data from OpenSky Network")
+        return embed
+
+    @commands.command(name="nearby", help="Aircraft near a point. Example: nearby 40.64 -73.78 50")
+    async def nearby(self, ctx, lat: Optional[float] = None, lon: Optional[float] = None,
+                     radius_km: float = NEARBY_RADIUS_KM):
+        if lat is None or lon is None:
+            return await ctx.send(f"Usage: `nearby <lat> <lon> [radius_km]` (default {NEARBY_RADIUS_KM} km)")
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return await ctx.send("❌ Latitude must be -90..90 and longitude -180..180")
+        if not 0 < radius_km <= MAX_RADIUS_KM:
+            return await ctx.send(f"❌ Radius must be between 0 and {MAX_RADIUS_KM} km")
+
+        async with ctx.typing():
+            try:
+                snapshot = await self.states.get()
+            except Exception as e:
+                return await ctx.send(f"❌ Error: {e}")
+
+        rows, dist = snapshot.nearby(lat, lon, radius_km)
+        if not len(rows):
+            return await ctx.send(f"❌ No aircraft within {radius_km:g} km of {lat:.3f}, {lon:.3f}")
+        await ctx.send(embed=self._nearby_embed(f"📡 Aircraft near {lat:.3f}, {lon:.3f}", snapshot, rows, dist, radius_km))
+
+    @commands.command(name="overhead", help="Aircraft in the air around an airport. Example: overhead KJFK, overhead heathrow")
+    async def overhead(self, ctx, *, code: Optional[str] = None):
+        if not code:
+            return await ctx.send("Usage: `overhead <ICAO, IATA or name>` Example: `overhead KJFK`")
+        airport = await self._airport(code)
+        if airport is None:
+            return await ctx.send(f"❌ Unknown airport `{code}`. Use `airports <name>` to search.")
+
+        async with ctx.typing():
+            try:
+                snapshot = await self.states.get()
+            except Exception as e:
+                return await ctx.send(f"❌ Error: {e}")
+
+        rows, dist = snapshot.nearby(airport.lat, airport.lon, OVERHEAD_RADIUS_KM, airborne_only=True)
+        if not len(rows):
+            return await ctx.send(f"❌ Nothing in the air within {OVERHEAD_RADIUS_KM} km of {airport.icao}")
+        title = f"🛫 Over {airport.icao} ({airport.name})"
+        await ctx.send(embed=self._nearby_embed(title, snapshot, rows, dist, OVERHEAD_RADIUS_KM))
+
+    async def _flights(self, endpoint: str, subject: str, begin: int, end: int):
+        """flights/<endpoint> for one airport or aircraft and window, through flight_cache"""
+        subject = subject.lower() if endpoint == "aircraft" else subject.upper()
+        key = (endpoint, subject, begin, end)
+        flights = flight_cache.get(*key)
+        if flights is not None:
+            return flights
+
+        # identical lookups already waiting on OpenSky share that request; it runs
+        # as its own task so one caller being cancelled doesn't cancel the rest
+        task = self._flight_queries.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_flights(key))
+            self._flight_queries[key] = task
+            task.add_done_callback(lambda t: self._flights_settled(key, t))
+        return await asyncio.shield(task)
+
+    async def _fetch_flights(self, key):
+        endpoint, subject, begin, end = key
+        fetch = {"arrival": self.api.flights_arrival, "departure": self.api.flights_departure,
+                 "aircraft": self.api.flights_aircraft}[endpoint]
+        flights = await fetch(subject, begin, end)
+        if isinstance(flights, list):
+            flight_cache.put(*key, flights)
+        return flights
+
+    def _flights_settled(self, key, task: asyncio.Task):
+        if self._flight_queries.get(key) is task:
+            del self._flight_queries[key]
+        if not task.cancelled():
+            # nobody may be waiting any more; don't warn about an unretrieved exception
+            task.exception()
 
     @commands.command(name="arrivals", aliases=["arr"], help="Airport arrivals. Example: arrivals KJFK 2025-01-04")
     async def arrivals(self, ctx, code: Optional[str] = None, when: Optional[str] = None):
         if not code:
-            return await ctx.send("Usage: `arrivals <ICAO> [YYYY-MM-DD]`\nExample: `arrivals KJFK 2025-01-04`")
+            return await ctx.send("Usage: `arrivals <ICAO or IATA> [YYYY-MM-DD]`\nExample: `arrivals KJFK 2025-01-04`")
         
         when = when or date.today().isoformat()
         try:
@@ -213,18 +575,19 @@ class Flight(commands.Cog):
         
         begin = int(datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp())
         end = begin + 86400
+        icao, airport = await self._airport_code(code)
         
         async with ctx.typing():
-            async with aiohttp.ClientSession() as s:
-                try:
-                    flights = await self.api.flights_arrival(s, code, begin, end)
-                except Exception as e:
-                    return await ctx.send(f"❌ Error: {e}")
+            try:
+                flights = await self._flights("arrival", icao, begin, end)
+            except Exception as e:
+                return await ctx.send(f"❌ Error: {e}")
         
         if not flights or isinstance(flights, dict):
-            return await ctx.send(f"❌ No arrivals for {code.upper()} on {d}")
+            return await ctx.send(f"❌ No arrivals for {icao} on {d}")
         
-        embed = discord.Embed(title=f"🛬 Arrivals at {code.upper()}", description=f"📅 {d}", color=0x2ecc71)
+        where = f"{airport.name} • " if airport else ""
+        embed = discord.Embed(title=f"🛬 Arrivals at {icao}", description=f"{where}📅 {d}", color=0x2ecc71)
         for f in flights[:12]:
             cs = (f.get("callsign") or "—").strip()
             dep = f.get("estDepartureAirport") or "?"
@@ -235,7 +598,7 @@ class Flight(commands.Cog):
     @commands.command(name="departures", aliases=["dep"], help="Airport departures. Example: departures KLAX 2025-01-04")
     async def departures(self, ctx, code: Optional[str] = None, when: Optional[str] = None):
         if not code:
-            return await ctx.send("Usage: `departures <ICAO> [YYYY-MM-DD]`")
+            return await ctx.send("Usage: `departures <ICAO or IATA> [YYYY-MM-DD]`")
         
         when = when or date.today().isoformat()
         try:
@@ -245,18 +608,19 @@ class Flight(commands.Cog):
         
         begin = int(datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp())
         end = begin + 86400
+        icao, airport = await self._airport_code(code)
         
         async with ctx.typing():
-            async with aiohttp.ClientSession() as s:
-                try:
-                    flights = await self.api.flights_departure(s, code, begin, end)
-                except Exception as e:
-                    return await ctx.send(f"❌ Error: {e}")
+            try:
+                flights = await self._flights("departure", icao, begin, end)
+            except Exception as e:
+                return await ctx.send(f"❌ Error: {e}")
         
         if not flights or isinstance(flights, dict):
-            return await ctx.send(f"❌ No departures for {code.upper()} on {d}")
+            return await ctx.send(f"❌ No departures for {icao} on {d}")
         
-        embed = discord.Embed(title=f"🛫 Departures from {code.upper()}", description=f"📅 {d}", color=0x3498db)
+        where = f"{airport.name} • " if airport else ""
+        embed = discord.Embed(title=f"🛫 Departures from {icao}", description=f"{where}📅 {d}", color=0x3498db)
         for f in flights[:12]:
             cs = (f.get("callsign") or "—").strip()
             arr = f.get("estArrivalAirport") or "?"
@@ -279,11 +643,10 @@ class Flight(commands.Cog):
         end = begin + 86400
         
         async with ctx.typing():
-            async with aiohttp.ClientSession() as s:
-                try:
-                    flights = await self.api.flights_aircraft(s, icao24, begin, end)
-                except Exception as e:
-                    return await ctx.send(f"❌ Error: {e}")
+            try:
+                flights = await self._flights("aircraft", icao24, begin, end)
+            except Exception as e:
+                return await ctx.send(f"❌ Error: {e}")
         
         if not flights or isinstance(flights, dict):
             return await ctx.send(f"❌ No flights for hex `{icao24}` on {d}")
@@ -296,11 +659,50 @@ class Flight(commands.Cog):
             embed.add_field(name=cs, value=f"{dep} → {arr}", inline=True)
         await ctx.send(embed=embed)
 
-    @commands.command(name="airports", help="List common airport codes")
-    async def airports(self, ctx):
-        embed = discord.Embed(title="🏢 Common Airport Codes", color=0x3498db)
-        codes = "\n".join([f"`{k}` - {v['name']} ({v['city']})" for k, v in AIRPORTS.items()])
-        embed.description = codes
+    @commands.command(name="airports", help="Find airport codes by name or city. Example: airports london")
+    async def airports(self, ctx, *, query: Optional[str] = None):
+        index = await self._airports()
+        if query:
+            found = index.search(query, 10)
+            if not found:
+                return await ctx.send(f"❌ No airports match `{query}`")
+            title = f"🏢 Airports matching \"{query}\""
+        else:
+            found = [index.get(code) for code in COMMON_AIRPORTS]
+            title = "🏢 Common Airport Codes"
+        embed = discord.Embed(title=title, color=0x3498db)
+        embed.description = "\n".join(
+            f"`{a.icao}`{f' / `{a.iata}`' if a.iata else ''} - {a.name} ({a.city or '?'}, {a.country})"
+            for a in found if a is not None
+        )
+        if not query:
+            embed.set_footer(text=f"{len(index):,} airports known • airports <name or city> to search")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="opensky", help="OpenSky API usage: latency, errors and remaining credits")
+    async def opensky(self, ctx):
+        stats = self.api.stats()
+        embed = discord.Embed(title="📡 OpenSky API", color=0x607d8b)
+        embed.add_field(name="Requests", value=f"{stats['requests']:,}", inline=True)
+        embed.add_field(name="Failures", value=f"{stats['failures']:,}", inline=True)
+        embed.add_field(name="Rate limited", value=f"{stats['rate_limited']:,}", inline=True)
+        latency = "—" if stats["latency_avg_ms"] is None else \
+            f"{stats['latency_avg_ms']:,.0f} ms avg / {stats['latency_p95_ms']:,.0f} ms p95"
+        embed.add_field(name="Latency", value=latency, inline=True)
+        credits = "—" if stats["credits_left"] is None else f"{stats['credits_left']:,}"
+        embed.add_field(name="Credits left", value=credits, inline=True)
+        embed.add_field(name="Account", value="authenticated" if stats["authenticated"] else "anonymous", inline=True)
+        cache = flight_cache.stats()
+        embed.add_field(name="Flight cache", inline=False, value=(
+            f"{cache['memory_hits']:,} memory / {cache['disk_hits']:,} disk hits, {cache['misses']:,} misses, "
+            f"{cache['rows']:,} windows stored"))
+        snapshot = self.states.snapshot
+        if snapshot is not None:
+            embed.add_field(name="Snapshot", inline=False, value=(
+                f"{len(snapshot):,} aircraft, {snapshot.age:.0f} s old, "
+                f"{snapshot.nbytes / 1e6:.1f} MB, {self.states.fetches:,} fetches"))
+        if stats["blocked_for"]:
+            embed.set_footer(text=f"Paused for {_fmt_wait(stats['blocked_for'])} by OpenSky's rate limit")
         await ctx.send(embed=embed)
 
 
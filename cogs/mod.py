@@ -10,31 +10,18 @@ import re
 import discord
 from discord.ext import commands
 
+from storage.guild_store import guild_store
+
 # ----------------------------
 # Config / Storage
 # ----------------------------
 STORAGE_DIR = Path("storage")
 STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-CONFIG_FILE = STORAGE_DIR / "guild_config.json"
 WARNS_FILE = STORAGE_DIR / "warnings.json"
 
-_guild_cfg = {}
 _warnings = {}
 
 
-def _load_cfg():
-    global _guild_cfg
-    if CONFIG_FILE.exists():
-        try:
-            _guild_cfg = json.loads(CONFIG_FILE.read_text("utf-8"))
-        except Exception:
-            _guild_cfg = {}
-
-
-def _save_cfg():
-    CONFIG_FILE.write_text(json.dumps(_guild_cfg, indent=2, ensure_ascii=False))
-
-
 def _load_warns():
     global _warnings
     if WARNS_FILE.exists():
@@ -49,37 +36,19 @@ def _save_warns():
 
 
 def get_prefix_for(guild_id: int, default: str = "$") -> str:
-    g = _guild_cfg.get(str(guild_id), {})
-    return g.get("prefix", default)
+    return guild_store.get_prefix(guild_id) or default
 
 
 def set_prefix_for(guild_id: int, prefix: str):
-    g = _guild_cfg.setdefault(str(guild_id), {})
-    g["prefix"] = prefix
-    _save_cfg()
-    # Also update prefixes.json for compatibility
-    try:
-        with open("storage/prefixes.json", "r") as f:
-            prefixes = json.load(f)
-    except:
-        prefixes = {}
-    prefixes[str(guild_id)] = prefix
-    with open("storage/prefixes.json", "w") as f:
-        json.dump(prefixes, f, indent=4)
+    guild_store.set_prefix(guild_id, prefix)
 
 
 def get_log_channel_id(guild_id: int) -> Optional[int]:
-    g = _guild_cfg.get(str(guild_id), {})
-    return g.get("log_channel_id")
+    return guild_store.get_log_channel_id(guild_id)
 
 
 def set_log_channel_id(guild_id: int, channel_id: Optional[int]):
-    g = _guild_cfg.setdefault(str(guild_id), {})
-    if channel_id is None:
-        g.pop("log_channel_id", None)
-    else:
-        g["log_channel_id"] = int(channel_id)
-    _save_cfg()
+    guild_store.set_log_channel_id(guild_id, channel_id)
 
 
 async def send_log(guild: discord.Guild, embed: discord.Embed):
@@ -134,7 +103,7 @@ class Moderation(commands.Cog):
 
     def __init__(self, client: commands.Bot):
         self.client = client
-        _load_cfg()
+        guild_store.open()
         _load_warns()
 
     @staticmethod
@@ -1,161 +1,63 @@
 # cogs/poker.py
-import json
-import os
 import asyncio
 import discord
-import requests
 import contextlib
 from io import BytesIO
-from PIL import Image
-from itertools import combinations
-from discord.ext import commands
+from discord.ext import commands, tasks
 from typing import Optional, Dict, List, Any
 
+from functionality import poker_eval, poker_equity, poker_pots
+from functionality.deck import Deck
+from functionality.card_images import card_images
+from storage.poker_bank import Bank, BankTransaction
+
 START_BANK = 1000
 SMALL_BLIND = 10
 BIG_BLIND = 20
+EQUITY_SAMPLES = 100_000
 POKER_FILE = "storage/poker.json"
-API = "https://www.deckofcardsapi.com/api/deck/"
+HOLE_HEIGHT = 200
+BOARD_HEIGHT = 180
 
 # ---------- persistence ----------
-def load_bank() -> Dict:
-    os.makedirs(os.path.dirname(POKER_FILE), exist_ok=True)
-    if not os.path.exists(POKER_FILE):
-        with open(POKER_FILE, "w") as f:
-            json.dump({}, f, indent=2)
-    with open(POKER_FILE, "r") as f:
-        try:
-            return json.load(f)
-        except Exception:
-            return {}
-
-
-def save_bank(data: Dict):
-    with open(POKER_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+bank = Bank(POKER_FILE, start=START_BANK)
+BANK_FLUSH_MINUTES = 5
 
 
 def get_balance(gid: int, uid: int) -> int:
-    data = load_bank()
-    g = data.setdefault(str(gid), {})
-    bal = g.get(str(uid), START_BANK)
-    g[str(uid)] = bal
-    save_bank(data)
-    return bal
+    return bank.balance(gid, uid)
 
 
 def add_balance(gid: int, uid: int, delta: int) -> int:
-    data = load_bank()
-    g = data.setdefault(str(gid), {})
-    bal = g.get(str(uid), START_BANK) + delta
-    g[str(uid)] = max(0, bal)
-    save_bank(data)
-    return g[str(uid)]
+    return bank.add(gid, uid, delta)
 
 
 # ---------- hand evaluation ----------
-RANK_ORDER = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '0': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14}
 RANK_NAME = {14: "Ace", 13: "King", 12: "Queen", 11: "Jack", 10: "Ten", 9: "Nine", 8: "Eight", 7: "Seven", 6: "Six", 5: "Five", 4: "Four", 3: "Three", 2: "Two"}
 SUIT_EMOJI = {'S': '♠️', 'H': '♥️', 'D': '♦️', 'C': '♣️'}
 RANK_DISPLAY = {'A': 'A', 'K': 'K', 'Q': 'Q', 'J': 'J', '0': '10', '9': '9', '8': '8', '7': '7', '6': '6', '5': '5', '4': '4', '3': '3', '2': '2'}
 
 
-def parse_card(code: str):
-    r, s = code[0], code[1]
-    return RANK_ORDER[r], s
-
-
 def card_to_str(code: str) -> str:
     """Convert card code to readable string like 'A♠️'"""
     r, s = code[0], code[1]
     return f"{RANK_DISPLAY.get(r, r)}{SUIT_EMOJI.get(s, s)}"
 
 
-def _straight_high(uniq_desc):
-    for i in range(len(uniq_desc) - 4):
-        seq = uniq_desc[i:i + 5]
-        if seq[0] - seq[4] == 4:
-            return True, seq[0]
-    if set([14, 5, 4, 3, 2]).issubset(set(uniq_desc)):
-        return True, 5
-    return False, 0
-
-
-def hand_rank_5(cards):
-    ranks = sorted((c[0] for c in cards), reverse=True)
-    suits = [c[1] for c in cards]
-    counts = {r: ranks.count(r) for r in set(ranks)}
-    by_count = sorted(counts.items(), key=lambda x: (x[1], x[0]), reverse=True)
-
-    flush_suit = None
-    for s in "SHDC":
-        if suits.count(s) == 5:
-            flush_suit = s
-            break
-
-    uniq = sorted(set(ranks), reverse=True)
-    straight, sh = _straight_high(uniq)
-
-    if flush_suit:
-        rs = sorted([c[0] for c in cards if c[1] == flush_suit], reverse=True)
-        u = sorted(set(rs), reverse=True)
-        sf, sfh = _straight_high(u)
-        if sf:
-            return (8, sfh)
-
-    kinds = sorted(counts.values(), reverse=True)
-    if kinds == [4, 1]:
-        quad = by_count[0][0]
-        kicker = max([r for r in ranks if r != quad])
-        return (7, quad, kicker)
-    if kinds == [3, 2]:
-        trips = by_count[0][0]
-        pair = by_count[1][0]
-        return (6, trips, pair)
-    if flush_suit:
-        return (5, ranks)
-    if straight:
-        return (4, sh)
-    if kinds == [3, 1, 1]:
-        trips = by_count[0][0]
-        kick = [r for r in ranks if r != trips][:2]
-        return (3, trips, kick)
-    if kinds == [2, 2, 1]:
-        p1, p2 = sorted([r for r, c in by_count if c == 2], reverse=True)
-        k = max([r for r in ranks if r not in (p1, p2)])
-        return (2, p1, p2, k)
-    if kinds == [2, 1, 1, 1]:
-        p = by_count[0][0]
-        kick = [r for r in ranks if r != p][:3]
-        return (1, p, kick)
-    return (0, ranks)
-
-
-def best_7(cards7):
-    best = None
-    for comb in combinations(cards7, 5):
-        val = hand_rank_5(comb)
-        if not best or val > best:
-            best = val
-    return best
-
-
-def codes_to_tuples(codes):
-    return [parse_card(c) for c in codes]
-
-
 def compare_hands(players_cards, board_codes):
-    board = codes_to_tuples(board_codes)
+    board = poker_eval.codes_to_ints(board_codes)
     scores = {}
     for uid, codes in players_cards.items():
-        seven = codes_to_tuples([c['code'] for c in codes]) + board
-        scores[uid] = best_7(seven)
+        seven = poker_eval.codes_to_ints([c['code'] for c in codes]) + board
+        scores[uid] = poker_eval.evaluate(seven)
     best = max(scores.values())
     winners = [uid for uid, v in scores.items() if v == best]
     return winners, scores
 
 
 def rank_to_text(rank_tuple) -> str:
+    if isinstance(rank_tuple, int):
+        rank_tuple = poker_eval.to_rank_tuple(rank_tuple)
     cat = rank_tuple[0]
     if cat == 8:
         return f"Straight Flush, high {RANK_NAME.get(rank_tuple[1], rank_tuple[1])}"
@@ -177,51 +79,28 @@ def rank_to_text(rank_tuple) -> str:
 
 
 # ---------- image helpers ----------
-def _fetch_img(url: str) -> Image.Image:
-    r = requests.get(url, timeout=12)
-    r.raise_for_status()
-    return Image.open(BytesIO(r.content)).convert("RGBA")
-
-
 def compose_cards_strip(card_objs: List[Dict], height: int = 200, pad: int = 8, bg=(34, 139, 34, 255)) -> Optional[BytesIO]:
     """Compose card images into a horizontal strip"""
-    imgs = []
-    for c in card_objs:
-        try:
-            im = _fetch_img(c["image"])
-            h = height
-            w = int(im.width * (h / im.height))
-            im = im.resize((w, h), Image.LANCZOS)
-            imgs.append(im)
-        except Exception:
-            pass
-    if not imgs:
-        return None
-    total_w = sum(im.width for im in imgs) + pad * (len(imgs) + 1)
-    canvas = Image.new("RGBA", (total_w, height + 2 * pad), bg)
-    x = pad
-    for im in imgs:
-        canvas.paste(im, (x, pad), im)
-        x += im.width + pad
-    out = BytesIO()
-    canvas.save(out, format="PNG")
-    out.seek(0)
-    return out
+    return card_images.strip(card_objs, height=height, pad=pad, bg=bg)
+
+
+async def compose_cards_strip_async(card_objs: List[Dict], height: int = 200, pad: int = 8, bg=(34, 139, 34, 255)) -> Optional[BytesIO]:
+    return await asyncio.to_thread(compose_cards_strip, card_objs, height, pad, bg)
 
 
 # ---------- UI Views ----------
 class CardRevealButton(discord.ui.Button):
     """Button that shows cards only to the player who clicks it"""
-    def __init__(self, poker_cog, player_id: int, label: str = "🃏 View My Cards"):
+    def __init__(self, table, player_id: int, label: str = "🃏 View My Cards"):
         super().__init__(style=discord.ButtonStyle.primary, label=label)
-        self.poker = poker_cog
+        self.table = table
         self.player_id = player_id
 
     async def callback(self, interaction: discord.Interaction):
         if interaction.user.id != self.player_id:
             return await interaction.response.send_message("❌ These aren't your cards!", ephemeral=True)
         
-        cards = self.poker.hole.get(self.player_id)
+        cards = self.table.hole.get(self.player_id)
         if not cards:
             return await interaction.response.send_message("No cards dealt yet.", ephemeral=True)
         
@@ -229,7 +108,7 @@ class CardRevealButton(discord.ui.Button):
         card_str = " | ".join([card_to_str(c['code']) for c in cards])
         
         # Try to create image
-        buf = compose_cards_strip(cards, height=200)
+        buf = await compose_cards_strip_async(cards, height=HOLE_HEIGHT)
         if buf:
             file = discord.File(buf, filename="mycards.png")
             emb = discord.Embed(
@@ -245,52 +124,59 @@ class CardRevealButton(discord.ui.Button):
 
 class HandStrengthButton(discord.ui.Button):
     """Button that shows current hand strength"""
-    def __init__(self, poker_cog, player_id: int):
+    def __init__(self, table, player_id: int):
         super().__init__(style=discord.ButtonStyle.secondary, label="📊 Hand Strength", row=1)
-        self.poker = poker_cog
+        self.table = table
         self.player_id = player_id
 
     async def callback(self, interaction: discord.Interaction):
         if interaction.user.id != self.player_id:
             return await interaction.response.send_message("❌ Not your hand!", ephemeral=True)
         
-        if self.player_id not in self.poker.in_hand:
+        if self.player_id not in self.table.in_hand:
             return await interaction.response.send_message("You're not in the hand.", ephemeral=True)
         
-        hole = self.poker.hole.get(self.player_id, [])
+        hole = self.table.hole.get(self.player_id, [])
         if not hole:
             return await interaction.response.send_message("No cards dealt.", ephemeral=True)
         
-        board_codes = [c["code"] for c in self.poker.board]
-        if not board_codes:
-            # Pre-flop - just show hole cards
-            card_str = " | ".join([card_to_str(c['code']) for c in hole])
-            return await interaction.response.send_message(
-                f"🎴 Your hole cards: **{card_str}**\n*Board not dealt yet - hand strength unknown*",
-                ephemeral=True
+        board_codes = [c["code"] for c in self.table.board]
+        hole_codes = [c['code'] for c in hole]
+        opponents = max(1, len(self.table.in_hand) - 1)
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        try:
+            eq = await poker_equity.equity_async(hole_codes, board_codes, opponents, EQUITY_SAMPLES)
+        except Exception as e:
+            print(f"Equity error: {e}")
+            eq = None
+
+        card_str = " | ".join([card_to_str(c) for c in hole_codes])
+        lines = [f"🎴 Your cards: **{card_str}**"]
+        if board_codes:
+            board_str = " ".join([card_to_str(c) for c in board_codes])
+            txt = rank_to_text(poker_eval.evaluate_codes(hole_codes + board_codes))
+            lines.append(f"📋 Board: **{board_str}**")
+            lines.append(f"💪 Best hand: **{txt}**")
+        if eq is not None:
+            if eq.exhaustive:
+                win, how = f"**{eq.win:.1%}**", "exact"
+            else:
+                win, how = f"~**{eq.win:.1%}** (±{eq.margin:.1%})", f"{eq.trials:,} simulations"
+            lines.append(
+                f"🎲 Equity vs {opponents} opponent{'s' if opponents != 1 else ''}: "
+                f"{win} win, {eq.tie:.1%} tie ({how})"
             )
-        
-        seven = codes_to_tuples([c['code'] for c in hole]) + codes_to_tuples(board_codes)
-        hand_rank = best_7(seven)
-        txt = rank_to_text(hand_rank)
-        
-        card_str = " | ".join([card_to_str(c['code']) for c in hole])
-        board_str = " ".join([card_to_str(c) for c in board_codes])
-        
-        await interaction.response.send_message(
-            f"🎴 Your cards: **{card_str}**\n"
-            f"📋 Board: **{board_str}**\n"
-            f"💪 Best hand: **{txt}**",
-            ephemeral=True
-        )
+
+        await interaction.followup.send("\n".join(lines), ephemeral=True)
 
 
 class PlayerCardsView(discord.ui.View):
     """View with buttons for a specific player"""
-    def __init__(self, poker_cog, player_id: int, timeout: float = 300):
+    def __init__(self, table, player_id: int, timeout: float = 300):
         super().__init__(timeout=timeout)
-        self.add_item(CardRevealButton(poker_cog, player_id))
-        self.add_item(HandStrengthButton(poker_cog, player_id))
+        self.add_item(CardRevealButton(table, player_id))
+        self.add_item(HandStrengthButton(table, player_id))
 
 
 class ActionButton(discord.ui.Button):
@@ -365,31 +251,51 @@ class RaiseModal(discord.ui.Modal):
         await interaction.response.defer()
 
 
-# ---------- Main Cog ----------
-class Poker(commands.Cog):
-    """Texas Hold'em Poker - Play in chat with friends!"""
+# ---------- Table sessions ----------
+class TableSession:
+    """One poker table: its players, cards, pot and game task.
 
-    def __init__(self, bot):
+    Tables are keyed by channel, so every channel can run its own game
+    independently of the others.
+    """
+
+    def __init__(self, bot, channel_id: int, guild_id: int, host_id: int, deck_seed: Optional[int] = None):
         self.bot = bot
-        self.active = False
-        self.msg_id = None
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.host_id = host_id
+        self.active = True
+        self.msg_id: Optional[int] = None
         self.players: List[discord.Member] = []
         self.dealer = 0
-        self.deck_id = None
+        self.deck: Optional[Deck] = None
+        self.deck_seed = deck_seed  # set for reproducible hands
         self.hole: Dict[int, List[Dict]] = {}
         self.board: List[Dict] = []
         self.in_hand: set = set()
-        self.bets: Dict[int, int] = {}
+        self.bets: Dict[int, int] = {}       # this street
+        self.contrib: Dict[int, int] = {}    # whole hand, for side pots
+        self.all_in: set = set()
         self.pot = 0
         self.current_bet = 0
+        self.tx: Optional[BankTransaction] = None
+        self.task: Optional[asyncio.Task] = None
 
     def new_deck(self):
-        j = requests.get(f"{API}new/shuffle/?deck_count=1", timeout=10).json()
-        self.deck_id = j["deck_id"]
+        self.deck = Deck(seed=self.deck_seed)
 
     def draw(self, n: int) -> List[Dict]:
-        j = requests.get(f"{API}{self.deck_id}/draw/?count={n}", timeout=10).json()
-        return j["cards"]
+        return self.deck.draw(n)
+
+    def put_in(self, pid: int, amount: int) -> int:
+        """Move up to ``amount`` from a player's balance into the pot"""
+        taken = self.tx.debit(pid, amount)
+        self.bets[pid] += taken
+        self.contrib[pid] = self.contrib.get(pid, 0) + taken
+        self.pot += taken
+        if self.tx.balance(pid) <= 0:
+            self.all_in.add(pid)
+        return taken
 
     async def post_board_image(self, ctx, label: str):
         """Post the community cards"""
@@ -397,7 +303,7 @@ class Poker(commands.Cog):
             return
         
         board_str = " ".join([card_to_str(c['code']) for c in self.board])
-        buf = compose_cards_strip(self.board, height=180, bg=(0, 100, 0, 255))
+        buf = await compose_cards_strip_async(self.board, height=BOARD_HEIGHT, bg=(0, 100, 0, 255))
         
         if buf:
             file = discord.File(buf, filename="board.png")
@@ -416,132 +322,14 @@ class Poker(commands.Cog):
         view = PlayerCardsView(self, player.id)
         await ctx.send(f"🎴 {player.mention} - Click to view your cards!", view=view)
 
-    @commands.command(help="Check your poker balance")
-    async def balance(self, ctx, member: discord.Member = None):
-        """Check poker balance"""
-        member = member or ctx.author
-        if ctx.guild is None:
-            return await ctx.send("Use this in a server.")
-        
-        bal = get_balance(ctx.guild.id, member.id)
-        emb = discord.Embed(
-            title="💰 Poker Balance",
-            description=f"{member.display_name}: **${bal}**",
-            color=0xffd700
-        )
-        await ctx.send(embed=emb)
-
-    @commands.command(help="Give money to a player (Admin only)")
-    @commands.has_permissions(administrator=True)
-    async def give_money(self, ctx, target: discord.Member, amount: int):
-        """Admin command to give poker money"""
-        if ctx.guild is None:
-            return await ctx.send("Use this in a server.")
-        if amount <= 0:
-            return await ctx.send("Amount must be positive.")
-        
-        new_bal = add_balance(ctx.guild.id, target.id, amount)
-        await ctx.send(f"💵 Gave **${amount}** to {target.display_name}. New balance: **${new_bal}**")
-
-    @commands.command(help="Start a Texas Hold'em poker game!")
-    async def poker(self, ctx):
-        """Start a poker game - react ♠️ to join!"""
-        if self.active:
-            return await ctx.send("⚠️ A poker game is already running!")
-        
-        if ctx.guild is None:
-            return await ctx.send("Poker must be played in a server.")
-        
-        self.active = True
-        self.players = []
-        self.dealer = 0
-
-        emb = discord.Embed(
-            title="🎰 Texas Hold'em Poker",
-            description=(
-                "**How to play:**\n"
-                "• React ♠️ to join the game\n"
-                "• Host clicks ✅ to start\n"
-                "• Click ❌ to cancel\n\n"
-                f"💵 Starting balance: ${START_BANK}\n"
-                f"💰 Blinds: ${SMALL_BLIND}/${BIG_BLIND}"
-            ),
-            color=0x2f7d5c
-        )
-        emb.set_footer(text=f"Started by {ctx.author.display_name}")
-        
-        m = await ctx.send(embed=emb)
-        self.msg_id = m.id
-        
-        for em in ['♠️', '✅', '❌']:
-            await m.add_reaction(em)
-
-        def check(r, u):
-            return u == ctx.author and str(r.emoji) in ['✅', '❌'] and r.message.id == m.id
-
-        while True:
-            try:
-                r, _ = await self.bot.wait_for("reaction_add", timeout=180, check=check)
-                emo = str(r.emoji)
-                
-                if emo == '❌':
-                    self.active = False
-                    self.players = []
-                    with contextlib.suppress(Exception):
-                        await m.delete()
-                    return await ctx.send("🚫 Game cancelled.")
-                
-                if emo == '✅':
-                    with contextlib.suppress(Exception):
-                        await m.delete()
-                    if len(self.players) < 2:
-                        self.active = False
-                        return await ctx.send("❌ Need at least 2 players to start!")
-                    break
-                    
-            except asyncio.TimeoutError:
-                self.active = False
-                self.players = []
-                with contextlib.suppress(Exception):
-                    await m.delete()
-                return await ctx.send("⏰ Timed out. Game cancelled.")
-
-        await self.play_loop(ctx)
-
-    @commands.Cog.listener()
-    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
-        if not self.active or payload.user_id == self.bot.user.id:
-            return
-        if self.msg_id is None or payload.message_id != self.msg_id:
-            return
-        if str(payload.emoji) != '♠️':
-            return
-        
-        guild = self.bot.get_guild(payload.guild_id)
-        if not guild:
-            return
-        
-        member = guild.get_member(payload.user_id)
-        if not member or member.bot:
-            return
-        
-        if member in self.players:
-            ch = self.bot.get_channel(payload.channel_id)
-            if ch:
-                await ch.send(f"⚠️ {member.display_name} already joined!")
-            return
-        
-        self.players.append(member)
-        bal = get_balance(guild.id, member.id)
-        ch = self.bot.get_channel(payload.channel_id)
-        if ch:
-            await ch.send(f"✅ **{member.display_name}** joined! (Balance: ${bal})")
-
     async def play_loop(self, ctx):
         """Main game loop"""
         while self.active and len([p for p in self.players if get_balance(ctx.guild.id, p.id) > 0]) >= 2:
             self.players = [p for p in self.players if get_balance(ctx.guild.id, p.id) > 0]
-            await self.play_hand(ctx)
+            # Every chip movement in the hand is one journaled commit
+            with bank.transaction(ctx.guild.id) as self.tx:
+                await self.play_hand(ctx)
+            self.tx = None
 
             # Ask to continue
             emb = discord.Embed(
@@ -589,11 +377,12 @@ class Poker(commands.Cog):
 
     async def play_hand(self, ctx):
         """Play a single hand of poker"""
-        gid = ctx.guild.id
         self.in_hand = set(p.id for p in self.players)
         self.hole = {}
         self.board = []
         self.bets = {p.id: 0 for p in self.players}
+        self.contrib = {}
+        self.all_in = set()
         self.pot = 0
         self.current_bet = 0
 
@@ -618,13 +407,8 @@ class Poker(commands.Cog):
         await ctx.send(embed=emb)
 
         # Collect blinds
-        add_balance(gid, sb.id, -SMALL_BLIND)
-        self.bets[sb.id] = SMALL_BLIND
-        self.pot += SMALL_BLIND
-
-        add_balance(gid, bb.id, -BIG_BLIND)
-        self.bets[bb.id] = BIG_BLIND
-        self.pot += BIG_BLIND
+        self.put_in(sb.id, SMALL_BLIND)
+        self.put_in(bb.id, BIG_BLIND)
         self.current_bet = BIG_BLIND
 
         # Deal hole cards
@@ -677,7 +461,7 @@ class Poker(commands.Cog):
         
         winner_id = list(self.in_hand)[0]
         winner = discord.utils.get(self.players, id=winner_id)
-        add_balance(ctx.guild.id, winner_id, self.pot)
+        self.tx.credit(winner_id, self.pot)
         
         emb = discord.Embed(
             title="🏆 Winner!",
@@ -693,13 +477,20 @@ class Poker(commands.Cog):
         self.current_bet = round_current
         acted_since_raise = set()
 
+        def settled() -> bool:
+            # all-in players can't act, everyone else must have matched the bet
+            acting = self.in_hand - self.all_in
+            if len(self.in_hand) < 2 or not acting:
+                return True
+            if all(self.bets[uid] == round_current for uid in acting):
+                return len(acting) == 1 or acted_since_raise.issuperset(acting)
+            return False
+
         if len(self.in_hand) < 2:
             return
 
         while True:
-            all_match = all((uid not in self.in_hand) or (self.bets[uid] == round_current) for uid in self.bets)
-            everyone_acted = acted_since_raise.issuperset(self.in_hand)
-            if all_match and everyone_acted:
+            if settled():
                 break
 
             for i in range(len(self.players)):
@@ -707,17 +498,15 @@ class Poker(commands.Cog):
                 p = self.players[idx]
                 pid = p.id
 
-                if pid not in self.in_hand:
+                if pid not in self.in_hand or pid in self.all_in:
                     continue
 
-                bal = get_balance(ctx.guild.id, pid)
+                bal = self.tx.balance(pid)
                 if bal <= 0:
-                    self.in_hand.discard(pid)
+                    self.all_in.add(pid)
                     continue
 
-                all_match = all((uid not in self.in_hand) or (self.bets[uid] == round_current) for uid in self.bets)
-                everyone_acted = acted_since_raise.issuperset(self.in_hand)
-                if all_match and everyone_acted:
+                if settled():
                     break
 
                 need = round_current - self.bets[pid]
@@ -769,19 +558,13 @@ class Poker(commands.Cog):
                     continue
 
                 if action == "call":
-                    call_amt = min(need, bal)
-                    add_balance(ctx.guild.id, pid, -call_amt)
-                    self.bets[pid] += call_amt
-                    self.pot += call_amt
+                    call_amt = self.put_in(pid, min(need, bal))
                     await ctx.send(f"📞 {p.display_name} calls ${call_amt}.")
                     acted_since_raise.add(pid)
                     continue
 
                 if action == "allin":
-                    shove = bal
-                    add_balance(ctx.guild.id, pid, -shove)
-                    self.bets[pid] += shove
-                    self.pot += shove
+                    shove = self.put_in(pid, bal)
                     if self.bets[pid] > round_current:
                         round_current = self.bets[pid]
                         self.current_bet = round_current
@@ -817,10 +600,7 @@ class Poker(commands.Cog):
                         await msg.delete()
                     
                     addl = total - self.bets[pid]
-                    addl = min(addl, bal)
-                    add_balance(ctx.guild.id, pid, -addl)
-                    self.bets[pid] += addl
-                    self.pot += addl
+                    self.put_in(pid, min(addl, bal))
 
                     if self.bets[pid] > round_current:
                         round_current = self.bets[pid]
@@ -835,11 +615,13 @@ class Poker(commands.Cog):
         self.bets = {uid: 0 for uid in self.bets}
 
     async def showdown(self, ctx):
-        """Handle showdown"""
+        """Handle showdown, settling the main pot and any side pots"""
         board_codes = [c['code'] for c in self.board]
         pool = {uid: self.hole[uid] for uid in self.in_hand}
-        winners, scores = compare_hands(pool, board_codes)
-        share = self.pot // len(winners) if winners else 0
+        _, scores = compare_hands(pool, board_codes)
+        n = len(self.players)
+        order = [self.players[(self.dealer + 1 + i) % n].id for i in range(n)]
+        payouts, results = poker_pots.settle(self.contrib, scores, order)
 
         # Show board
         await self.post_board_image(ctx, "Final Board")
@@ -852,7 +634,7 @@ class Poker(commands.Cog):
                 cards = self.hole[p.id]
                 card_str = " | ".join([card_to_str(c['code']) for c in cards])
                 hand_name = rank_to_text(scores[p.id])
-                is_winner = p.id in winners
+                is_winner = payouts.get(p.id, 0) > 0
                 
                 emb.add_field(
                     name=f"{'🏆 ' if is_winner else ''}{p.display_name}",
@@ -862,20 +644,202 @@ class Poker(commands.Cog):
 
         await ctx.send(embed=emb)
 
-        # Award pot
-        winner_names = []
-        for uid in winners:
-            add_balance(ctx.guild.id, uid, share)
-            member = discord.utils.get(self.players, id=uid)
-            winner_names.append(member.display_name)
+        # Award pots
+        for uid, amount in payouts.items():
+            self.tx.credit(uid, amount)
+
+        def names(uids):
+            return ", ".join(discord.utils.get(self.players, id=u).display_name for u in uids)
+
+        lines = []
+        for i, (pot, winners) in enumerate(results):
+            label = "Main pot" if i == 0 else f"Side pot {i}"
+            lines.append(f"**{label}** (${pot.amount}): {names(winners)}")
+        won = sorted(payouts.items(), key=lambda x: x[1], reverse=True)
+        lines.append("")
+        lines += [f"💵 **{names([uid])}** +${amount}" for uid, amount in won]
 
         emb = discord.Embed(
             title="🏆 Winner(s)!",
-            description=f"**{', '.join(winner_names)}** win{'s' if len(winners) == 1 else ''} **${share}** each!",
+            description="\n".join(lines),
+            color=0xffd700
+        )
+        await ctx.send(embed=emb)
+
+
+# ---------- Main Cog ----------
+class Poker(commands.Cog):
+    """Texas Hold'em Poker - Play in chat with friends!"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.tables: Dict[int, TableSession] = {}        # channel id -> table
+        self._join_index: Dict[int, TableSession] = {}   # lobby message id -> table
+        bank.load()
+        self.flush_bank.start()
+
+    async def cog_load(self):
+        # Build the evaluator tables off the event loop
+        await asyncio.to_thread(poker_eval.warm)
+        # Card faces may need a first-run download, don't hold up startup
+        self._card_warm = asyncio.create_task(asyncio.to_thread(card_images.load_all, (HOLE_HEIGHT, BOARD_HEIGHT)))
+
+    async def cog_unload(self):
+        for table in list(self.tables.values()):
+            if table.task:
+                table.task.cancel()
+        self.flush_bank.cancel()
+        await asyncio.to_thread(bank.flush)
+        poker_equity.shutdown_pool()
+
+    @tasks.loop(minutes=BANK_FLUSH_MINUTES)
+    async def flush_bank(self):
+        await asyncio.to_thread(bank.flush)
+
+    @commands.command(help="Check your poker balance")
+    async def balance(self, ctx, member: discord.Member = None):
+        """Check poker balance"""
+        member = member or ctx.author
+        if ctx.guild is None:
+            return await ctx.send("Use this in a server.")
+        
+        bal = get_balance(ctx.guild.id, member.id)
+        emb = discord.Embed(
+            title="💰 Poker Balance",
+            description=f"{member.display_name}: **${bal}**",
             color=0xffd700
         )
         await ctx.send(embed=emb)
 
+    @commands.command(help="Give money to a player (Admin only)")
+    @commands.has_permissions(administrator=True)
+    async def give_money(self, ctx, target: discord.Member, amount: int):
+        """Admin command to give poker money"""
+        if ctx.guild is None:
+            return await ctx.send("Use this in a server.")
+        if amount <= 0:
+            return await ctx.send("Amount must be positive.")
+        
+        new_bal = add_balance(ctx.guild.id, target.id, amount)
+        await ctx.send(f"💵 Gave **${amount}** to {target.display_name}. New balance: **${new_bal}**")
+
+    @commands.command(help="Start a Texas Hold'em poker game!")
+    async def poker(self, ctx):
+        """Start a poker game - react ♠️ to join!"""
+        if ctx.guild is None:
+            return await ctx.send("Poker must be played in a server.")
+
+        if ctx.channel.id in self.tables:
+            return await ctx.send("⚠️ A poker game is already running in this channel!")
+
+        table = TableSession(self.bot, ctx.channel.id, ctx.guild.id, ctx.author.id)
+        self.tables[ctx.channel.id] = table
+        table.task = asyncio.create_task(self._run_table(ctx, table))
+
+    async def _run_table(self, ctx, table: TableSession):
+        """Lobby then game loop for one table, always unregistering it"""
+        try:
+            if await self._lobby(ctx, table):
+                await table.play_loop(ctx)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Poker table {table.channel_id} crashed: {e}")
+            with contextlib.suppress(Exception):
+                await ctx.send("❌ The poker game hit an error and was stopped.")
+        finally:
+            table.active = False
+            self._join_index.pop(table.msg_id, None)
+            self.tables.pop(table.channel_id, None)
+
+    async def _lobby(self, ctx, table: TableSession) -> bool:
+        """Collect players; True once the host starts with 2+ players"""
+        emb = discord.Embed(
+            title="🎰 Texas Hold'em Poker",
+            description=(
+                "**How to play:**\n"
+                "• React ♠️ to join the game\n"
+                "• Host clicks ✅ to start\n"
+                "• Click ❌ to cancel\n\n"
+                f"💵 Starting balance: ${START_BANK}\n"
+                f"💰 Blinds: ${SMALL_BLIND}/${BIG_BLIND}"
+            ),
+            color=0x2f7d5c
+        )
+        emb.set_footer(text=f"Started by {ctx.author.display_name}")
+        
+        m = await ctx.send(embed=emb)
+        table.msg_id = m.id
+        self._join_index[m.id] = table
+        
+        for em in ['♠️', '✅', '❌']:
+            await m.add_reaction(em)
+
+        def check(r, u):
+            return u == ctx.author and str(r.emoji) in ['✅', '❌'] and r.message.id == m.id
+
+        while True:
+            try:
+                r, _ = await self.bot.wait_for("reaction_add", timeout=180, check=check)
+                emo = str(r.emoji)
+                
+                if emo == '❌':
+                    table.active = False
+                    table.players = []
+                    with contextlib.suppress(Exception):
+                        await m.delete()
+                    await ctx.send("🚫 Game cancelled.")
+                    return False
+                
+                if emo == '✅':
+                    with contextlib.suppress(Exception):
+                        await m.delete()
+                    if len(table.players) < 2:
+                        table.active = False
+                        await ctx.send("❌ Need at least 2 players to start!")
+                        return False
+                    break
+                    
+            except asyncio.TimeoutError:
+                table.active = False
+                table.players = []
+                with contextlib.suppress(Exception):
+                    await m.delete()
+                await ctx.send("⏰ Timed out. Game cancelled.")
+                return False
+
+        # The lobby is closed, later ♠️ reactions shouldn't add players
+        self._join_index.pop(m.id, None)
+        return True
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        table = self._join_index.get(payload.message_id)
+        if table is None or not table.active or payload.user_id == self.bot.user.id:
+            return
+        if str(payload.emoji) != '♠️':
+            return
+        
+        guild = self.bot.get_guild(payload.guild_id)
+        if not guild:
+            return
+        
+        member = guild.get_member(payload.user_id)
+        if not member or member.bot:
+            return
+        
+        if member in table.players:
+            ch = self.bot.get_channel(payload.channel_id)
+            if ch:
+                await ch.send(f"⚠️ {member.display_name} already joined!")
+            return
+        
+        table.players.append(member)
+        bal = get_balance(guild.id, member.id)
+        ch = self.bot.get_channel(payload.channel_id)
+        if ch:
+            await ch.send(f"✅ **{member.display_name}** joined! (Balance: ${bal})")
+
 
 async def setup(bot):
     await bot.add_cog(Poker(bot))
\ No newline at end of file
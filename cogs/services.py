@@ -137,7 +137,7 @@ class Api(commands.Cog, name="Api"):
     @commands.command(help="Get an insult", aliases=['i'])
     async def insult(self, ctx, member: discord.Member = None):
         try:
-            quote = funcs.get_insult()
+            quote = await funcs.get_insult()
             if member:
                 await ctx.send(f"{member.mention}, {quote}")
             else:
@@ -148,7 +148,7 @@ class Api(commands.Cog, name="Api"):
     @commands.command(help="Get a compliment", aliases=['c'])
     async def compliment(self, ctx, member: discord.Member = None):
         try:
-            quote = funcs.get_compliment()
+            quote = await funcs.get_compliment()
             if member:
                 await ctx.send(f"{member.mention}, {quote}")
             else:
@@ -159,7 +159,7 @@ class Api(commands.Cog, name="Api"):
     @commands.command(help="Get a pickup line", aliases=['p'])
     async def pickup(self, ctx, member: discord.Member = None):
         try:
-            quote = funcs.get_pickup()
+            quote = await funcs.get_pickup()
             target = f"Hey {member.mention}, " if member else ""
             await ctx.send(f"💕 {target}{quote}")
         except:
@@ -168,7 +168,7 @@ class Api(commands.Cog, name="Api"):
     @commands.command(help="Get a joke", aliases=['j'])
     async def joke(self, ctx):
         try:
-            joke = funcs.get_joke()
+            joke = await funcs.get_joke()
             embed = discord.Embed(
                 title=f"{joke['category']} Joke",
                 description=f"{joke['setup']}\n\n||{joke['delivery']}||",
@@ -1,47 +1,32 @@
 # cogs/translate.py
 import discord
 from discord.ext import commands
-from googletrans import Translator, LANGUAGES
 from typing import Dict, Optional
 import asyncio
 
-# Flag emoji to language code mapping
-FLAG_LANG_MAP: Dict[str, str] = {
-    "🇺🇸": "en", "🇬🇧": "en",
-    "🇩🇪": "de",
-    "🇫🇷": "fr",
-    "🇪🇸": "es", "🇲🇽": "es",
-    "🇮🇹": "it",
-    "🇵🇹": "pt", "🇧🇷": "pt",
-    "🇷🇺": "ru",
-    "🇨🇳": "zh-cn", "🇹🇼": "zh-tw",
-    "🇯🇵": "ja",
-    "🇰🇷": "ko",
-    "🇸🇦": "ar", "🇦🇪": "ar",
-    "🇮🇳": "hi",
-    "🇳🇱": "nl",
-    "🇵🇱": "pl",
-    "🇹🇷": "tr",
-    "🇻🇳": "vi",
-    "🇹🇭": "th",
-    "🇮🇩": "id",
-    "🇬🇷": "el",
-    "🇨🇿": "cs",
-    "🇷🇴": "ro",
-    "🇭🇺": "hu",
-    "🇸🇪": "sv",
-    "🇩🇰": "da",
-    "🇳🇴": "no",
-    "🇫🇮": "fi",
-    "🇺🇦": "uk",
-    "🇮🇱": "he",
-    "🇮🇪": "ga",
-    "🇵🇭": "tl",
-    "🇿🇦": "af",
-}
-
-# Reverse map for language name lookup
-LANG_NAMES = {v: k for k, v in LANGUAGES.items()}
+from functionality.translation import TranslationService, text_key
+from functionality.ttl_cache import GuildLRU, TTLCache
+from functionality.langid import langid, same_language
+from functionality.languages import FLAG_LANG_MAP, languages
+
+FANOUT_DEBOUNCE = 1.5    # seconds to collect more flags before translating
+FANOUT_TTL = 15 * 60     # later flags keep editing the same embed for this long
+EMBED_BUDGET = 5500      # Discord caps a whole embed at 6000 characters
+SKIP_CONFIDENCE = 0.9    # local detection this sure of the source language skips the API
+
+
+class _FanOut:
+    """Flag translations of one message, posted as a single embed"""
+
+    def __init__(self, guild_id: int, channel_id: int, message_id: int):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.pending: Dict[str, None] = {}   # ordered set of languages to add
+        self.results: Dict[str, dict] = {}
+        self.message: Optional[discord.Message] = None
+        self.reply: Optional[discord.Message] = None
+        self.task: Optional[asyncio.Task] = None
 
 
 class Translation(commands.Cog, name="Translation"):
@@ -49,28 +34,43 @@ class Translation(commands.Cog, name="Translation"):
 
     def __init__(self, client):
         self.client = client
-        self.translator = Translator()
-        # Cache of recently translated messages to avoid duplicates
-        self._translated_cache: Dict[tuple, str] = {}
+        # Results are cached once, in the per-guild LRU below, not in the service too
+        self.translator = TranslationService(cache_size=0)
+        # Per-guild LRU shared by the command and flag reactions:
+        # ("text", hash, src, dest) -> result, ("msg", message id, dest) -> already posted
+        self._translated_cache = GuildLRU()
+        self._fanouts = TTLCache(maxsize=500, ttl=FANOUT_TTL)  # message id -> _FanOut
+
+    async def cog_load(self):
+        await asyncio.to_thread(langid.load)
+
+    async def cog_unload(self):
+        for fan in self._fanouts.values():
+            if fan.task is not None:
+                fan.task.cancel()
+        self.translator.close()
 
     def _get_language_name(self, code: str) -> str:
         """Get full language name from code"""
-        code = code.lower()
-        if code in LANGUAGES:
-            return LANGUAGES[code].capitalize()
-        return code.upper()
+        return languages.display_name(code)
 
-    async def _translate_text(self, text: str, dest: str, src: str = 'auto') -> Optional[dict]:
+    async def _translate_text(self, text: str, dest: str, src: str = 'auto', guild_id: int = 0) -> Optional[dict]:
         """Translate text and return result dict"""
+        key = ("text", text_key(text), src, dest)
+        cached = self._translated_cache.get(guild_id, key)
+        if cached is not None:
+            return cached
         try:
-            result = self.translator.translate(text, dest=dest, src=src)
-            return {
-                'text': result.text,
-                'src': result.src,
-                'dest': result.dest,
-                'src_name': self._get_language_name(result.src),
-                'dest_name': self._get_language_name(result.dest)
+            result = await self.translator.translate(text, dest=dest, src=src)
+            result = {
+                'text': result['text'],
+                'src': result['src'],
+                'dest': result['dest'],
+                'src_name': self._get_language_name(result['src']),
+                'dest_name': self._get_language_name(result['dest'])
             }
+            self._translated_cache.put(guild_id, key, result)
+            return result
         except Exception as e:
             print(f"Translation error: {e}")
             return None
@@ -84,29 +84,19 @@ class Translation(commands.Cog, name="Translation"):
         Example: translate spanish Hello, how are you?
         Example: translate ja Good morning!
         
-        You can use language names (spanish, french) or codes (es, fr, ja)
+        You can use language names (spanish, french), codes (es, fr, ja),
+        partial names (portu), common aliases (chinese, farsi) or a flag emoji
         """
         # Resolve language code
-        lang_code = language_to.lower()
-        
-        # Check if it's a language name
-        if lang_code in LANGUAGES.values():
-            # It's already a valid name, find the code
-            for code, name in LANGUAGES.items():
-                if name == lang_code:
-                    lang_code = code
-                    break
-        elif lang_code not in LANGUAGES:
-            # Try to find by partial match
-            matches = [code for code, name in LANGUAGES.items() if lang_code in name.lower()]
-            if matches:
-                lang_code = matches[0]
-            else:
-                await ctx.send(f"❌ Unknown language: `{language_to}`\nUse `languages` to see available languages.")
-                return
+        lang_code = languages.resolve(language_to)
+        if lang_code is None:
+            hint = ", ".join(f"`{c}` {self._get_language_name(c)}" for c in languages.suggest(language_to, 3))
+            hint = f"\nDid you mean: {hint}" if hint else ""
+            await ctx.send(f"❌ Unknown language: `{language_to}`{hint}\nUse `languages` to see available languages.")
+            return
 
         async with ctx.typing():
-            result = await self._translate_text(text_to_translate, lang_code)
+            result = await self._translate_text(text_to_translate, lang_code, guild_id=ctx.guild.id if ctx.guild else 0)
 
         if result is None:
             await ctx.send("❌ Translation failed. Please try again.")
@@ -134,7 +124,7 @@ class Translation(commands.Cog, name="Translation"):
     async def list_languages(self, ctx):
         """List all supported languages for translation"""
         # Group languages alphabetically
-        lang_list = sorted(LANGUAGES.items(), key=lambda x: x[1])
+        lang_list = languages.sorted
         
         # Create pages
         per_page = 30
@@ -150,7 +140,7 @@ class Translation(commands.Cog, name="Translation"):
             description=pages[0],
             color=0x3498db
         )
-        embed.set_footer(text=f"Page 1/{len(pages)} • {len(LANGUAGES)} languages")
+        embed.set_footer(text=f"Page 1/{len(pages)} • {len(lang_list)} languages")
         
         if len(pages) == 1:
             await ctx.send(embed=embed)
@@ -175,7 +165,7 @@ class Translation(commands.Cog, name="Translation"):
                     current_page = (current_page - 1) % len(pages)
 
                 embed.description = pages[current_page]
-                embed.set_footer(text=f"Page {current_page + 1}/{len(pages)} • {len(LANGUAGES)} languages")
+                embed.set_footer(text=f"Page {current_page + 1}/{len(pages)} • {len(lang_list)} languages")
                 await msg.edit(embed=embed)
                 
                 try:
@@ -194,18 +184,27 @@ class Translation(commands.Cog, name="Translation"):
     async def detect_language(self, ctx, *, text: str):
         """Detect the language of text"""
         try:
-            detected = self.translator.detect(text)
-            lang_name = self._get_language_name(detected.lang)
-            confidence = detected.confidence if hasattr(detected, 'confidence') and detected.confidence else "N/A"
+            ranked = langid.rank(text, 3)
+            if ranked:
+                detected_lang, confidence = ranked[0]
+            else:
+                # too little text for the local profiles, ask the API
+                detected = await self.translator.detect(text)
+                detected_lang = detected.lang
+                confidence = detected.confidence if hasattr(detected, 'confidence') and detected.confidence else "N/A"
+            lang_name = self._get_language_name(detected_lang)
             
             embed = discord.Embed(
                 title="🔍 Language Detection",
                 color=0x3498db
             )
             embed.add_field(name="Text", value=text[:500], inline=False)
-            embed.add_field(name="Detected Language", value=f"{lang_name} (`{detected.lang}`)", inline=True)
+            embed.add_field(name="Detected Language", value=f"{lang_name} (`{detected_lang}`)", inline=True)
             if confidence != "N/A":
                 embed.add_field(name="Confidence", value=f"{confidence:.1%}", inline=True)
+            others = [f"{self._get_language_name(d.lang)} {d.confidence:.1%}" for d in ranked[1:] if d.confidence >= 0.01]
+            if others:
+                embed.add_field(name="Also possible", value=", ".join(others), inline=False)
             
             await ctx.send(embed=embed)
         except Exception as e:
@@ -219,73 +218,105 @@ class Translation(commands.Cog, name="Translation"):
             return
 
         # Check if it's a flag emoji we support
-        emoji_str = str(payload.emoji)
-        if emoji_str not in FLAG_LANG_MAP:
+        target_lang = FLAG_LANG_MAP.get(str(payload.emoji))
+        if target_lang is None:
             return
 
-        # Get the channel and message
-        try:
-            channel = self.client.get_channel(payload.channel_id)
-            if channel is None:
-                channel = await self.client.fetch_channel(payload.channel_id)
-            
-            message = await channel.fetch_message(payload.message_id)
-        except Exception:
+        # Skip messages already translated (or being translated) to this language,
+        # before spending an API call on fetching the message
+        guild_id = payload.guild_id or 0
+        seen_key = ("msg", payload.message_id, target_lang)
+        if (guild_id, seen_key) in self._translated_cache:
             return
+        self._translated_cache.put(guild_id, seen_key, True)
 
-        # Don't translate empty messages or bot messages
-        if not message.content or message.author.bot:
-            return
+        # Batch with other flags on the same message
+        fan = self._fanouts.get(payload.message_id)
+        if fan is None:
+            fan = _FanOut(guild_id, payload.channel_id, payload.message_id)
+            self._fanouts.put(payload.message_id, fan)
+        fan.pending[target_lang] = None
+        if fan.task is None or fan.task.done():
+            fan.task = asyncio.create_task(self._run_fanout(fan))
 
-        # Check cache to avoid duplicate translations
-        cache_key = (message.id, FLAG_LANG_MAP[emoji_str])
-        if cache_key in self._translated_cache:
-            return
+    async def _run_fanout(self, fan: _FanOut):
+        """Translate every pending language concurrently and post/edit one embed"""
+        while fan.pending:
+            await asyncio.sleep(FANOUT_DEBOUNCE)
+            langs, fan.pending = list(fan.pending), {}
 
-        # Get target language
-        target_lang = FLAG_LANG_MAP[emoji_str]
-        
-        # Translate
-        result = await self._translate_text(message.content, target_lang)
-        
-        if result is None:
-            return
+            try:
+                if fan.message is None:
+                    channel = self.client.get_channel(fan.channel_id)
+                    if channel is None:
+                        channel = await self.client.fetch_channel(fan.channel_id)
+                    fan.message = await channel.fetch_message(fan.message_id)
+            except Exception:
+                for lang in langs:
+                    self._translated_cache.pop(fan.guild_id, ("msg", fan.message_id, lang))
+                continue
 
-        # Don't translate if same language
-        if result['src'].lower() == result['dest'].lower():
-            return
+            message = fan.message
+            # Don't translate empty messages or bot messages
+            if not message.content or message.author.bot:
+                return
 
-        # Cache the translation
-        self._translated_cache[cache_key] = result['text']
-        
-        # Limit cache size
-        if len(self._translated_cache) > 100:
-            # Remove oldest entries
-            keys_to_remove = list(self._translated_cache.keys())[:20]
-            for key in keys_to_remove:
-                del self._translated_cache[key]
-
-        # Send translation
-        embed = discord.Embed(
-            title=f"Translation to {result['dest_name']}",
-            color=0x3498db
-        )
-        embed.add_field(
-            name=f"Original ({result['src_name']})",
-            value=message.content[:500],
-            inline=False
-        )
-        embed.add_field(
-            name=f"Translated ({result['dest_name']})",
-            value=result['text'][:500],
-            inline=False
-        )
-        embed.set_footer(text=f"Translating message from {message.author.display_name}")
+            # Already in the target language? Decide locally, before any API call
+            detected = langid.detect(message.content)
+            if detected is not None and detected.confidence >= SKIP_CONFIDENCE:
+                langs = [lang for lang in langs if not same_language(lang, detected.lang)]
+                if not langs:
+                    continue
 
-        try:
-            await channel.send(embed=embed, reference=message, mention_author=False)
-        except Exception:
-            await channel.send(embed=embed)
+            results = await asyncio.gather(*(
+                self._translate_text(message.content, lang, guild_id=fan.guild_id) for lang in langs
+            ))
+            added = False
+            for lang, result in zip(langs, results):
+                if result is None:
+                    # let a later reaction retry
+                    self._translated_cache.pop(fan.guild_id, ("msg", fan.message_id, lang))
+                # Don't translate if same language
+                elif result['src'].lower() != result['dest'].lower():
+                    fan.results[lang] = result
+                    added = True
+            if not added:
+                continue
+
+            embed = self._fanout_embed(message, list(fan.results.values()))
+            try:
+                if fan.reply is not None:
+                    await fan.reply.edit(embed=embed)
+                    continue
+            except discord.NotFound:
+                fan.reply = None
+            except Exception:
+                continue
+            try:
+                fan.reply = await message.channel.send(embed=embed, reference=message, mention_author=False)
+            except Exception:
+                fan.reply = await message.channel.send(embed=embed)
+
+    def _fanout_embed(self, message: discord.Message, results) -> discord.Embed:
+        first = results[0]
+        if len(results) == 1:
+            title = f"Translation to {first['dest_name']}"
+        else:
+            title = f"Translations ({len(results)} languages)"
+        embed = discord.Embed(title=title, color=0x3498db)
+        original = message.content[:500]
+        embed.add_field(name=f"Original ({first['src_name']})", value=original, inline=False)
+
+        shown = results[:24]  # 25 fields per embed
+        per_field = max(50, min(500, (EMBED_BUDGET - len(original)) // len(shown) - 40))
+        for result in shown:
+            embed.add_field(
+                name=f"Translated ({result['dest_name']})",
+                value=result['text'][:per_field],
+                inline=False
+            )
+        embed.set_footer(text=f"Translating message from {message.author.display_name}")
+        return embed
 
 
 async def setup(client):
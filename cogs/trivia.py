@@ -1,39 +1,15 @@
 # cogs/trivia.py
-import json, os, asyncio, discord
-from discord.ext import commands
-import functionality.functions as funcs
-
-TRIVIA_FILE = "storage/trivia.json"
-
-def _load_trivia_stats():
-    os.makedirs(os.path.dirname(TRIVIA_FILE), exist_ok=True)
-    if not os.path.exists(TRIVIA_FILE):
-        with open(TRIVIA_FILE, "w") as f:
-            json.dump({}, f)
-    with open(TRIVIA_FILE, "r") as f:
-        try:
-            return json.load(f)
-        except:
-            return {}
-
-def _save_trivia_stats(data):
-    with open(TRIVIA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-def _bump_stats(guild_id: int, user_id: int, correct: bool):
-    data = _load_trivia_stats()
-    g = data.setdefault(str(guild_id), {})
-    u = g.setdefault(str(user_id), {"correct": 0, "attempts": 0})
-    u["attempts"] += 1
-    if correct:
-        u["correct"] += 1
-    _save_trivia_stats(data)
-    return u
-
-def _get_stats(guild_id: int, user_id: int):
-    data = _load_trivia_stats()
-    g = data.get(str(guild_id), {})
-    return g.get(str(user_id), {"correct": 0, "attempts": 0})
+import asyncio, time, discord
+from discord.ext import commands, tasks
+from functionality.trivia_pool import QuestionPool, CATEGORIES, CATEGORY_NAMES, DIFFICULTIES
+from storage.trivia_bank import trivia_bank
+from storage.trivia_stats import trivia_stats
+
+POOL_WAIT = 2.0  # seconds to wait on opentdb before using the offline bank
+STATS_FLUSH_SECONDS = 60
+TOP_DEFAULT = 10
+ROUND_SECONDS = 20
+LETTERS = "abcd"
 
 def _normalize_question(raw):
     if raw is None:
@@ -57,44 +33,151 @@ def _normalize_question(raw):
     raise ValueError(f"Unrecognized question format: {type(raw)}")
 
 
+def _read_answer(content: str, answers) -> int:
+    """Index of the answer a reply picks (a-d or the answer text), -1 if none"""
+    reply = content.strip().lower()
+    if len(reply) == 1 and reply in LETTERS:
+        return LETTERS.index(reply)
+    for i, a in enumerate(answers):
+        if reply == a.lower():
+            return i
+    return -1
+
+
+class TriviaRound:
+    """One question open to the whole channel; first reply per player counts."""
+
+    def __init__(self, answers, correct_idx: int, seconds: int):
+        self.answers = answers
+        self.correct_idx = correct_idx
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.responses = {}  # user_id -> (answer index, seconds taken)
+
+    def submit(self, user_id: int, content: str) -> bool:
+        if user_id in self.responses:
+            return False
+        idx = _read_answer(content, self.answers)
+        if idx < 0:
+            return False
+        elapsed = time.monotonic() - self.started
+        if elapsed > self.seconds:
+            return False
+        self.responses[user_id] = (idx, elapsed)
+        return True
+
+    def results(self):
+        """[(user_id, correct, seconds, points), ...] best first.
+
+        A correct answer is worth 500 points plus up to 500 more for speed.
+        """
+        out = []
+        for uid, (idx, elapsed) in self.responses.items():
+            correct = idx == self.correct_idx
+            points = round(500 + 500 * (1 - elapsed / self.seconds)) if correct else 0
+            out.append((uid, correct, elapsed, points))
+        out.sort(key=lambda r: (-r[3], r[2]))
+        return out
+
+
 class Trivia(commands.Cog):
     """Trivia Games"""
     def __init__(self, client):
         self.client = client
+        self.pool = QuestionPool(sink=trivia_bank.add_many)
+        self.rounds = {}  # channel_id -> TriviaRound
+
+    async def cog_load(self):
+        trivia_bank.open()
+        trivia_stats.open()
+        self.flush_stats.start()
+        # fill the "any category" buffer before the first command
+        self.pool.schedule_refill()
+
+    async def cog_unload(self):
+        self.pool.close()
+        self.flush_stats.cancel()
+        trivia_stats.close()
+        trivia_bank.close()
+
+    @tasks.loop(seconds=STATS_FLUSH_SECONDS)
+    async def flush_stats(self):
+        trivia_stats.flush()
+
+    async def _next_question(self, cat_id, difficulty):
+        """From the prefetched pool, or the offline bank when opentdb is slow/down"""
+        try:
+            return await asyncio.wait_for(self.pool.get(cat_id, difficulty), timeout=POOL_WAIT)
+        except Exception as e:
+            raw = trivia_bank.random(CATEGORY_NAMES.get(cat_id), difficulty)
+            if raw is None:
+                raise ValueError(f"no questions available ({e or type(e).__name__})")
+            return raw
+
+    async def _parse_filters(self, ctx, category, difficulty):
+        """(category id, difficulty), or None after telling the user what's valid"""
+        if category and category.lower() in DIFFICULTIES and difficulty is None:
+            category, difficulty = None, category
+        cat_id = None
+        if category:
+            cat_id = CATEGORIES.get(category.lower())
+            if cat_id is None:
+                await ctx.send("❓ Categories: " + ", ".join(CATEGORIES))
+                return None
+        if difficulty:
+            difficulty = difficulty.lower()
+            if difficulty not in DIFFICULTIES:
+                await ctx.send("❓ Difficulty: " + ", ".join(DIFFICULTIES))
+                return None
+        return cat_id, difficulty
 
-    @commands.command(help="Play interactive trivia!", aliases=["tri"])
-    async def trivia(self, ctx):
+    async def _prepare(self, ctx, category, difficulty):
+        """Fetch and validate a question; None after reporting a problem"""
+        filters = await self._parse_filters(ctx, category, difficulty)
+        if filters is None:
+            return None
         try:
-            raw = funcs.get_question2()
+            raw = await self._next_question(*filters)
             q = _normalize_question(raw)
         except Exception as e:
-            return await ctx.send(f"❌ Trivia error: {e}")
+            await ctx.send(f"❌ Trivia error: {e}")
+            return None
 
-        category = q.get("category") or "General"
         question = q.get("question")
         correct = q.get("correct")
         answers = q.get("answers")
 
         if not question or not correct or not answers or len(answers) != 4:
-            return await ctx.send("❌ Question data malformed.")
+            await ctx.send("❌ Question data malformed.")
+            return None
 
         if correct not in answers:
             answers = list(answers) + [correct]
             answers = list(dict.fromkeys(answers))[:4]
+        q["answers"] = answers
+        q["correct_idx"] = answers.index(correct)
+        return q
 
-        letter_map = "abcd"
-        correct_idx = answers.index(correct)
-        correct_key = letter_map[correct_idx]
-
-        lines = [f"{letter_map[i]}. {answers[i]}" for i in range(4)]
+    @staticmethod
+    def _question_embed(q, footer: str) -> discord.Embed:
+        lines = [f"{LETTERS[i]}. {q['answers'][i]}" for i in range(4)]
         embed = discord.Embed(
             title="Trivia",
-            description=f"**Category:** {category}",
+            description=f"**Category:** {q.get('category') or 'General'}",
             color=0x8b0000
         )
-        embed.add_field(name=question, value="\n".join(lines), inline=False)
-        embed.set_footer(text=f"{ctx.author.name}, reply with a/b/c/d")
-        await ctx.send(embed=embed)
+        embed.add_field(name=q["question"], value="\n".join(lines), inline=False)
+        embed.set_footer(text=footer)
+        return embed
+
+    @commands.command(help="Play interactive trivia! Optionally pick a category and difficulty", aliases=["tri"])
+    async def trivia(self, ctx, category: str = None, difficulty: str = None):
+        q = await self._prepare(ctx, category, difficulty)
+        if q is None:
+            return
+        correct = q["correct"]
+        correct_idx = q["correct_idx"]
+        await ctx.send(embed=self._question_embed(q, f"{ctx.author.name}, reply with a/b/c/d"))
 
         def check(m):
             return m.author == ctx.author and m.channel == ctx.channel
@@ -104,10 +187,8 @@ class Trivia(commands.Cog):
         except asyncio.TimeoutError:
             return await ctx.send("Time's up!")
 
-        user_reply = msg.content.strip().lower()
-        is_letter = user_reply in list(letter_map)
-        guess_idx = letter_map.index(user_reply) if is_letter else None
-        is_correct = (guess_idx == correct_idx) if is_letter else (user_reply == correct.lower())
+        guess_idx = _read_answer(msg.content, q["answers"])
+        is_correct = guess_idx == correct_idx
 
         await msg.add_reaction('✅' if is_correct else '❌')
         if is_correct:
@@ -115,18 +196,86 @@ class Trivia(commands.Cog):
         else:
             await ctx.send(f"❌ Wrong! The answer was **{correct}**")
 
-        _bump_stats(ctx.guild.id, ctx.author.id, is_correct)
+        trivia_stats.record(ctx.guild.id, ctx.author.id, is_correct)
+
+    @commands.command(help="Trivia round for the whole channel, fastest correct answer wins", aliases=["trr"])
+    async def trivia_round(self, ctx, category: str = None, difficulty: str = None):
+        if ctx.channel.id in self.rounds:
+            return await ctx.send("⏳ A trivia round is already running here.")
+        q = await self._prepare(ctx, category, difficulty)
+        if q is None:
+            return
+        if ctx.channel.id in self.rounds:
+            return await ctx.send("⏳ A trivia round is already running here.")
+
+        rnd = TriviaRound(q["answers"], q["correct_idx"], ROUND_SECONDS)
+        self.rounds[ctx.channel.id] = rnd
+        try:
+            await ctx.send(embed=self._question_embed(q, f"Everyone: reply with a/b/c/d within {ROUND_SECONDS}s, first answer counts"))
+            rnd.started = time.monotonic()
+            await asyncio.sleep(ROUND_SECONDS)
+        finally:
+            self.rounds.pop(ctx.channel.id, None)
+
+        results = rnd.results()
+        trivia_stats.record_many(ctx.guild.id, [(uid, correct) for uid, correct, _, _ in results])
+
+        if not results:
+            return await ctx.send(f"⌛ Nobody answered! It was **{q['correct']}**")
+        lines = []
+        for i, (uid, correct, elapsed, points) in enumerate(results[:15], start=1):
+            member = ctx.guild.get_member(uid)
+            name = member.display_name if member else f"<@{uid}>"
+            mark = "✅" if correct else "❌"
+            lines.append(f"**{i}.** {mark} {name} — {points} pts ({elapsed:.1f}s)")
+        embed = discord.Embed(
+            title="🏁 Round Over",
+            description=f"The answer was **{q['correct']}**\n\n" + "\n".join(lines),
+            color=0x2e8b57
+        )
+        await ctx.send(embed=embed)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        # one listener feeds every open round, keyed by channel
+        rnd = self.rounds.get(message.channel.id)
+        if rnd is None or message.author.bot:
+            return
+        rnd.submit(message.author.id, message.content)
 
     @commands.command(help="View trivia stats", aliases=["ts"])
     async def trivia_stats(self, ctx, member: discord.Member = None):
         member = member or ctx.author
-        stats = _get_stats(ctx.guild.id, member.id)
+        stats = trivia_stats.get(ctx.guild.id, member.id)
         pct = (100.0 * stats["correct"] / stats["attempts"]) if stats["attempts"] else 0.0
 
         embed = discord.Embed(title="📊 Trivia Stats", description=f"Stats for {member.display_name}", color=0x2e8b57)
         embed.add_field(name="Correct", value=str(stats["correct"]), inline=True)
         embed.add_field(name="Attempts", value=str(stats["attempts"]), inline=True)
         embed.add_field(name="Accuracy", value=f"{pct:.1f}%", inline=True)
+        rank = trivia_stats.rank(ctx.guild.id, member.id)
+        if rank:
+            embed.set_footer(text=f"Rank #{rank} by correct answers")
+        await ctx.send(embed=embed)
+
+    @commands.command(help="Trivia leaderboard, by correct answers or accuracy", aliases=["ttop"])
+    async def trivia_top(self, ctx, by: str = "correct", n: int = TOP_DEFAULT):
+        by = "accuracy" if by.lower() in ("accuracy", "acc", "%") else "correct"
+        n = max(1, min(n, 25))
+        rows = trivia_stats.top(ctx.guild.id, n, by)
+        if not rows:
+            note = f" (needs {trivia_stats.min_attempts}+ attempts)" if by == "accuracy" else ""
+            return await ctx.send(f"No trivia players on the board yet{note}.")
+
+        lines = []
+        for i, (uid, correct, attempts) in enumerate(rows, start=1):
+            member = ctx.guild.get_member(uid)
+            name = member.display_name if member else f"<@{uid}>"
+            pct = 100.0 * correct / attempts if attempts else 0.0
+            lines.append(f"**{i}.** {name} — {correct}/{attempts} ({pct:.1f}%)")
+
+        title = "🏆 Trivia Leaderboard" + (" (accuracy)" if by == "accuracy" else "")
+        embed = discord.Embed(title=title, description="\n".join(lines), color=0x2e8b57)
         await ctx.send(embed=embed)
 
 
@@ -0,0 +1,242 @@
+# functionality/airports.py
+"""Airport lookup by ICAO, IATA, name or city.
+
+``storage/airports.csv.gz`` is the OurAirports ``airports.csv`` (public
+domain) cut down to airports worth asking about: every large and medium
+airport, plus small ones with an IATA code or scheduled service. Rebuild
+it from a fresh download with
+``python -m functionality.airports build path/to/airports.csv``.
+
+Nothing is read until the first lookup. Codes are dict hits. Name, city
+and keyword search uses a prefix trie flattened into one sorted array of
+ASCII-folded words: a prefix is a binary-searched slice of that array,
+which gives the same lookups as a node-per-letter trie for a fraction of
+the memory.
+"""
+import csv
+import difflib
+import gzip
+import re
+import sys
+import threading
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+DATA_FILE = "storage/airports.csv.gz"
+KEY_LEN = 24
+# search results order: bigger airports first
+TYPE_RANK = {"large_airport": 0, "medium_airport": 1, "small_airport": 2, "seaplane_base": 3}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class Airport(NamedTuple):
+    icao: str
+    iata: str
+    name: str
+    city: str
+    country: str
+    lat: float
+    lon: float
+    type: str
+
+
+def _fold(text: str) -> str:
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(_fold(text))
+
+
+class AirportIndex:
+    def __init__(self, path: str = DATA_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.icao: List[str] = []
+        self.iata: List[str] = []
+        self.names: List[str] = []
+        self.cities: List[str] = []
+        self.countries: List[str] = []
+        self.types: List[str] = []
+        self.lat = np.zeros(0, dtype=np.float32)
+        self.lon = np.zeros(0, dtype=np.float32)
+        self.rank = np.zeros(0, dtype=np.int8)
+        self._codes: Dict[str, int] = {}
+        self._keys = np.zeros(0, dtype=f"S{KEY_LEN}")   # sorted words
+        self._rows = np.zeros(0, dtype=np.int32)         # airport row of each word
+        self._titles = np.zeros(0, dtype=bool)           # word is in the name or city, not just keywords
+
+    # ---------- loading ----------
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            lat, lon, rank = [], [], []
+            words: List[Tuple[bytes, int, bool]] = []
+            iata_codes: Set[str] = set()
+            with gzip.open(self.path, "rt", encoding="utf-8", newline="") as f:
+                reader = csv.reader(f)
+                col = {name: i for i, name in enumerate(next(reader))}
+                c_ident, c_gps, c_iata, c_type = col["ident"], col["gps_code"], col["iata_code"], col["type"]
+                c_name, c_city, c_keywords = col["name"], col["municipality"], col["keywords"]
+                c_lat, c_lon, c_country, c_sched = (col["latitude_deg"], col["longitude_deg"],
+                                                    col["iso_country"], col["scheduled_service"])
+                for row, rec in enumerate(reader):
+                    gps, ident, iata = rec[c_gps], rec[c_ident], rec[c_iata]
+                    icao = gps if len(gps) == 4 and gps.isalpha() and gps.isupper() else ident
+                    self.icao.append(icao)
+                    self.iata.append(iata)
+                    self.names.append(rec[c_name])
+                    self.cities.append(rec[c_city])
+                    self.countries.append(rec[c_country])
+                    self.types.append(rec[c_type])
+                    lat.append(float(rec[c_lat]))
+                    lon.append(float(rec[c_lon]))
+                    rank.append(TYPE_RANK.get(rec[c_type], 4) * 2 + (rec[c_sched] != "yes"))
+
+                    # an IATA code belongs to the airport listing it, even if another
+                    # airport's ident or gps_code already claimed those letters
+                    if iata and iata.upper() not in iata_codes:
+                        iata_codes.add(iata.upper())
+                        self._codes[iata.upper()] = row
+                    # an ICAO code already taken by a bigger airport's gps_code keeps its first owner
+                    for code in (ident, gps, icao):
+                        if code:
+                            self._codes.setdefault(code.upper(), row)
+                    title = set(_words(f"{rec[c_name]} {rec[c_city]}"))
+                    for w in title:
+                        words.append((w.encode()[:KEY_LEN], row, True))
+                    for w in set(_words(rec[c_keywords])) - title:
+                        words.append((w.encode()[:KEY_LEN], row, False))
+
+            words.sort()
+            self._keys = np.array([w[0] for w in words], dtype=f"S{KEY_LEN}")
+            self._rows = np.array([w[1] for w in words], dtype=np.int32)
+            self._titles = np.array([w[2] for w in words], dtype=bool)
+            self.lat = np.array(lat, dtype=np.float32)
+            self.lon = np.array(lon, dtype=np.float32)
+            self.rank = np.array(rank, dtype=np.int8)
+            self._loaded = True
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self.icao)
+
+    def airport(self, row: int) -> Airport:
+        return Airport(self.icao[row], self.iata[row], self.names[row], self.cities[row],
+                       self.countries[row], float(self.lat[row]), float(self.lon[row]), self.types[row])
+
+    # ---------- lookups ----------
+    def get(self, code: str) -> Optional[Airport]:
+        """Airport by ICAO, IATA or OurAirports ident"""
+        self.load()
+        row = self._codes.get(code.strip().upper())
+        return None if row is None else self.airport(row)
+
+    def _prefix(self, word: bytes) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows with a word starting with ``word``, and a score per hit:
+        +2 for the whole word, +1 for being in the name or city"""
+        lo = np.searchsorted(self._keys, word, side="left")
+        # every stored character is [a-z0-9], all below 0x7f
+        hi = np.searchsorted(self._keys, word + b"\x7f", side="left")
+        score = (self._keys[lo:hi] == word) * 2 + self._titles[lo:hi]
+        return self._rows[lo:hi], score
+
+    def _close(self, word: bytes) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows for words spelled like ``word`` (same first letter)"""
+        lo = np.searchsorted(self._keys, word[:1], side="left")
+        hi = np.searchsorted(self._keys, word[:1] + b"\x7f", side="left")
+        vocab = {k.decode() for k in np.unique(self._keys[lo:hi])}
+        rows: List[np.ndarray] = []
+        for match in difflib.get_close_matches(word.decode(), vocab, n=3, cutoff=0.8):
+            rows.append(self._prefix(match.encode())[0])
+        if not rows:
+            return self._rows[:0], np.zeros(0, dtype=np.int64)
+        found = np.concatenate(rows)
+        return found, np.zeros(len(found), dtype=np.int64)
+
+    def search(self, query: str, k: int = 10) -> List[Airport]:
+        """Airports whose name, city or keywords contain a word starting with each query word.
+
+        Whole words beat prefixes, the name or city beats keywords, then
+        bigger airports rank first. A word with no prefix match at all is
+        swapped for close spellings of it.
+        """
+        self.load()
+        # one byte short of the key width so the prefix's upper bound still fits
+        words = [w.encode()[:KEY_LEN - 1] for w in _words(query)]
+        if not words:
+            return []
+        matched: Optional[Dict[int, int]] = None   # row -> summed score
+        for word in words:
+            rows, scores = self._prefix(word)
+            if not len(rows):
+                rows, scores = self._close(word)
+            found: Dict[int, int] = {}
+            for row, score in zip(rows.tolist(), scores.tolist()):
+                if score >= found.get(row, 0):
+                    found[row] = score
+            if matched is None:
+                matched = found
+            else:
+                matched = {row: n + found[row] for row, n in matched.items() if row in found}
+            if not matched:
+                return []
+        best = sorted(matched, key=lambda row: (-matched[row], int(self.rank[row]), self.names[row]))
+        return [self.airport(row) for row in best[:k]]
+
+    def resolve(self, query: str) -> Optional[Airport]:
+        """A code if ``query`` is one, else the best name/city match"""
+        found = self.get(query)
+        if found is not None:
+            return found
+        hits = self.search(query, 1)
+        return hits[0] if hits else None
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the index"""
+        strings: Set[int] = set()
+        total = 0
+        for column in (self.icao, self.iata, self.names, self.cities, self.countries, self.types):
+            total += sys.getsizeof(column)
+            for s in column:
+                if id(s) not in strings:
+                    strings.add(id(s))
+                    total += sys.getsizeof(s)
+        total += sys.getsizeof(self._codes)
+        return (total + self.lat.nbytes + self.lon.nbytes + self.rank.nbytes
+                + self._keys.nbytes + self._rows.nbytes + self._titles.nbytes)
+
+
+airports = AirportIndex()
+
+
+def build(source: str, out_path: str = DATA_FILE):
+    """Filter an OurAirports airports.csv (plain or .gz) into DATA_FILE."""
+    opener = gzip.open if source.endswith(".gz") else open
+    kept = 0
+    with opener(source, "rt", encoding="utf-8", newline="") as src, \
+            gzip.open(out_path, "wt", encoding="utf-8", newline="") as dst:
+        reader = csv.DictReader(src)
+        writer = csv.DictWriter(dst, fieldnames=reader.fieldnames, quoting=csv.QUOTE_MINIMAL)
+        writer.writeheader()
+        for rec in reader:
+            if rec["type"] in ("large_airport", "medium_airport") or (
+                    rec["type"] in ("small_airport", "seaplane_base")
+                    and (rec["iata_code"] or rec["scheduled_service"] == "yes")):
+                writer.writerow(rec)
+                kept += 1
+    print(f"{kept} airports -> {out_path}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["build"]:
+        build(*sys.argv[2:4])
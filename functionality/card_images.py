@@ -0,0 +1,116 @@
+# functionality/card_images.py
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import requests
+from PIL import Image
+
+from functionality.deck import ALL_CODES, make_card
+
+CACHE_DIR = "storage/cards"
+STRIP_CACHE_SIZE = 128
+
+
+def _fetch_img(url: str) -> Image.Image:
+    r = requests.get(url, timeout=12)
+    r.raise_for_status()
+    return Image.open(BytesIO(r.content)).convert("RGBA")
+
+
+class CardImageCache:
+    """Card faces kept in memory, with resized copies and finished strips.
+
+    Faces come from ``storage/cards/<code>.png`` when present and are
+    downloaded (then written there) otherwise, so the network is only hit
+    the first time the bot ever sees a card. Resized faces are kept per
+    target height and encoded PNG strips go into a small LRU keyed by
+    (card codes, height, pad, bg).
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, strip_cache_size: int = STRIP_CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.strip_cache_size = strip_cache_size
+        self._faces: Dict[str, Image.Image] = {}
+        self._scaled: Dict[Tuple[str, int], Image.Image] = {}
+        self._strips: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _disk_path(self, code: str) -> str:
+        return os.path.join(self.cache_dir, f"{code}.png")
+
+    def face(self, code: str, url: Optional[str] = None) -> Image.Image:
+        im = self._faces.get(code)
+        if im is not None:
+            return im
+        path = self._disk_path(code)
+        if os.path.exists(path):
+            im = Image.open(path).convert("RGBA")
+        else:
+            im = _fetch_img(url or make_card(code)["image"])
+            os.makedirs(self.cache_dir, exist_ok=True)
+            im.save(path, format="PNG")
+        im.load()
+        with self._lock:
+            self._faces[code] = im
+        return im
+
+    def scaled(self, code: str, height: int, url: Optional[str] = None) -> Image.Image:
+        key = (code, height)
+        im = self._scaled.get(key)
+        if im is None:
+            src = self.face(code, url)
+            w = int(src.width * (height / src.height))
+            im = src.resize((w, height), Image.LANCZOS)
+            with self._lock:
+                self._scaled[key] = im
+        return im
+
+    def load_all(self, heights: Sequence[int] = ()):
+        """Load (and pre-resize) every face; meant to run once at startup."""
+        for code in ALL_CODES:
+            try:
+                self.face(code)
+                for h in heights:
+                    self.scaled(code, h)
+            except Exception as e:
+                print(f"Card image {code} unavailable: {e}")
+
+    def strip(self, card_objs: List[Dict], height: int = 200, pad: int = 8, bg=(34, 139, 34, 255)) -> Optional[BytesIO]:
+        key = (tuple(c["code"] for c in card_objs), height, pad, tuple(bg))
+        with self._lock:
+            data = self._strips.get(key)
+            if data is not None:
+                self._strips.move_to_end(key)
+                return BytesIO(data)
+
+        imgs = []
+        for c in card_objs:
+            try:
+                imgs.append(self.scaled(c["code"], height, c.get("image")))
+            except Exception:
+                pass
+        if not imgs:
+            return None
+        total_w = sum(im.width for im in imgs) + pad * (len(imgs) + 1)
+        canvas = Image.new("RGBA", (total_w, height + 2 * pad), bg)
+        x = pad
+        for im in imgs:
+            canvas.paste(im, (x, pad), im)
+            x += im.width + pad
+        out = BytesIO()
+        canvas.save(out, format="PNG")
+        data = out.getvalue()
+
+        # only cache complete strips, a missing face may load next time
+        if len(imgs) == len(card_objs):
+            with self._lock:
+                self._strips[key] = data
+                if len(self._strips) > self.strip_cache_size:
+                    self._strips.popitem(last=False)
+        return BytesIO(data)
+
+
+card_images = CardImageCache()
@@ -0,0 +1,55 @@
+# functionality/deck.py
+import random
+import secrets
+from typing import Dict, List, Optional
+
+IMAGE_BASE = "https://deckofcardsapi.com/static/img/"
+
+RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "0", "J", "Q", "K"]
+SUITS = ["S", "D", "C", "H"]
+RANK_VALUE = {"A": "ACE", "J": "JACK", "Q": "QUEEN", "K": "KING", "0": "10"}
+SUIT_NAME = {"S": "SPADES", "D": "DIAMONDS", "C": "CLUBS", "H": "HEARTS"}
+
+
+def make_card(code: str) -> Dict:
+    """Card dict in the same shape deckofcardsapi.com returns"""
+    r, s = code[0], code[1]
+    # the API serves the ace of diamonds under a different name
+    stem = "aceDiamonds" if code == "AD" else code
+    return {
+        "code": code,
+        "image": f"{IMAGE_BASE}{stem}.png",
+        "images": {"svg": f"{IMAGE_BASE}{stem}.svg", "png": f"{IMAGE_BASE}{stem}.png"},
+        "value": RANK_VALUE.get(r, r),
+        "suit": SUIT_NAME[s],
+    }
+
+
+ALL_CODES = [r + s for s in SUITS for r in RANKS]
+
+
+class Deck:
+    """Shuffled 52-card deck, dealt in-process.
+
+    Without a seed the shuffle uses the OS CSPRNG; pass a seed to replay the
+    exact same deal (tests, bug reports).
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self._rng = random.Random(seed) if seed is not None else secrets.SystemRandom()
+        self.shuffle()
+
+    def shuffle(self):
+        self._cards = [make_card(c) for c in ALL_CODES]
+        self._rng.shuffle(self._cards)
+
+    @property
+    def remaining(self) -> int:
+        return len(self._cards)
+
+    def draw(self, n: int = 1) -> List[Dict]:
+        if n > len(self._cards):
+            raise ValueError(f"Cannot draw {n} cards, only {len(self._cards)} left")
+        drawn, self._cards = self._cards[:n], self._cards[n:]
+        return drawn
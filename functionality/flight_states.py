@@ -0,0 +1,213 @@
+# functionality/flight_states.py
+"""OpenSky ``states/all`` snapshots stored column-wise.
+
+The API returns one 17-18 element list per aircraft; a global snapshot is
+tens of thousands of them, roughly a kilobyte each once every float and
+string is a Python object. ``StateSnapshot`` parses the payload once into a
+NumPy structured array of the fields the flight commands use, about 45 bytes
+a row, with missing values as NaN. Lookups by callsign and icao24 are
+binary searches over presorted keys, and unit conversions run over whole
+selections at once.
+
+Positions are bucketed into a 1-degree lat/lon grid when the snapshot is
+built (a counting sort, a few milliseconds), so a radius query only runs
+the haversine formula over the aircraft in the cells the circle touches.
+"""
+import math
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+FT_PER_M = 3.28084
+KTS_PER_MS = 1.94384
+FPM_PER_MS = 196.85
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG = math.pi * EARTH_RADIUS_KM / 180
+CELL_DEG = 1.0
+_LAT_CELLS = int(180 / CELL_DEG)
+_LON_CELLS = int(360 / CELL_DEG)
+
+STATE_DTYPE = np.dtype([
+    ("icao24", "S6"),
+    ("callsign", "S8"),
+    ("country", "u2"),          # index into StateSnapshot.countries
+    ("lat", "f4"),
+    ("lon", "f4"),
+    ("alt", "f4"),              # metres; geometric, barometric when that's missing
+    ("velocity", "f4"),         # m/s
+    ("heading", "f4"),          # degrees clockwise from north
+    ("vert_rate", "f4"),        # m/s
+    ("on_ground", "?"),
+    ("last_contact", "u4"),     # unix time
+])
+
+# positions in an OpenSky state vector
+_ICAO24, _CALLSIGN, _COUNTRY, _LAST_CONTACT, _LON, _LAT, _BARO_ALT, _ON_GROUND, \
+    _VELOCITY, _TRACK, _VERT_RATE, _GEO_ALT = 0, 1, 2, 4, 5, 6, 7, 8, 9, 10, 11, 13
+
+
+def _key(text: str, width: int) -> bytes:
+    return (text or "").strip().upper().encode("ascii", "replace")[:width]
+
+
+def _floats(col) -> np.ndarray:
+    # numpy turns None into NaN for float dtypes
+    return np.array(col, dtype=np.float32)
+
+
+def parse_states(states: List[list]):
+    """(structured array, country names) for a ``states`` list."""
+    if not states:
+        return np.zeros(0, dtype=STATE_DTYPE), []
+    cols = list(zip(*states))
+    arr = np.empty(len(states), dtype=STATE_DTYPE)
+    arr["icao24"] = [_key(x, 6).lower() for x in cols[_ICAO24]]
+    arr["callsign"] = [_key(x, 8) for x in cols[_CALLSIGN]]
+
+    countries: Dict[str, int] = {}
+    arr["country"] = [countries.setdefault(c or "", len(countries)) for c in cols[_COUNTRY]]
+
+    arr["lat"] = _floats(cols[_LAT])
+    arr["lon"] = _floats(cols[_LON])
+    geo = _floats(cols[_GEO_ALT]) if len(cols) > _GEO_ALT else np.full(len(states), np.nan, np.float32)
+    arr["alt"] = np.where(np.isnan(geo), _floats(cols[_BARO_ALT]), geo)
+    arr["velocity"] = _floats(cols[_VELOCITY])
+    arr["heading"] = _floats(cols[_TRACK])
+    arr["vert_rate"] = _floats(cols[_VERT_RATE])
+    arr["on_ground"] = [bool(x) for x in cols[_ON_GROUND]]
+    arr["last_contact"] = [x or 0 for x in cols[_LAST_CONTACT]]
+    return arr, list(countries)
+
+
+class _SortedKey:
+    """Binary-search index over one bytes column."""
+
+    def __init__(self, column: np.ndarray):
+        self.order = np.argsort(column, kind="stable")
+        self.keys = column[self.order]
+
+    def rows(self, key: bytes) -> np.ndarray:
+        lo = np.searchsorted(self.keys, key, side="left")
+        hi = np.searchsorted(self.keys, key, side="right")
+        return self.order[lo:hi]
+
+    @property
+    def nbytes(self) -> int:
+        return self.order.nbytes + self.keys.nbytes
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance from one point to many, in km"""
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2 = np.radians(lats.astype(np.float64))
+    lon2 = np.radians(lons.astype(np.float64))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridIndex:
+    """Row numbers bucketed by CELL_DEG x CELL_DEG lat/lon cell.
+
+    ``order`` lists rows sorted by cell and ``starts[c]:starts[c + 1]`` is
+    cell ``c``'s slice of it; rows without a position sort past the last cell.
+    """
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray):
+        known = np.isfinite(lat) & np.isfinite(lon)
+        row = np.clip(np.floor((lat + 90) / CELL_DEG), 0, _LAT_CELLS - 1)
+        col = np.clip(np.floor((lon + 180) / CELL_DEG), 0, _LON_CELLS - 1)
+        cells = _LAT_CELLS * _LON_CELLS
+        cell = np.where(known, row * _LON_CELLS + col, cells).astype(np.int32)
+        self.order = np.argsort(cell, kind="stable").astype(np.int32)
+        self.starts = np.concatenate(([0], np.cumsum(np.bincount(cell, minlength=cells + 1)))).astype(np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        return self.order.nbytes + self.starts.nbytes
+
+    @staticmethod
+    def _cell(value: float, offset: float, count: int) -> int:
+        return min(count - 1, max(0, int(math.floor((value + offset) / CELL_DEG))))
+
+    def candidates(self, lat: float, lon: float, radius_km: float) -> np.ndarray:
+        """Rows in every cell a circle of ``radius_km`` around (lat, lon) can touch."""
+        dlat = radius_km / KM_PER_DEG
+        lat_lo, lat_hi = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+        # a degree of longitude is shortest at the latitude furthest from the equator
+        far = max(abs(lat_lo), abs(lat_hi))
+        dlon = 180.0 if far >= 89.0 else min(180.0, dlat / math.cos(math.radians(far)))
+        if dlon >= 180.0:
+            spans = [(0, _LON_CELLS - 1)]
+        else:
+            c0 = int(math.floor((lon - dlon + 180) / CELL_DEG))
+            c1 = int(math.floor((lon + dlon + 180) / CELL_DEG))
+            if c0 < 0:          # wraps past -180
+                spans = [(c0 + _LON_CELLS, _LON_CELLS - 1), (0, c1)]
+            elif c1 >= _LON_CELLS:
+                spans = [(c0, _LON_CELLS - 1), (0, c1 - _LON_CELLS)]
+            else:
+                spans = [(c0, c1)]
+
+        chunks = []
+        for r in range(self._cell(lat_lo, 90, _LAT_CELLS), self._cell(lat_hi, 90, _LAT_CELLS) + 1):
+            base = r * _LON_CELLS
+            for a, b in spans:
+                chunks.append(self.order[self.starts[base + a]:self.starts[base + b + 1]])
+        return np.concatenate(chunks) if chunks else self.order[:0]
+
+
+class StateSnapshot:
+    """One states/all response, indexed by callsign, icao24 and position"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.time = data.get("time") or 0
+        self.fetched = time.monotonic()
+        self.states, self.countries = parse_states(data.get("states") or [])
+        self._by_callsign = _SortedKey(self.states["callsign"])
+        self._by_icao24 = _SortedKey(self.states["icao24"])
+        self.grid = GridIndex(self.states["lat"], self.states["lon"])
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched
+
+    @property
+    def nbytes(self) -> int:
+        return self.states.nbytes + self._by_callsign.nbytes + self._by_icao24.nbytes + self.grid.nbytes
+
+    def callsign(self, callsign: str) -> np.ndarray:
+        if not callsign.strip():
+            return self.states[:0]
+        return self.states[self._by_callsign.rows(_key(callsign, 8))]
+
+    def icao24(self, icao24: str) -> np.ndarray:
+        return self.states[self._by_icao24.rows(_key(icao24, 6).lower())]
+
+    def nearby(self, lat: float, lon: float, radius_km: float,
+               airborne_only: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, distances in km) within ``radius_km`` of a point, nearest first."""
+        idx = self.grid.candidates(lat, lon, radius_km)
+        if airborne_only:
+            idx = idx[~self.states["on_ground"][idx]]
+        rows = self.states[idx]
+        dist = haversine_km(lat, lon, rows["lat"], rows["lon"])
+        keep = np.flatnonzero(dist <= radius_km)
+        keep = keep[np.argsort(dist[keep], kind="stable")]
+        return rows[keep], dist[keep]
+
+    def country(self, row) -> str:
+        return self.countries[int(row["country"])] if self.countries else ""
+
+
+def display_units(rows: np.ndarray) -> Dict[str, np.ndarray]:
+    """Altitude in ft, speed in kts and vertical rate in fpm for a selection (NaN where unknown)."""
+    return {
+        "alt_ft": rows["alt"] * FT_PER_M,
+        "speed_kts": rows["velocity"] * KTS_PER_MS,
+        "vert_fpm": rows["vert_rate"] * FPM_PER_MS,
+    }
@@ -1,7 +1,7 @@
 import requests
 import os
 import discord
-from functionality.structures import Trivia
+from functionality.http_client import http_client
 import json
 import random
 import html
@@ -24,9 +24,8 @@ def check_carrot(string, message):
         return 0
 
 
-def get_insult():
-  response = requests.get("https://evilinsult.com/generate_insult.php?lang=en&type=json")
-  json_request = response.json()
+async def get_insult():
+  json_request = await http_client.get_json("https://evilinsult.com/generate_insult.php?lang=en&type=json")
   quote = html.unescape(json_request["insult"])
   return quote
 
@@ -37,54 +36,28 @@ def get_color(para,color):
   json_request = response.json()
   print(json_request)
 
-def get_pickup():
+async def get_pickup():
   url = "https://vinuxd.vercel.app/api/pickup"
-  response = requests.get(url)
-  json_request = response.json()
+  json_request = await http_client.get_json(url)
   quote = json_request["pickup"]
   return quote
 
 
-def get_compliment():
-  response = requests.get("https://8768zwfurd.execute-api.us-east-1.amazonaws.com/v1/compliments")
-  json_request = response.json()
+async def get_compliment():
+  json_request = await http_client.get_json("https://8768zwfurd.execute-api.us-east-1.amazonaws.com/v1/compliments")
   quote = html.unescape(json_request)
   return quote
 
 
 
-def get_joke():
+async def get_joke():
   jokeurl = "https://v2.jokeapi.dev/joke/Any?type=twopart"
 
-  response = requests.get(jokeurl)
-  quote = response.json()
+  quote = await http_client.get_json(jokeurl)
   return quote
 
 
 
-def get_question2():
-  headers = {'Content-Type': 'application/json'}
-  response = requests.get("https://opentdb.com/api.php?amount=1&type=multiple", headers)
-  json_request = response.json()
-  
-  #unescaping all all of the responses
-  category = html.unescape(json_request["results"][0]["category"])
-  question = html.unescape(json_request["results"][0]["question"])
-  cor_ans = html.unescape(json_request["results"][0]["correct_answer"])
-  in_ans1 = html.unescape(json_request["results"][0]["incorrect_answers"][0])
-  in_ans2 = html.unescape(json_request["results"][0]["incorrect_answers"][1])
-  in_ans3 = html.unescape(json_request["results"][0]["incorrect_answers"][2])
-
-  in_ans = [in_ans1, in_ans2, in_ans3]
-  
-  #creating a trivia object and returning it
-  trivia = Trivia(question, category, cor_ans, in_ans)
-
-  return trivia
-
-
-
-
 def coin_market_cap():
 
   url = 'https://pro-api.coinmarketcap.com/v1/cryptocurrency/listings/latest'
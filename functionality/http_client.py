@@ -0,0 +1,95 @@
+# functionality/http_client.py
+"""Shared non-blocking HTTP client for the bot's third-party API helpers.
+
+One ``aiohttp.ClientSession`` (created lazily on the running loop) is reused
+for every request so connections are pooled and kept alive. Each host gets
+its own semaphore so one slow API can't tie up every connection, requests
+time out instead of hanging, and transient failures (connection errors,
+timeouts, 429 and 5xx) are retried with exponential backoff.
+"""
+import asyncio
+import random
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+TOTAL_TIMEOUT = 10
+CONNECT_TIMEOUT = 5
+POOL_LIMIT = 100
+PER_HOST_LIMIT = 4
+RETRIES = 2
+BACKOFF = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpClient:
+    def __init__(self, per_host: int = PER_HOST_LIMIT, retries: int = RETRIES,
+                 timeout: float = TOTAL_TIMEOUT, connect_timeout: float = CONNECT_TIMEOUT):
+        self.per_host = per_host
+        self.retries = retries
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=POOL_LIMIT, limit_per_host=self.per_host, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        sem = self._hosts.get(host)
+        if sem is None:
+            sem = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return sem
+
+    @staticmethod
+    def _delay(attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), 10.0)
+            except ValueError:
+                pass
+        return BACKOFF * (2 ** attempt) + random.uniform(0, BACKOFF)
+
+    async def request(self, method: str, url: str, *, as_json: bool = True, **kwargs) -> Any:
+        """Send a request and return the decoded body (JSON or text).
+
+        Raises ``aiohttp.ClientError`` / ``asyncio.TimeoutError`` once the
+        retries are used up, like a plain session call would.
+        """
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                async with self._host_slot(url):
+                    async with self.session.request(method, url, **kwargs) as resp:
+                        if resp.status in RETRY_STATUSES and attempt < self.retries:
+                            retry_after = resp.headers.get("Retry-After")
+                        else:
+                            resp.raise_for_status()
+                            if as_json:
+                                return await resp.json(content_type=None)
+                            return await resp.text()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= self.retries:
+                    raise
+            await asyncio.sleep(self._delay(attempt, retry_after))
+            attempt += 1
+
+    async def get_json(self, url: str, **kwargs) -> Any:
+        return await self.request("GET", url, **kwargs)
+
+    async def get_text(self, url: str, **kwargs) -> str:
+        return await self.request("GET", url, as_json=False, **kwargs)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+http_client = HttpClient()
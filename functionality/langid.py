@@ -0,0 +1,242 @@
+# functionality/langid.py
+"""Offline language identification from character n-gram profiles.
+
+``storage/lang_profiles.npz`` holds 1-3 character n-gram frequencies for 55
+languages: the Wikipedia-trained profiles published with ``langdetect`` (a
+port of Cybozu Labs' language-detection), converted by
+``python -m functionality.langid build``. Both are Apache-2.0; the license
+text and attribution ship next to the data as ``storage/lang_profiles.LICENSE``
+and ``storage/lang_profiles.NOTICE``.
+
+At load time the profiles become one (n-grams x languages) matrix of log
+probabilities, so scoring a text is: extract its n-grams, gather their rows
+and take a single vector dot with the n-gram counts. Text is normalized the
+same way the profiles were built (kana, hangul and kanji classes folded,
+punctuation dropped).
+"""
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+PROFILE_FILE = "storage/lang_profiles.npz"
+SMOOTHING = 0.5 / 10000   # added to every n-gram probability, as langdetect does
+# scores are mean log-likelihood per n-gram; this turns their gaps into probabilities
+TEMPERATURE = 12.0
+MIN_CHARS = 3
+
+_LATIN1_EXCLUDE = "\u00a0\u00ab\u00b0\u00bb"
+_LATIN = re.compile(r"[A-Za-z\u00c0-\u024f]")
+# languages that can't be the answer unless their script shows up (after normalizing)
+_REQUIRED_SCRIPT = {"ko": "가", "ja": "あア"}
+
+
+class Detection(NamedTuple):
+    lang: str
+    confidence: float
+
+
+class LanguageIdentifier:
+    def __init__(self, path: str = PROFILE_FILE):
+        self.path = path
+        self.langs: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._logp: Optional[np.ndarray] = None   # (n-grams, languages)
+        self._cjk: Dict[int, str] = {}
+        self._norm_cache: Dict[str, str] = {}
+        self._required: List[Tuple[int, str]] = []
+        self._lock = threading.Lock()
+
+    # ---------- loading ----------
+    def load(self):
+        with self._lock:
+            if self._logp is not None:
+                return
+            data = np.load(self.path, allow_pickle=False)
+            langs = [str(x) for x in data["langs"]]
+            grams = [str(x) for x in data["grams"]]
+            n_words = data["n_words"].astype(np.float64)          # (languages, 3)
+            gram_len = np.array([len(g) for g in grams], dtype=np.int64)
+
+            # P(gram | lang) = freq / n-grams of that length seen for lang
+            denom = n_words[:, gram_len - 1].T                    # (n-grams, languages)
+            counts = np.zeros((len(grams), len(langs)), dtype=np.float64)
+            counts[data["gram_idx"], data["lang_idx"]] = data["freq"]
+            logp = np.log(counts / denom + SMOOTHING)
+
+            self._cjk = {ord(c): r for c, r in zip(str(data["cjk_from"]), str(data["cjk_to"]))}
+            self._index = {g: i for i, g in enumerate(grams)}
+            self.langs = langs
+            self._required = [(langs.index(l), chars) for l, chars in _REQUIRED_SCRIPT.items() if l in langs]
+            self._logp = logp.astype(np.float32)
+
+    @property
+    def loaded(self) -> bool:
+        return self._logp is not None
+
+    # ---------- text -> n-grams ----------
+    def _norm_char(self, ch: str) -> str:
+        o = ord(ch)
+        if o < 0x80:
+            return ch if ch.isalpha() else " "
+        if o < 0x100:
+            return " " if ch in _LATIN1_EXCLUDE else ch
+        if 0x180 <= o < 0x250:
+            # Romanian comma-below letters => cedilla, as in the profiles
+            return {"ș": "ş", "ț": "ţ"}.get(ch, ch)
+        if 0x2000 <= o < 0x2070:
+            return " "
+        if 0x600 <= o < 0x700:
+            return "ي" if ch == "ی" else ch
+        if 0x1ea0 <= o < 0x1f00:
+            return "ể"
+        if 0x3040 <= o < 0x30a0:
+            return "あ"
+        if 0x30a0 <= o < 0x3100:
+            return "ア"
+        if 0x3100 <= o < 0x3130 or 0x31a0 <= o < 0x31c0:
+            return "ㄅ"
+        if 0x4e00 <= o < 0xa000:
+            return self._cjk.get(o, ch)
+        if 0xac00 <= o < 0xd7b0:
+            return "가"
+        # keep letters and combining marks (Indic vowel signs), drop the rest
+        return ch if ch.isalpha() or unicodedata.category(ch)[0] == "M" else " "
+
+    def normalize(self, text: str) -> str:
+        cache = self._norm_cache
+        out = []
+        for ch in text:
+            n = cache.get(ch)
+            if n is None:
+                n = cache[ch] = self._norm_char(ch)
+            out.append(n)
+        return "".join(out)
+
+    def ngrams(self, text: str) -> Counter:
+        return self._ngrams(self.normalize(text))
+
+    @staticmethod
+    def _ngrams(normalized: str) -> Counter:
+        grams: Counter = Counter()
+        for word in normalized.split():
+            s = f" {word} "
+            for end in range(1, len(s) + 1):
+                for n in (1, 2, 3):
+                    if end >= n:
+                        g = s[end - n:end]
+                        if g != " ":
+                            grams[g] += 1
+        return grams
+
+    # ---------- scoring ----------
+    def scores(self, text: str) -> Tuple[Optional[np.ndarray], int]:
+        """Mean log-likelihood per known n-gram for every language, and how many were known."""
+        if self._logp is None:
+            self.load()
+        idx, cnt = [], []
+        index = self._index
+        normalized = self.normalize(text)
+        # mostly non-Latin text with Latin words mixed in (code, names): score the rest
+        latin = len(_LATIN.findall(normalized))
+        if latin and latin * 2 < len(normalized.replace(" ", "")) - latin:
+            normalized = _LATIN.sub(" ", normalized)
+        for g, c in self._ngrams(normalized).items():
+            i = index.get(g)
+            if i is not None:
+                idx.append(i)
+                cnt.append(c)
+        if not idx:
+            return None, 0
+        counts = np.asarray(cnt, dtype=np.float32)
+        total = float(counts.sum())
+        s = (counts @ self._logp[idx]) / total
+        for i, chars in self._required:
+            if not any(c in normalized for c in chars):
+                s[i] = -np.inf
+        return s, int(total)
+
+    def rank(self, text: str, k: int = 3) -> List[Detection]:
+        s, known = self.scores(text)
+        if s is None or len(text.strip()) < MIN_CHARS:
+            return []
+        # confidence grows with both the score gap and the amount of evidence
+        z = (s - s.max()) * TEMPERATURE * min(1.0, known / 30.0) ** 0.5
+        p = np.exp(z)
+        p /= p.sum()
+        order = np.argsort(-p)[:k]
+        return [Detection(self.langs[i], float(p[i])) for i in order]
+
+    def detect(self, text: str) -> Optional[Detection]:
+        """Most likely language of ``text``, or None if it has nothing to go on."""
+        ranked = self.rank(text, 1)
+        return ranked[0] if ranked else None
+
+
+# written differently, translated differently: zh-cn and zh-tw are never the same
+_DISTINCT_VARIANTS = {"zh"}
+
+
+def same_language(a: str, b: str) -> bool:
+    """Compare codes loosely: he/iw, no/nb, and region variants (pt-br/pt) match.
+
+    Simplified and Traditional Chinese (zh-cn/zh-tw) are told apart; a bare
+    ``zh`` matches either.
+    """
+    alias = {"iw": "he", "nb": "no", "jw": "jv"}
+    a, b = a.lower(), b.lower()
+    a, b = alias.get(a, a), alias.get(b, b)
+    if a == b:
+        return True
+    base_a, _, region_a = a.partition("-")
+    base_b, _, region_b = b.partition("-")
+    if base_a != base_b:
+        return False
+    return base_a not in _DISTINCT_VARIANTS or not (region_a and region_b)
+
+
+langid = LanguageIdentifier()
+
+
+def build(out_path: str = PROFILE_FILE):
+    """Convert langdetect's profile files (needs ``pip install langdetect``) into PROFILE_FILE."""
+    import json
+    import langdetect
+    from langdetect.utils.ngram import NGram
+
+    pdir = os.path.join(os.path.dirname(langdetect.__file__), "profiles")
+    langs = sorted(os.listdir(pdir))
+    grams: Dict[str, int] = {}
+    lang_idx, gram_idx, freq, n_words = [], [], [], []
+    for li, lang in enumerate(langs):
+        with open(os.path.join(pdir, lang), "r", encoding="utf-8") as f:
+            profile = json.load(f)
+        n_words.append(profile["n_words"])
+        for g, c in profile["freq"].items():
+            gram_idx.append(grams.setdefault(g, len(grams)))
+            lang_idx.append(li)
+            freq.append(c)
+
+    cjk = NGram.CJK_MAP
+    np.savez_compressed(
+        out_path,
+        langs=np.array(langs),
+        grams=np.array(list(grams)),
+        lang_idx=np.array(lang_idx, dtype=np.int16),
+        gram_idx=np.array(gram_idx, dtype=np.int32),
+        freq=np.array(freq, dtype=np.int64),
+        n_words=np.array(n_words, dtype=np.int64),
+        cjk_from=np.array("".join(cjk.keys())),
+        cjk_to=np.array("".join(cjk.values())),
+    )
+    print(f"{len(langs)} languages, {len(grams)} n-grams -> {out_path}")
+
+
+if __name__ == "__main__":
+    import sys
+    if sys.argv[1:2] == ["build"]:
+        build(*sys.argv[2:3])
@@ -0,0 +1,183 @@
+# functionality/languages.py
+"""Language name/code lookup for the translation commands.
+
+Built once at import from googletrans' ``LANGUAGES``: exact maps for codes,
+names, aliases and flag emoji, plus a prefix trie over every word of every
+name so partial input ("portu", "simpl", "burm") resolves by walking the
+trie instead of scanning the whole table. Each trie node keeps its matches
+already ranked, so a lookup costs the length of the query.
+"""
+import difflib
+import re
+from typing import Dict, List, Optional, Tuple
+
+from googletrans import LANGUAGES
+
+# Flag emoji to language code mapping
+FLAG_LANG_MAP: Dict[str, str] = {
+    "🇺🇸": "en", "🇬🇧": "en",
+    "🇩🇪": "de",
+    "🇫🇷": "fr",
+    "🇪🇸": "es", "🇲🇽": "es",
+    "🇮🇹": "it",
+    "🇵🇹": "pt", "🇧🇷": "pt",
+    "🇷🇺": "ru",
+    "🇨🇳": "zh-cn", "🇹🇼": "zh-tw",
+    "🇯🇵": "ja",
+    "🇰🇷": "ko",
+    "🇸🇦": "ar", "🇦🇪": "ar",
+    "🇮🇳": "hi",
+    "🇳🇱": "nl",
+    "🇵🇱": "pl",
+    "🇹🇷": "tr",
+    "🇻🇳": "vi",
+    "🇹🇭": "th",
+    "🇮🇩": "id",
+    "🇬🇷": "el",
+    "🇨🇿": "cs",
+    "🇷🇴": "ro",
+    "🇭🇺": "hu",
+    "🇸🇪": "sv",
+    "🇩🇰": "da",
+    "🇳🇴": "no",
+    "🇫🇮": "fi",
+    "🇺🇦": "uk",
+    "🇮🇱": "he",
+    "🇮🇪": "ga",
+    "🇵🇭": "tl",
+    "🇿🇦": "af",
+}
+
+# Names people actually type that aren't googletrans' own
+ALIASES: Dict[str, str] = {
+    "chinese": "zh-cn", "mandarin": "zh-cn", "simplified chinese": "zh-cn", "zh": "zh-cn", "cn": "zh-cn",
+    "traditional chinese": "zh-tw", "taiwanese": "zh-tw",
+    "burmese": "my", "kurdish": "ku", "kurmanji": "ku", "haitian": "ht", "gaelic": "gd",
+    "farsi": "fa", "tagalog": "tl", "panjabi": "pa", "odia": "or", "flemish": "nl",
+    "castilian": "es", "brazilian": "pt", "jp": "ja", "kr": "ko", "gr": "el", "ua": "uk",
+    "cz": "cs", "dk": "da", "se": "sv", "nb": "no", "bokmal": "no",
+}
+
+# Codes to prefer when two share a name (googletrans lists hebrew as both)
+PREFERRED = {"hebrew": "he"}
+
+_NOT_WORD = re.compile(r"[^\w\s-]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(query: str) -> str:
+    """Lower-case, punctuation and parentheses dropped, spaces collapsed."""
+    return _SPACES.sub(" ", _NOT_WORD.sub(" ", query.lower())).strip()
+
+
+class _Node:
+    __slots__ = ("children", "ranked")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.ranked: List[Tuple[Tuple, str]] = []   # (rank key, code), best first
+
+
+class LanguageIndex:
+    def __init__(self, languages: Dict[str, str], aliases: Dict[str, str] = None,
+                 flags: Dict[str, str] = None):
+        self.names: Dict[str, str] = dict(languages)    # code -> name
+        self.codes: Dict[str, str] = {}                 # normalized name -> code
+        for code, name in languages.items():
+            key = normalize(name)
+            if key not in self.codes or PREFERRED.get(key) == code:
+                self.codes[key] = code
+        self.aliases: Dict[str, str] = {normalize(a): c for a, c in (aliases or {}).items() if c in languages}
+        self.flags: Dict[str, str] = {f: c for f, c in (flags or {}).items() if c in languages}
+        self.sorted: List[Tuple[str, str]] = sorted(languages.items(), key=lambda x: x[1])
+
+        self._root = _Node()
+        spelled_out = [(key, code) for key, code in self.aliases.items() if len(key) > 3]   # not "jp", "cz"
+        for key, code in list(self.codes.items()) + spelled_out:
+            for pos, word in enumerate(key.split()):
+                # whole-name prefixes beat later-word prefixes, then shorter names
+                self._insert(word, (pos > 0, len(key), key), code)
+        for node in self._walk(self._root):
+            best: Dict[str, Tuple] = {}
+            for rank, code in sorted(node.ranked):
+                best.setdefault(code, rank)
+            node.ranked = [(rank, code) for code, rank in best.items()]
+
+    def _insert(self, word: str, rank: Tuple, code: str):
+        node = self._root
+        for ch in word:
+            node = node.children.setdefault(ch, _Node())
+            node.ranked.append((rank, code))
+
+    @staticmethod
+    def _walk(node: _Node):
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            yield n
+            stack.extend(n.children.values())
+
+    def _prefix(self, word: str) -> List[str]:
+        node = self._root
+        for ch in word:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return [code for _, code in node.ranked]
+
+    def _matches(self, query: str) -> List[str]:
+        words = normalize(query).split()
+        if not words:
+            return []
+        matches = self._prefix(words[0])
+        for word in words[1:]:
+            allowed = set(self._prefix(word))
+            matches = [code for code in matches if code in allowed]
+        return matches
+
+    def display_name(self, code: str) -> str:
+        code = code.lower()
+        if code in self.names:
+            return self.names[code].capitalize()
+        return code.upper()
+
+    def exact(self, query: str) -> Optional[str]:
+        """Code for an exact code, name, alias or flag emoji, else None."""
+        query = query.strip()
+        if query in self.flags:
+            return self.flags[query]
+        key = normalize(query)
+        if key in self.names:
+            return key
+        return self.codes.get(key) or self.aliases.get(key)
+
+    def suggest(self, query: str, k: int = 5) -> List[str]:
+        """Up to ``k`` codes for partial input, best first.
+
+        Every word of the query must prefix some word of the name; with no
+        prefix match at all, falls back to close spellings of the names.
+        """
+        matches = self._matches(query)
+        if matches:
+            return matches[:k]
+        key = normalize(query)
+        if not key:
+            return []
+        close = difflib.get_close_matches(key, list(self.codes) + list(self.aliases), n=k, cutoff=0.75)
+        out: List[str] = []
+        for key in close:
+            code = self.codes.get(key) or self.aliases[key]
+            if code not in out:
+                out.append(code)
+        return out
+
+    def resolve(self, query: str) -> Optional[str]:
+        """Code for ``query``: an exact match, else the best prefix match."""
+        code = self.exact(query)
+        if code is not None:
+            return code
+        matches = self._matches(query)
+        return matches[0] if matches else None
+
+
+languages = LanguageIndex(LANGUAGES, ALIASES, FLAG_LANG_MAP)
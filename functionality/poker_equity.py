@@ -0,0 +1,146 @@
+# functionality/poker_equity.py
+"""Hold'em equity (win/tie probability) against random opponent hands.
+
+Spots with at most ``EXHAUSTIVE_LIMIT`` (board, opponent hands) scenarios
+are enumerated exactly. In practice that is the river and the turn heads-up
+(990 and 45,540 scenarios); a river against two opponents is already
+893,970 and the turn against two is tens of millions, so multiway pots are
+Monte Carlo sampled and the result carries a sampling margin
+(``Equity.margin``). Both paths build NumPy card arrays and score
+them with ``poker_eval.evaluate_batch``, so a 100k-trial estimate is a
+handful of vectorised passes. ``equity_async`` runs the work in a process
+pool so the event loop never blocks on it.
+"""
+import asyncio
+import math
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from typing import Iterator, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from functionality import poker_eval
+
+DEFAULT_SAMPLES = 100_000
+EXHAUSTIVE_LIMIT = 200_000
+CHUNK = 25_000
+POOL_WORKERS = 2
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class Equity(NamedTuple):
+    win: float
+    tie: float
+    trials: int
+    exhaustive: bool
+
+    @property
+    def margin(self) -> float:
+        """95% half-width of the win estimate; 0 when enumerated exactly"""
+        if self.exhaustive or not self.trials:
+            return 0.0
+        return 1.96 * math.sqrt(self.win * (1 - self.win) / self.trials)
+
+
+def _scenario_count(remaining: int, board_needed: int, opponents: int) -> int:
+    n = math.comb(remaining, board_needed)
+    remaining -= board_needed
+    for _ in range(opponents):
+        n *= math.comb(remaining, 2)
+        remaining -= 2
+    return n
+
+
+def _deal_holes(cards: Tuple[int, ...], opponents: int) -> Iterator[Tuple[int, ...]]:
+    if opponents == 0:
+        yield ()
+        return
+    for hole in combinations(cards, 2):
+        rest = tuple(c for c in cards if c not in hole)
+        for others in _deal_holes(rest, opponents - 1):
+            yield hole + others
+
+
+def _enumerate(remaining: Sequence[int], board_needed: int, opponents: int) -> np.ndarray:
+    rows = []
+    for extra in combinations(remaining, board_needed):
+        rest = tuple(c for c in remaining if c not in extra)
+        for holes in _deal_holes(rest, opponents):
+            rows.append(extra + holes)
+    return np.array(rows, dtype=np.int64).reshape(len(rows), board_needed + 2 * opponents)
+
+
+def _sample(rng: np.random.Generator, remaining: np.ndarray, need: int, n: int) -> np.ndarray:
+    """``n`` random draws of ``need`` distinct cards, in random order."""
+    keys = rng.random((n, len(remaining)))
+    idx = np.argpartition(keys, need - 1, axis=1)[:, :need]
+    order = np.argsort(np.take_along_axis(keys, idx, axis=1), axis=1)
+    return remaining[np.take_along_axis(idx, order, axis=1)]
+
+
+def _score(hole: np.ndarray, board: np.ndarray, draws: np.ndarray, board_needed: int, opponents: int) -> Tuple[int, int]:
+    n = len(draws)
+    full_board = np.concatenate([np.broadcast_to(board, (n, len(board))), draws[:, :board_needed]], axis=1)
+    hero = poker_eval.evaluate_batch(np.concatenate([np.broadcast_to(hole, (n, 2)), full_board], axis=1))
+    best_opp = np.zeros(n, dtype=np.int64)
+    for i in range(opponents):
+        opp_hole = draws[:, board_needed + 2 * i: board_needed + 2 * i + 2]
+        best_opp = np.maximum(best_opp, poker_eval.evaluate_batch(np.concatenate([opp_hole, full_board], axis=1)))
+    return int(np.count_nonzero(hero > best_opp)), int(np.count_nonzero(hero == best_opp))
+
+
+def equity(hole_codes: Sequence[str], board_codes: Sequence[str] = (), opponents: int = 1,
+           samples: int = DEFAULT_SAMPLES, seed: Optional[int] = None) -> Equity:
+    """Probability that ``hole_codes`` wins / ties against ``opponents`` random hands."""
+    if len(hole_codes) != 2 or len(board_codes) > 5:
+        raise ValueError("Need 2 hole cards and at most 5 board cards")
+    opponents = max(1, min(opponents, 9))
+
+    hole = np.array(poker_eval.codes_to_ints(hole_codes), dtype=np.int64)
+    board = np.array(poker_eval.codes_to_ints(board_codes), dtype=np.int64)
+    known = set(hole.tolist()) | set(board.tolist())
+    remaining = [c for c in poker_eval.FULL_DECK if c not in known]
+    board_needed = 5 - len(board)
+
+    wins = ties = trials = 0
+    total = _scenario_count(len(remaining), board_needed, opponents)
+    if total <= EXHAUSTIVE_LIMIT:
+        draws = _enumerate(remaining, board_needed, opponents)
+        for start in range(0, len(draws), CHUNK):
+            w, t = _score(hole, board, draws[start:start + CHUNK], board_needed, opponents)
+            wins, ties = wins + w, ties + t
+        trials = len(draws)
+        exhaustive = True
+    else:
+        rng = np.random.default_rng(seed)
+        rem = np.array(remaining, dtype=np.int64)
+        need = board_needed + 2 * opponents
+        while trials < samples:
+            n = min(CHUNK, samples - trials)
+            w, t = _score(hole, board, _sample(rng, rem, need, n), board_needed, opponents)
+            wins, ties, trials = wins + w, ties + t, trials + n
+        exhaustive = False
+
+    return Equity(wins / trials, ties / trials, trials, exhaustive)
+
+
+# ---------- process pool ----------
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, initializer=poker_eval.warm)
+    return _pool
+
+
+async def equity_async(hole_codes: Sequence[str], board_codes: Sequence[str] = (), opponents: int = 1,
+                       samples: int = DEFAULT_SAMPLES) -> Equity:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), equity, list(hole_codes), list(board_codes), opponents, samples)
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
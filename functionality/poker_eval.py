@@ -0,0 +1,223 @@
+# functionality/poker_eval.py
+"""Table-driven Texas Hold'em hand evaluator.
+
+Cards are Cactus-Kev style integers::
+
+    +--------+--------+--------+--------+
+    |xxxbbbbb|bbbbbbbb|cdhsrrrr|xxpppppp|
+    +--------+--------+--------+--------+
+
+    p = prime for the rank (deuce=2 ... ace=41)
+    r = rank index (deuce=0 ... ace=12)
+    cdhs = suit bit
+    b = one bit per rank
+
+Any 5-7 card hand is evaluated without enumerating 5-card subsets: if a
+suit holds five or more cards the suit's rank bitmask indexes a flush table,
+otherwise the product of the rank primes indexes a table over every rank
+multiset. (A 7-card hand cannot hold a flush and a full house/quads at the
+same time, so the flush check can short-circuit.)
+
+Strengths are plain ints, higher is better::
+
+    category << 20 | r1 << 16 | r2 << 12 | r3 << 8 | r4 << 4 | r5
+
+with the categories used by ``cogs.poker`` (0 = high card ... 8 = straight
+flush) and ranks 2..14, so ``to_rank_tuple`` gives back exactly the tuple
+``hand_rank_5``/``best_7`` would have produced.
+"""
+from itertools import combinations_with_replacement
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+RANK_CHARS = "234567890JQKA"  # deckofcardsapi codes use '0' for ten
+SUIT_BITS = {"S": 0x1, "H": 0x2, "D": 0x4, "C": 0x8}
+CATEGORY_SHIFT = 20
+
+# suit bit -> a counter nibble, so summing over a hand counts cards per suit
+_SUIT_NIBBLE = {0x1: 0x1, 0x2: 0x10, 0x4: 0x100, 0x8: 0x1000}
+
+_FLUSH: Optional[List[int]] = None
+_NONFLUSH: Optional[Dict[int, int]] = None
+_FLUSH_ARR: Optional[np.ndarray] = None
+_KEYS_ARR: Optional[np.ndarray] = None
+_VALS_ARR: Optional[np.ndarray] = None
+
+
+# ---------- card encoding ----------
+def card_int(code: str) -> int:
+    """'AS' / '0H' / 'TD' -> Cactus-Kev integer"""
+    r = code[0].upper()
+    r = "0" if r == "T" else r
+    rank = RANK_CHARS.index(r)
+    return PRIMES[rank] | (rank << 8) | (SUIT_BITS[code[1].upper()] << 12) | (1 << (16 + rank))
+
+
+def codes_to_ints(codes: Iterable[str]) -> List[int]:
+    return [card_int(c) for c in codes]
+
+
+FULL_DECK = [card_int(r + s) for s in "SHDC" for r in RANK_CHARS]
+
+
+# ---------- table construction ----------
+def _encode(cat: int, ranks: Sequence[int]) -> int:
+    v = cat << CATEGORY_SHIFT
+    for i, r in enumerate(ranks):
+        v |= r << (16 - 4 * i)
+    return v
+
+
+def _straight_high(mask: int) -> int:
+    """Highest straight in a 13-bit rank mask (bit 0 = deuce), 0 if none"""
+    for hi in range(12, 3, -1):
+        run = 0x1F << (hi - 4)
+        if mask & run == run:
+            return hi + 2
+    if mask & 0x100F == 0x100F:  # A-2-3-4-5
+        return 5
+    return 0
+
+
+def _mask_ranks_desc(mask: int) -> List[int]:
+    return [r + 2 for r in range(12, -1, -1) if mask >> r & 1]
+
+
+def _flush_value(mask: int) -> int:
+    sh = _straight_high(mask)
+    if sh:
+        return _encode(8, [sh])
+    return _encode(5, _mask_ranks_desc(mask)[:5])
+
+
+def _nonflush_value(counts: Dict[int, int]) -> int:
+    desc = sorted(counts, reverse=True)
+    quads = [r for r in desc if counts[r] == 4]
+    trips = [r for r in desc if counts[r] == 3]
+    pairs = [r for r in desc if counts[r] == 2]
+
+    if quads:
+        q = quads[0]
+        return _encode(7, [q, max(r for r in desc if r != q)])
+    if trips and (len(trips) > 1 or pairs):
+        t = trips[0]
+        return _encode(6, [t, max(r for r in trips[1:] + pairs)])
+
+    mask = 0
+    for r in desc:
+        mask |= 1 << (r - 2)
+    sh = _straight_high(mask)
+    if sh:
+        return _encode(4, [sh])
+
+    if trips:
+        t = trips[0]
+        return _encode(3, [t] + [r for r in desc if r != t][:2])
+    if len(pairs) >= 2:
+        p1, p2 = pairs[:2]
+        return _encode(2, [p1, p2, max(r for r in desc if r not in (p1, p2))])
+    if pairs:
+        p = pairs[0]
+        return _encode(1, [p] + [r for r in desc if r != p][:3])
+    return _encode(0, desc[:5])
+
+
+def _build_tables():
+    global _FLUSH, _NONFLUSH, _FLUSH_ARR, _KEYS_ARR, _VALS_ARR
+    flush = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if bin(mask).count("1") >= 5:
+            flush[mask] = _flush_value(mask)
+
+    nonflush: Dict[int, int] = {}
+    for n in (5, 6, 7):
+        for combo in combinations_with_replacement(range(13), n):
+            counts: Dict[int, int] = {}
+            for r in combo:
+                counts[r + 2] = counts.get(r + 2, 0) + 1
+            if max(counts.values()) > 4:
+                continue
+            product = 1
+            for r in combo:
+                product *= PRIMES[r]
+            nonflush[product] = _nonflush_value(counts)
+
+    keys = np.fromiter(sorted(nonflush), dtype=np.int64, count=len(nonflush))
+    _KEYS_ARR = keys
+    _VALS_ARR = np.fromiter((nonflush[k] for k in keys.tolist()), dtype=np.int64, count=len(keys))
+    _FLUSH_ARR = np.asarray(flush, dtype=np.int64)
+    _FLUSH, _NONFLUSH = flush, nonflush
+
+
+def warm():
+    """Build the lookup tables now instead of on the first evaluation."""
+    if _NONFLUSH is None:
+        _build_tables()
+
+
+# ---------- evaluation ----------
+def evaluate(cards: Sequence[int]) -> int:
+    """Strength of the best 5-card hand within 5-7 Cactus-Kev cards."""
+    if _NONFLUSH is None:
+        _build_tables()
+    product = 1
+    suits = 0
+    for c in cards:
+        product *= c & 0x3F
+        suits += _SUIT_NIBBLE[(c >> 12) & 0xF]
+    # a nibble reaches 8 after +3 only if it held 5+ cards
+    if (suits + 0x3333) & 0x8888:
+        for bit, shift in ((0x1, 0), (0x2, 4), (0x4, 8), (0x8, 12)):
+            if (suits >> shift) & 0xF >= 5:
+                mask = 0
+                for c in cards:
+                    if c & (bit << 12):
+                        mask |= c >> 16
+                return _FLUSH[mask]
+    return _NONFLUSH[product]
+
+
+def evaluate_codes(codes: Iterable[str]) -> int:
+    return evaluate(codes_to_ints(codes))
+
+
+def evaluate_batch(hands: np.ndarray) -> np.ndarray:
+    """Vectorised ``evaluate`` over an (N, k) array of card ints, 5 <= k <= 7."""
+    if _NONFLUSH is None:
+        _build_tables()
+    hands = np.asarray(hands, dtype=np.int64)
+    product = np.prod(hands & 0x3F, axis=1)
+    out = _VALS_ARR[np.searchsorted(_KEYS_ARR, product)]
+
+    suits = (hands >> 12) & 0xF
+    rank_bits = hands >> 16
+    for bit in (0x1, 0x2, 0x4, 0x8):
+        in_suit = suits == bit
+        rows = np.count_nonzero(in_suit, axis=1) >= 5
+        if rows.any():
+            mask = np.bitwise_or.reduce(np.where(in_suit[rows], rank_bits[rows], 0), axis=1)
+            out[rows] = _FLUSH_ARR[mask]
+    return out
+
+
+def category(strength: int) -> int:
+    return strength >> CATEGORY_SHIFT
+
+
+def to_rank_tuple(strength: int) -> tuple:
+    """Convert a strength back to the ``hand_rank_5`` tuple shape."""
+    cat = strength >> CATEGORY_SHIFT
+    r = [(strength >> (16 - 4 * i)) & 0xF for i in range(5)]
+    if cat in (8, 4):
+        return (cat, r[0])
+    if cat in (7, 6):
+        return (cat, r[0], r[1])
+    if cat == 5 or cat == 0:
+        return (cat, r)
+    if cat == 3:
+        return (cat, r[0], r[1:3])
+    if cat == 2:
+        return (cat, r[0], r[1], r[2])
+    return (cat, r[0], r[1:4])
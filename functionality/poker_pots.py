@@ -0,0 +1,67 @@
+# functionality/poker_pots.py
+"""Main/side pot construction and showdown settlement.
+
+Pots are built from what every player put in over the whole hand (folded
+players included, they just aren't eligible to win). Sorting the distinct
+contribution levels once gives every pot in O(n log n); each pot is then
+awarded from a single precomputed score per player, so hands are never
+re-evaluated per pot.
+"""
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+
+class Pot(NamedTuple):
+    amount: int
+    eligible: Tuple[int, ...]
+
+
+def build_pots(contributions: Dict[int, int], live: Iterable[int]) -> List[Pot]:
+    """Split total contributions into a main pot followed by side pots."""
+    live = set(live)
+    players = sorted((amt, uid) for uid, amt in contributions.items() if amt > 0)
+    pots: List[Pot] = []
+    carry = 0
+    prev = 0
+    for i, (level, _) in enumerate(players):
+        if level == prev:
+            continue
+        amount = (level - prev) * (len(players) - i) + carry
+        eligible = tuple(sorted(uid for amt, uid in players[i:] if uid in live))
+        prev = level
+        if not eligible:
+            # only folded players reached this level; fold it into the next pot
+            carry = amount
+            continue
+        carry = 0
+        if pots and pots[-1].eligible == eligible:
+            pots[-1] = Pot(pots[-1].amount + amount, eligible)
+        else:
+            pots.append(Pot(amount, eligible))
+    if carry and pots:
+        pots[-1] = Pot(pots[-1].amount + carry, pots[-1].eligible)
+    return pots
+
+
+def award_pots(pots: Sequence[Pot], scores: Dict[int, int], order: Sequence[int]) -> Tuple[Dict[int, int], List[Tuple[Pot, List[int]]]]:
+    """Pay out each pot to its best eligible hand(s).
+
+    ``order`` is the seating order starting left of the dealer; odd chips
+    from a split pot go one at a time to the winners earliest in it.
+    Returns (payout per player, [(pot, winners), ...]).
+    """
+    seat = {uid: i for i, uid in enumerate(order)}
+    payouts: Dict[int, int] = {}
+    results: List[Tuple[Pot, List[int]]] = []
+    for pot in pots:
+        best = max(scores[uid] for uid in pot.eligible)
+        winners = sorted((uid for uid in pot.eligible if scores[uid] == best), key=lambda u: seat.get(u, len(seat)))
+        share, odd = divmod(pot.amount, len(winners))
+        for i, uid in enumerate(winners):
+            payouts[uid] = payouts.get(uid, 0) + share + (1 if i < odd else 0)
+        results.append((pot, winners))
+    return payouts, results
+
+
+def settle(contributions: Dict[int, int], scores: Dict[int, int], order: Sequence[int]) -> Tuple[Dict[int, int], List[Tuple[Pot, List[int]]]]:
+    """Build pots for the players still holding cards and award them."""
+    return award_pots(build_pots(contributions, scores.keys()), scores, order)
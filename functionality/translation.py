@@ -0,0 +1,110 @@
+# functionality/translation.py
+"""Non-blocking front end for googletrans.
+
+googletrans is synchronous, so every call runs on a small thread pool (one
+``Translator`` per worker thread, it isn't safe to share). A semaphore caps
+how many requests may be queued or running, identical requests that are
+already in flight share one call, and results are kept in an LRU+TTL cache
+keyed by (hash of the normalized text, src, dest). Callers that cache
+results themselves pass ``cache_size=0`` so nothing is stored twice.
+"""
+import asyncio
+import hashlib
+import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from googletrans import Translator
+
+from functionality.ttl_cache import TTLCache
+
+WORKERS = 4
+MAX_PENDING = 32
+CACHE_SIZE = 2048
+CACHE_TTL = 6 * 3600
+
+_SPACES = re.compile(r"[^\S\n]+")
+_AROUND_NL = re.compile(r" ?\n ?")
+
+
+def normalize(text: str) -> str:
+    """NFC, trimmed, runs of spaces collapsed; line breaks are kept."""
+    text = _SPACES.sub(" ", unicodedata.normalize("NFC", text))
+    return _AROUND_NL.sub("\n", text).strip()
+
+
+def text_key(text: str) -> str:
+    return hashlib.blake2b(normalize(text).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TranslationService:
+    def __init__(self, workers: int = WORKERS, max_pending: int = MAX_PENDING,
+                 cache_size: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.workers = workers
+        self.cache: Optional[TTLCache] = TTLCache(cache_size, ttl) if cache_size > 0 else None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = asyncio.Semaphore(max_pending)
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self._local = threading.local()
+
+    def _translator(self) -> Translator:
+        tr = getattr(self._local, "translator", None)
+        if tr is None:
+            tr = self._local.translator = Translator()
+        return tr
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="translate")
+        return self._executor
+
+    def _translate_sync(self, text: str, dest: str, src: str) -> Dict[str, str]:
+        result = self._translator().translate(text, dest=dest, src=src)
+        return {"text": result.text, "src": result.src, "dest": result.dest}
+
+    def _detect_sync(self, text: str):
+        return self._translator().detect(text)
+
+    async def _run(self, fn, *args):
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool(), fn, *args)
+
+    async def translate(self, text: str, dest: str, src: str = "auto") -> Dict[str, str]:
+        """{"text", "src", "dest"} for ``text``; raises whatever googletrans raises."""
+        key = (text_key(text), src, dest)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+
+        # the call runs as its own task so cancelling any one caller,
+        # including the one that started it, leaves the others waiting on it
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._translate_shared(key, normalize(text), dest, src))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._settled(key, t))
+        return await asyncio.shield(task)
+
+    async def _translate_shared(self, key: Tuple, text: str, dest: str, src: str) -> Dict[str, str]:
+        result = await self._run(self._translate_sync, text, dest, src)
+        if self.cache is not None:
+            self.cache.put(key, result)
+        return result
+
+    def _settled(self, key: Tuple, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # every caller may have been cancelled; don't warn about an unretrieved exception
+            task.exception()
+
+    async def detect(self, text: str):
+        return await self._run(self._detect_sync, text)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,198 @@
+# functionality/trivia_pool.py
+"""In-memory pool of prefetched opentdb.com questions.
+
+Questions are fetched 50 at a time per category and handed out from a deque,
+so a trivia command normally never waits on the network. When a category's
+buffer drops below ``LOW_WATER`` a background refill is scheduled (one per
+category at a time). An opentdb session token keeps the API from repeating
+questions; on top of that the last ``SEEN_LIMIT`` question texts are deduped
+locally.
+"""
+import asyncio
+import html
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from functionality.http_client import http_client
+from functionality.structures import Trivia
+
+API_URL = "https://opentdb.com/api.php"
+TOKEN_URL = "https://opentdb.com/api_token.php"
+BATCH = 50
+LOW_WATER = 10
+RATE_LIMIT_WAIT = 5.0   # opentdb allows one request per IP every 5 seconds
+SEEN_LIMIT = 5000       # question texts remembered for local dedupe
+
+# opentdb response codes
+OK, NO_RESULTS, INVALID_PARAM, TOKEN_NOT_FOUND, TOKEN_EMPTY, RATE_LIMIT = range(6)
+
+CATEGORIES = {
+    "general": 9, "books": 10, "film": 11, "music": 12, "theatre": 13,
+    "tv": 14, "videogames": 15, "boardgames": 16, "science": 17,
+    "computers": 18, "math": 19, "mythology": 20, "sports": 21,
+    "geography": 22, "history": 23, "politics": 24, "art": 25,
+    "celebrities": 26, "animals": 27, "vehicles": 28, "comics": 29,
+    "gadgets": 30, "anime": 31, "cartoons": 32,
+}
+
+# category names as opentdb spells them in results (and dumps)
+CATEGORY_NAMES = {
+    9: "General Knowledge", 10: "Entertainment: Books", 11: "Entertainment: Film",
+    12: "Entertainment: Music", 13: "Entertainment: Musicals & Theatres",
+    14: "Entertainment: Television", 15: "Entertainment: Video Games",
+    16: "Entertainment: Board Games", 17: "Science & Nature", 18: "Science: Computers",
+    19: "Science: Mathematics", 20: "Mythology", 21: "Sports", 22: "Geography",
+    23: "History", 24: "Politics", 25: "Art", 26: "Celebrities", 27: "Animals",
+    28: "Vehicles", 29: "Entertainment: Comics", 30: "Science: Gadgets",
+    31: "Entertainment: Japanese Anime & Manga", 32: "Entertainment: Cartoon & Animations",
+}
+DIFFICULTIES = ("easy", "medium", "hard")
+
+Key = Tuple[Optional[int], Optional[str]]
+
+
+def unescape_result(result: Dict) -> Dict:
+    """opentdb HTML-escapes every string in a ``results`` entry."""
+    return {
+        "category": html.unescape(result["category"]),
+        "difficulty": result.get("difficulty", "medium"),
+        "type": result.get("type", "multiple"),
+        "question": html.unescape(result["question"]),
+        "correct_answer": html.unescape(result["correct_answer"]),
+        "incorrect_answers": [html.unescape(a) for a in result["incorrect_answers"]],
+    }
+
+
+def parse_question(result: Dict) -> Trivia:
+    """Turn one unescaped ``results`` entry into a Trivia object."""
+    return Trivia(result["question"], result["category"], result["correct_answer"], result["incorrect_answers"])
+
+
+class QuestionPool:
+    def __init__(self, batch: int = BATCH, low_water: int = LOW_WATER,
+                 sink: Optional[Callable[[List[Dict]], object]] = None):
+        self.batch = batch
+        self.low_water = low_water
+        self.sink = sink  # also gets every fetched batch (e.g. to grow the offline bank)
+        self._queues: Dict[Key, Deque[Trivia]] = {}
+        self._refills: Dict[Key, asyncio.Task] = {}
+        self._seen: Set[str] = set()
+        self._seen_order: Deque[str] = deque()   # oldest first, to keep _seen under SEEN_LIMIT
+        self._token: Optional[str] = None
+        self._api_lock = asyncio.Lock()
+        self._last_call = 0.0
+
+    def available(self, category: Optional[int] = None, difficulty: Optional[str] = None) -> int:
+        return len(self._queues.get((category, difficulty), ()))
+
+    async def get(self, category: Optional[int] = None, difficulty: Optional[str] = None) -> Trivia:
+        """Next unseen question for the filters (None = any)."""
+        key = (category, difficulty)
+        q = self._queues.setdefault(key, deque())
+        if not q:
+            await asyncio.shield(self.schedule_refill(category, difficulty))
+            if not q:
+                raise ValueError("No trivia questions available")
+        question = q.popleft()
+        if len(q) < self.low_water:
+            self.schedule_refill(category, difficulty)
+        return question
+
+    def schedule_refill(self, category: Optional[int] = None, difficulty: Optional[str] = None) -> asyncio.Task:
+        """Start a refill for the filters unless one is already running."""
+        key = (category, difficulty)
+        task = self._refills.get(key)
+        if task is None or task.done():
+            task = self._refills[key] = asyncio.create_task(self._refill(key))
+            task.add_done_callback(self._report)
+        return task
+
+    @staticmethod
+    def _report(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Trivia refill failed: {task.exception()}")
+
+    async def _refill(self, key: Key):
+        q = self._queues.setdefault(key, deque())
+        results = [unescape_result(r) for r in await self._fetch(key)]
+        if self.sink is not None and results:
+            await asyncio.to_thread(self.sink, results)
+        for result in results:
+            question = parse_question(result)
+            if question.question in self._seen:
+                continue
+            self._remember(question.question)
+            q.append(question)
+
+    def _remember(self, text: str):
+        self._seen.add(text)
+        self._seen_order.append(text)
+        if len(self._seen_order) > SEEN_LIMIT:
+            self._seen.discard(self._seen_order.popleft())
+
+    def _forget_seen(self):
+        self._seen.clear()
+        self._seen_order.clear()
+
+    def _params(self, key: Key, amount: int) -> Dict:
+        category, difficulty = key
+        params = {"amount": amount, "type": "multiple"}
+        if self._token is not None:
+            params["token"] = self._token
+        if category is not None:
+            params["category"] = category
+        if difficulty is not None:
+            params["difficulty"] = difficulty
+        return params
+
+    async def _fetch(self, key: Key) -> List[Dict]:
+        async with self._api_lock:
+            for _ in range(3):
+                wait = self._last_call + RATE_LIMIT_WAIT - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                if self._token is None:
+                    await self._new_token()
+
+                data = await http_client.get_json(API_URL, params=self._params(key, self.batch))
+                self._last_call = time.monotonic()
+
+                code = data.get("response_code", OK)
+                if code == OK:
+                    return data["results"]
+                if code == TOKEN_NOT_FOUND:
+                    self._token = None
+                elif code == TOKEN_EMPTY:
+                    # every question for this token was served, start over
+                    await http_client.get_json(TOKEN_URL, params={"command": "reset", "token": self._token})
+                    self._forget_seen()
+                elif code == NO_RESULTS and self.batch > 1:
+                    # fewer than ``batch`` left for this token/category
+                    return await self._fetch_remaining(key)
+                elif code != RATE_LIMIT:
+                    raise ValueError(f"opentdb response code {code}")
+            raise ValueError("opentdb kept refusing the request")
+
+    async def _fetch_remaining(self, key: Key) -> List[Dict]:
+        await asyncio.sleep(RATE_LIMIT_WAIT)
+        data = await http_client.get_json(API_URL, params=self._params(key, 10))
+        self._last_call = time.monotonic()
+        return data.get("results", [])
+
+    async def _new_token(self):
+        """Ask for a session token; without one questions still come, just possibly repeated."""
+        try:
+            data = await http_client.get_json(TOKEN_URL, params={"command": "request"})
+        except Exception as e:
+            print(f"Trivia token request failed: {e}")
+            return
+        self._token = data.get("token")
+        if self._token is not None:
+            # a fresh token starts opentdb's own dedupe over
+            self._forget_seen()
+
+    def close(self):
+        for task in self._refills.values():
+            task.cancel()
+        self._refills.clear()
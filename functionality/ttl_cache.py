@@ -0,0 +1,155 @@
+# functionality/ttl_cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Size-bounded LRU whose entries also expire ``ttl`` seconds after insert.
+
+    ``get`` moves a live entry to the most-recent end; expired entries are
+    dropped when they are looked up or reach the old end of the LRU order.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self.misses += 1
+            return default
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        self._evict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        item = self._data.get(key, _MISSING)
+        return item is not _MISSING and item[0] >= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _evict(self):
+        now = time.monotonic()
+        data = self._data
+        while data:
+            key, (expires, _) = next(iter(data.items()))
+            if len(data) > self.maxsize or expires < now:
+                del data[key]
+            else:
+                break
+
+    def values(self):
+        return [value for _, value in self._data.values()]
+
+    def clear(self):
+        self._data.clear()
+
+
+def _approx_size(value: Any) -> int:
+    if isinstance(value, (str, bytes)):
+        return len(value) + 50
+    if isinstance(value, dict):
+        return sum(_approx_size(v) for v in value.values()) + 100
+    return 64
+
+
+class GuildLRU:
+    """LRU shared by every guild, with a per-guild entry quota.
+
+    Bounded three ways: total entries, approximate total bytes and entries
+    per guild, so one busy server only ever evicts its own oldest entries
+    once it hits its quota. Entries expire ``ttl`` seconds after insert.
+    Every operation is O(1): one global ``OrderedDict`` for LRU order and
+    one per guild to find that guild's oldest key.
+    """
+
+    def __init__(self, maxsize: int = 5000, max_bytes: int = 8 * 1024 * 1024,
+                 per_guild: int = 500, ttl: float = 6 * 3600.0):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.per_guild = per_guild
+        self.ttl = ttl
+        self._data: "OrderedDict[Tuple[int, Hashable], Tuple[float, Any, int]]" = OrderedDict()
+        self._guilds: Dict[int, "OrderedDict[Hashable, None]"] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, guild_id: int, key: Hashable, default: Any = None) -> Any:
+        full = (guild_id, key)
+        item = self._data.get(full, _MISSING)
+        if item is _MISSING or item[0] < time.monotonic():
+            if item is not _MISSING:
+                self._remove(full)
+            self.misses += 1
+            return default
+        self._data.move_to_end(full)
+        self._guilds[guild_id].move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def __contains__(self, gk: Tuple[int, Hashable]) -> bool:
+        item = self._data.get(gk, _MISSING)
+        return item is not _MISSING and item[0] >= time.monotonic()
+
+    def put(self, guild_id: int, key: Hashable, value: Any):
+        full = (guild_id, key)
+        if full in self._data:
+            self._remove(full)
+        size = _approx_size(value)
+        self._data[full] = (time.monotonic() + self.ttl, value, size)
+        self._guilds.setdefault(guild_id, OrderedDict())[key] = None
+        self.bytes += size
+
+        mine = self._guilds[guild_id]
+        while len(mine) > self.per_guild:
+            self._remove((guild_id, next(iter(mine))))
+            self.evictions += 1
+        now = time.monotonic()
+        while self._data and (len(self._data) > self.maxsize or self.bytes > self.max_bytes
+                              or next(iter(self._data.values()))[0] < now):
+            self._remove(next(iter(self._data)))
+            self.evictions += 1
+
+    def pop(self, guild_id: int, key: Hashable, default: Any = None) -> Any:
+        full = (guild_id, key)
+        if full not in self._data:
+            return default
+        value = self._data[full][1]
+        self._remove(full)
+        return value
+
+    def _remove(self, full: Tuple[int, Hashable]):
+        _, _, size = self._data.pop(full)
+        self.bytes -= size
+        gid, key = full
+        mine = self._guilds[gid]
+        del mine[key]
+        if not mine:
+            del self._guilds[gid]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._data), "bytes": self.bytes, "guilds": len(self._guilds),
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
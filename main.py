@@ -5,6 +5,8 @@ from functionality.days import check_day
 from constants.lists import thedan, flag_emoji_dict, table
 from cogs.help import NewHelpName
 from functionality.functions import check_carrot, get_insult
+from storage.guild_store import guild_store
+from functionality.http_client import http_client
 import json
 from functionality.trie import Trie
 import asyncio
@@ -25,12 +27,7 @@ def get_prefix(client, message):
     """Get server prefix, with fallback for DMs"""
     if message.guild is None:
         return "$"
-    try:
-        with open("storage/prefixes.json", "r") as f:
-            prefixes = json.load(f)
-        return prefixes.get(str(message.guild.id), "$")
-    except (FileNotFoundError, json.JSONDecodeError):
-        return "$"
+    return guild_store.get_prefix(message.guild.id)
 
 
 intents = discord.Intents.all()
@@ -99,17 +96,8 @@ async def on_ready():
 
 @client.event
 async def on_guild_join(guild):
-    try:
-        with open("storage/prefixes.json", "r") as f:
-            prefixes = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        prefixes = {}
-
-    prefixes[str(guild.id)] = "$"
+    guild_store.set_prefix(guild.id, "$")
 
-    with open("storage/prefixes.json", "w") as f:
-        json.dump(prefixes, f, indent=4)
-    
     # Update status
     await client.change_presence(
         activity=discord.Activity(
@@ -121,15 +109,8 @@ async def on_guild_join(guild):
 
 @client.event
 async def on_guild_remove(guild):
-    try:
-        with open("storage/prefixes.json", "r") as f:
-            prefixes = json.load(f)
-        prefixes.pop(str(guild.id), None)
-        with open("storage/prefixes.json", "w") as f:
-            json.dump(prefixes, f, indent=4)
-    except (FileNotFoundError, json.JSONDecodeError):
-        pass
-    
+    guild_store.clear_prefix(guild.id)
+
     # Update status
     await client.change_presence(
         activity=discord.Activity(
@@ -203,12 +184,13 @@ async def on_message(message):
 
     # Defense against attacks
     if not isClean and any(word in text for word in ["clarence", "bot", "hunter", "huntie"]):
-        await message.reply(get_insult())
+        await message.reply(await get_insult())
 
     await client.process_commands(message)
 
 
 async def main():
+    guild_store.open()
     async with client:
         await client.load_extension('cogs.services')
         await client.load_extension('cogs.mod')
@@ -222,7 +204,11 @@ async def main():
         # await client.load_extension('cogs.music')
         await client.load_extension('cogs.owner')
         await client.load_extension('status')
-        await client.start(TOKEN)
+        try:
+            await client.start(TOKEN)
+        finally:
+            guild_store.close()
+            await http_client.close()
 
 
 asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,151 @@
+# storage/flight_cache.py
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from functionality.ttl_cache import TTLCache
+
+DB_FILE = "storage/flight_cache.db"
+MEMORY_ENTRIES = 256
+OPEN_WINDOW_TTL = 10 * 60       # the window hasn't ended: flights are still being added
+RECENT_WINDOW_TTL = 60 * 60     # ended, but OpenSky's nightly batch may still fill it in
+SETTLE_AFTER = 24 * 3600        # after this a window's flights never change again
+EMPTY_TTL = RECENT_WINDOW_TTL   # an empty answer (or a 404) may be a gap in OpenSky's data
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS flight_windows (
+    endpoint TEXT    NOT NULL,
+    subject  TEXT    NOT NULL,
+    begin    INTEGER NOT NULL,
+    end      INTEGER NOT NULL,
+    expires  REAL,              -- unix time; NULL once the window is settled
+    body     BLOB    NOT NULL,  -- zlib-compressed JSON
+    PRIMARY KEY (endpoint, subject, begin, end)
+) WITHOUT ROWID
+"""
+
+Key = Tuple[str, str, int, int]
+
+
+def _compress(flights: List[Dict[str, Any]]) -> bytes:
+    return zlib.compress(json.dumps(flights, separators=(",", ":")).encode("utf-8"))
+
+
+_EMPTY_BODY = _compress([])
+
+
+def window_ttl(end: int, now: Optional[float] = None) -> Optional[float]:
+    """Seconds a (begin, end) window's result stays valid; None means forever."""
+    now = time.time() if now is None else now
+    if end > now:
+        return OPEN_WINDOW_TTL
+    if end > now - SETTLE_AFTER:
+        return RECENT_WINDOW_TTL
+    return None
+
+
+class FlightCache:
+    """OpenSky flights/* responses in two tiers: an in-memory LRU over SQLite.
+
+    Keys are (endpoint, airport or icao24, begin, end). Settled windows are
+    kept for good; windows that are still open or only just closed expire
+    after a short TTL, and so does an empty result for any window. A disk
+    hit is promoted to the memory tier.
+    """
+
+    def __init__(self, path: str = DB_FILE, memory_entries: int = MEMORY_ENTRIES):
+        self.path = path
+        self.memory = TTLCache(maxsize=memory_entries, ttl=math.inf)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ---------- lifecycle ----------
+    def open(self):
+        if self._conn is not None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(_SCHEMA)
+        conn.commit()
+        self._conn = conn
+        self.purge()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.open()
+        return self._conn
+
+    def purge(self) -> int:
+        """Drop expired rows, and empty results older caches kept forever; returns how many went."""
+        db = self._db()
+        with self._lock:
+            cur = db.execute(
+                "DELETE FROM flight_windows WHERE (expires IS NOT NULL AND expires < ?) "
+                "OR (expires IS NULL AND body = ?)",
+                (time.time(), _EMPTY_BODY),
+            )
+            db.commit()
+        return cur.rowcount
+
+    # ---------- reads ----------
+    def get(self, endpoint: str, subject: str, begin: int, end: int) -> Optional[List[Dict[str, Any]]]:
+        key: Key = (endpoint, subject, int(begin), int(end))
+        flights = self.memory.get(key)
+        if flights is not None:
+            return flights
+
+        db = self._db()
+        with self._lock:
+            row = db.execute(
+                "SELECT expires, body FROM flight_windows WHERE endpoint = ? AND subject = ? AND begin = ? AND end = ?",
+                key,
+            ).fetchone()
+        now = time.time()
+        if row is None or (row[0] is not None and row[0] < now):
+            self.misses += 1
+            return None
+        flights = json.loads(zlib.decompress(row[1]))
+        self.memory.put(key, flights, math.inf if row[0] is None else row[0] - now)
+        self.disk_hits += 1
+        return flights
+
+    # ---------- writes ----------
+    def put(self, endpoint: str, subject: str, begin: int, end: int, flights: List[Dict[str, Any]]):
+        key: Key = (endpoint, subject, int(begin), int(end))
+        now = time.time()
+        ttl = window_ttl(key[3], now)
+        if not flights:
+            ttl = EMPTY_TTL if ttl is None else min(ttl, EMPTY_TTL)
+        body = _compress(flights)
+        db = self._db()
+        with self._lock:
+            db.execute(
+                "INSERT OR REPLACE INTO flight_windows (endpoint, subject, begin, end, expires, body) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                key + (None if ttl is None else now + ttl, body),
+            )
+            db.commit()
+        self.memory.put(key, flights, math.inf if ttl is None else ttl)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db().execute("SELECT COUNT(*) FROM flight_windows").fetchone()[0]
+        return {"memory_hits": self.memory.hits, "disk_hits": self.disk_hits,
+                "misses": self.misses, "rows": rows, "memory_entries": len(self.memory)}
+
+
+flight_cache = FlightCache()
@@ -0,0 +1,173 @@
+# storage/guild_store.py
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+DB_FILE = "storage/guilds.db"
+LEGACY_PREFIX_FILE = "storage/prefixes.json"
+LEGACY_CONFIG_FILE = "storage/guild_config.json"
+DEFAULT_PREFIX = "$"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_config (
+    guild_id       INTEGER PRIMARY KEY,
+    prefix         TEXT,
+    log_channel_id INTEGER,
+    extra          TEXT NOT NULL DEFAULT '{}'
+)
+"""
+
+
+@dataclass
+class GuildConfig:
+    """Typed view of one guild's settings row"""
+    prefix: str = DEFAULT_PREFIX
+    log_channel_id: Optional[int] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+class GuildStore:
+    """Per-guild configuration backed by SQLite (WAL) with an in-memory cache.
+
+    Every row is read once when the store opens; lookups are dict hits and a
+    change is a single upsert of one row.
+    """
+
+    def __init__(self, path: str = DB_FILE):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._cache: Dict[int, GuildConfig] = {}
+        self._lock = threading.Lock()
+
+    # ---------- lifecycle ----------
+    def open(self):
+        if self._conn is not None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(_SCHEMA)
+        conn.commit()
+        self._conn = conn
+        self._load()
+        if not self._cache:
+            self._import_legacy()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.open()
+        return self._conn
+
+    def _load(self):
+        self._cache = {}
+        for gid, prefix, log_id, extra in self._conn.execute(
+            "SELECT guild_id, prefix, log_channel_id, extra FROM guild_config"
+        ):
+            try:
+                extra = json.loads(extra or "{}")
+            except json.JSONDecodeError:
+                extra = {}
+            self._cache[gid] = GuildConfig(prefix or DEFAULT_PREFIX, log_id, extra)
+
+    def _import_legacy(self):
+        """One-time migration from prefixes.json / guild_config.json"""
+        merged: Dict[int, GuildConfig] = {}
+        for path in (LEGACY_PREFIX_FILE, LEGACY_CONFIG_FILE):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+            for gid, value in data.items():
+                try:
+                    cfg = merged.setdefault(int(gid), GuildConfig())
+                except ValueError:
+                    continue
+                if isinstance(value, str):
+                    cfg.prefix = value
+                elif isinstance(value, dict):
+                    cfg.prefix = value.get("prefix", cfg.prefix)
+                    if value.get("log_channel_id") is not None:
+                        cfg.log_channel_id = int(value["log_channel_id"])
+        if not merged:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO guild_config (guild_id, prefix, log_channel_id, extra) VALUES (?, ?, ?, ?)",
+                [(gid, c.prefix, c.log_channel_id, json.dumps(c.extra)) for gid, c in merged.items()],
+            )
+            self._conn.commit()
+        self._cache.update(merged)
+
+    # ---------- reads ----------
+    def get(self, guild_id: int) -> GuildConfig:
+        if self._conn is None:
+            self.open()
+        return self._cache.get(int(guild_id)) or GuildConfig()
+
+    def get_prefix(self, guild_id: int) -> str:
+        return self.get(guild_id).prefix
+
+    def get_log_channel_id(self, guild_id: int) -> Optional[int]:
+        return self.get(guild_id).log_channel_id
+
+    def get_setting(self, guild_id: int, key: str, default: Any = None) -> Any:
+        return self.get(guild_id).extra.get(key, default)
+
+    # ---------- writes ----------
+    def _save(self, guild_id: int, cfg: GuildConfig):
+        db = self._db()
+        with self._lock:
+            db.execute(
+                "INSERT INTO guild_config (guild_id, prefix, log_channel_id, extra) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(guild_id) DO UPDATE SET prefix=excluded.prefix, "
+                "log_channel_id=excluded.log_channel_id, extra=excluded.extra",
+                (guild_id, cfg.prefix, cfg.log_channel_id, json.dumps(cfg.extra)),
+            )
+            db.commit()
+        self._cache[guild_id] = cfg
+
+    def _editable(self, guild_id: int) -> GuildConfig:
+        cur = self.get(guild_id)
+        return GuildConfig(cur.prefix, cur.log_channel_id, dict(cur.extra))
+
+    def set_prefix(self, guild_id: int, prefix: str):
+        cfg = self._editable(guild_id)
+        cfg.prefix = prefix
+        self._save(int(guild_id), cfg)
+
+    def set_log_channel_id(self, guild_id: int, channel_id: Optional[int]):
+        cfg = self._editable(guild_id)
+        cfg.log_channel_id = int(channel_id) if channel_id is not None else None
+        self._save(int(guild_id), cfg)
+
+    def set_setting(self, guild_id: int, key: str, value: Any):
+        cfg = self._editable(guild_id)
+        if value is None:
+            cfg.extra.pop(key, None)
+        else:
+            cfg.extra[key] = value
+        self._save(int(guild_id), cfg)
+
+    def clear_prefix(self, guild_id: int):
+        """Back to the default prefix; the guild's other settings are kept."""
+        gid = int(guild_id)
+        db = self._db()
+        with self._lock:
+            db.execute("UPDATE guild_config SET prefix = NULL WHERE guild_id = ?", (gid,))
+            db.commit()
+        cur = self._cache.get(gid)
+        if cur is not None:
+            self._cache[gid] = GuildConfig(DEFAULT_PREFIX, cur.log_channel_id, dict(cur.extra))
+
+
+guild_store = GuildStore()
@@ -0,0 +1,225 @@
+# storage/poker_bank.py
+import json
+import os
+import queue
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+START_BANK = 1000
+BANK_FILE = "storage/poker.json"
+
+
+class BankTransaction:
+    """Balance changes for one hand.
+
+    Changes are visible through the bank immediately but are only written
+    (one queued journal append) when the transaction commits. Leaving the
+    ``with`` block because of an exception rolls everything back.
+    """
+
+    def __init__(self, bank: "Bank", gid: int):
+        self.bank = bank
+        self.gid = str(gid)
+        self.deltas: Dict[str, int] = {}
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def balance(self, uid: int) -> int:
+        return self.bank.balance(self.gid, uid)
+
+    def add(self, uid: int, delta: int) -> int:
+        """Apply ``delta`` (clamped so the balance never goes below 0)."""
+        if self.closed:
+            raise RuntimeError("Transaction already closed")
+        cur = self.balance(uid)
+        delta = max(delta, -cur)
+        self.deltas[str(uid)] = self.deltas.get(str(uid), 0) + delta
+        return cur + delta
+
+    def debit(self, uid: int, amount: int) -> int:
+        """Take up to ``amount`` from a player, returns what was actually taken."""
+        before = self.balance(uid)
+        return before - self.add(uid, -amount)
+
+    def credit(self, uid: int, amount: int) -> int:
+        return self.add(uid, amount)
+
+    def transfer(self, src: int, dst: int, amount: int) -> int:
+        moved = self.debit(src, amount)
+        self.credit(dst, moved)
+        return moved
+
+    def commit(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.bank._commit(self)
+
+    def rollback(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.bank._open.discard(self)
+
+
+class Bank:
+    """In-memory poker balances with journaled, atomic persistence.
+
+    ``poker.json`` holds the last snapshot; every committed change is also
+    appended to ``poker.json.journal`` and replayed on load, so a crash
+    between snapshots loses nothing. ``flush`` rewrites the snapshot via a
+    temp file + rename and truncates the journal.
+
+    All file I/O happens on one writer thread fed by a queue, so committing
+    a hand never waits on the disk. ``_lock`` only guards the in-memory
+    balances: a commit applies its deltas and queues its journal entry under
+    it, and ``flush`` copies the balances and queues the snapshot under it,
+    so the writer sees every entry in the order the balances changed.
+    """
+
+    def __init__(self, path: str = BANK_FILE, start: int = START_BANK):
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self.start = start
+        self._balances: Dict[str, Dict[str, int]] = {}
+        self._open: Set[BankTransaction] = set()
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._writes: "queue.Queue[Tuple]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+
+    # ---------- loading ----------
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self._balances = {str(g): {str(u): int(b) for u, b in users.items()} for g, users in data.items()}
+
+        # Replay journal entries written after the last snapshot
+        try:
+            with open(self.journal_path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn final write
+                    self._balances.setdefault(entry["g"], {}).update(entry["b"])
+                    self._dirty = True
+        except FileNotFoundError:
+            pass
+        self._loaded = True
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    # ---------- reads ----------
+    def balance(self, gid: int, uid: int) -> int:
+        self._ensure_loaded()
+        g, u = str(gid), str(uid)
+        bal = self._balances.get(g, {}).get(u, self.start)
+        for tx in self._open:
+            if tx.gid == g:
+                bal += tx.deltas.get(u, 0)
+        return bal
+
+    # ---------- writes ----------
+    def transaction(self, gid: int) -> BankTransaction:
+        self._ensure_loaded()
+        tx = BankTransaction(self, gid)
+        self._open.add(tx)
+        return tx
+
+    def add(self, gid: int, uid: int, delta: int) -> int:
+        """Single change outside a hand (admin grants etc.)"""
+        with self.transaction(gid) as tx:
+            return tx.add(uid, delta)
+
+    def _commit(self, tx: BankTransaction):
+        self._open.discard(tx)
+        changed = {u: d for u, d in tx.deltas.items() if d}
+        if not changed:
+            return
+        with self._lock:
+            g = self._balances.setdefault(tx.gid, {})
+            for u, d in changed.items():
+                g[u] = max(0, g.get(u, self.start) + d)
+            self._dirty = True
+            self._queue_write("journal", {"g": tx.gid, "b": {u: g[u] for u in changed}})
+
+    def flush(self):
+        """Write a snapshot atomically and truncate the journal; blocks until it's on disk."""
+        if not self._dirty:
+            return
+        done = threading.Event()
+        with self._lock:
+            snapshot = {g: dict(users) for g, users in self._balances.items()}
+            self._dirty = False
+            self._queue_write("snapshot", snapshot, done)
+        done.wait()
+
+    # ---------- writer thread ----------
+    def _queue_write(self, kind: str, data: Dict, done: Optional[threading.Event] = None):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name="poker-bank", daemon=True)
+            self._writer.start()
+        self._writes.put((kind, data, done))
+
+    def _write_loop(self):
+        while True:
+            jobs = [self._writes.get()]
+            # everything already queued goes out with a single fsync
+            while not self._writes.empty():
+                jobs.append(self._writes.get_nowait())
+            entries: List[Dict] = []
+            for kind, data, done in jobs:
+                try:
+                    if kind == "journal":
+                        entries.append(data)
+                        continue
+                    self._append_journal(entries)
+                    entries = []
+                    self._write_snapshot(data)
+                except Exception as e:
+                    print(f"Poker bank write failed: {e}")
+                finally:
+                    if done is not None:
+                        done.set()
+            try:
+                self._append_journal(entries)
+            except Exception as e:
+                print(f"Poker bank write failed: {e}")
+
+    def _append_journal(self, entries: List[Dict]):
+        if not entries:
+            return
+        os.makedirs(os.path.dirname(self.journal_path) or ".", exist_ok=True)
+        with open(self.journal_path, "a") as f:
+            f.writelines(json.dumps(e, separators=(",", ":")) + "\n" for e in entries)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_snapshot(self, snapshot: Dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        # Every journal entry queued before this snapshot is in it, and
+        # entries are absolute balances, so replaying a stale journal over
+        # the new snapshot would still be correct.
+        open(self.journal_path, "w").close()
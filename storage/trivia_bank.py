@@ -0,0 +1,233 @@
+# storage/trivia_bank.py
+import bisect
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from functionality.structures import Trivia
+from functionality.trivia_pool import unescape_result
+
+DB_FILE = "storage/trivia.db"
+# runs a filter may gain after the last renumbering before the next one; keeps a pick's bisect bounded
+COMPACT_RUNS = 256
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id         INTEGER PRIMARY KEY,
+    category   TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    question   TEXT NOT NULL UNIQUE,
+    correct    TEXT NOT NULL,
+    incorrect  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questions_category ON questions (category, difficulty);
+CREATE INDEX IF NOT EXISTS idx_questions_difficulty ON questions (difficulty);
+"""
+
+Key = Tuple[Optional[str], Optional[str]]
+
+
+class _Runs:
+    """Contiguous id runs for one (category, difficulty) filter.
+
+    After an import the table is renumbered so every filter is one run and
+    picking is a single randint; rows added later extend the last run when
+    their ids touch it, else append extra runs, which are chosen between with
+    a bisect over the cumulative counts. Once any filter has gained
+    ``COMPACT_RUNS`` runs since the last renumbering the bank renumbers
+    again, so that bisect stays over a bounded list.
+    """
+    __slots__ = ("starts", "ends", "cum")
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.cum: List[int] = []
+
+    def add(self, lo: int, hi: int):
+        if self.ends and self.ends[-1] + 1 == lo:
+            # touches the previous run, extend it
+            self.ends[-1] = hi
+            self.cum[-1] += hi - lo + 1
+            return
+        self.starts.append(lo)
+        self.ends.append(hi)
+        self.cum.append((self.cum[-1] if self.cum else 0) + hi - lo + 1)
+
+    @property
+    def count(self) -> int:
+        return self.cum[-1] if self.cum else 0
+
+    def pick(self, rng: random.Random) -> int:
+        k = rng.randrange(self.count)
+        i = 0 if len(self.cum) == 1 else bisect.bisect_right(self.cum, k)
+        return self.starts[i] + k - (self.cum[i - 1] if i else 0)
+
+
+class TriviaBank:
+    """Offline question bank in SQLite, importable from opentdb JSON dumps.
+
+    Random questions are picked from precomputed id ranges and fetched by
+    primary key, never with ``ORDER BY RANDOM()``.
+    """
+
+    def __init__(self, path: str = DB_FILE):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._runs: Dict[Key, _Runs] = {}
+        self._compacted_runs: Dict[Key, int] = {}   # runs per filter right after the last renumbering
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+
+    # ---------- lifecycle ----------
+    def open(self):
+        if self._conn is not None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        conn.commit()
+        self._conn = conn
+        self._build_ranges()
+        self._compact_if_fragmented()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.open()
+        return self._conn
+
+    def _build_ranges(self):
+        """Group ids into runs per filter: (cat, diff), (cat, None), (None, diff), (None, None)."""
+        runs: Dict[Key, _Runs] = {}
+        # gaps-and-islands: id - row_number() is constant along a contiguous run
+        rows = self._conn.execute("""
+            SELECT category, difficulty, MIN(id), MAX(id) FROM (
+                SELECT id, category, difficulty,
+                       id - ROW_NUMBER() OVER (PARTITION BY category, difficulty ORDER BY id) AS grp
+                FROM questions
+            ) GROUP BY category, difficulty, grp ORDER BY MIN(id)
+        """).fetchall()
+        for cat, diff, lo, hi in rows:
+            self._add_run(runs, cat, diff, lo, hi)
+        self._runs = runs
+
+    @staticmethod
+    def _add_run(runs: Dict[Key, _Runs], cat: str, diff: str, lo: int, hi: int):
+        for key in ((cat, diff), (cat, None), (None, diff), (None, None)):
+            runs.setdefault(key, _Runs()).add(lo, hi)
+
+    # ---------- reads ----------
+    def count(self, category: Optional[str] = None, difficulty: Optional[str] = None) -> int:
+        self._db()
+        r = self._runs.get((category, difficulty))
+        return r.count if r else 0
+
+    def categories(self) -> List[str]:
+        self._db()
+        return sorted(cat for cat, diff in self._runs if cat is not None and diff is None)
+
+    def random(self, category: Optional[str] = None, difficulty: Optional[str] = None) -> Optional[Trivia]:
+        """Random question matching the filters, or None if there is none"""
+        conn = self._db()
+        r = self._runs.get((category, difficulty))
+        if not r or not r.count:
+            return None
+        row = conn.execute(
+            "SELECT question, category, correct, incorrect FROM questions WHERE id = ?", (r.pick(self._rng),)
+        ).fetchone()
+        if row is None:
+            # compact() is renumbering on another thread
+            return None
+        question, cat, correct, incorrect = row
+        return Trivia(question, cat, correct, json.loads(incorrect))
+
+    # ---------- writes ----------
+    def add_many(self, results: Iterable[Dict]) -> int:
+        """Insert opentdb ``results`` entries (already unescaped), skipping known questions"""
+        conn = self._db()
+        rows = [
+            (r["category"], r.get("difficulty", "medium"), r["question"], r["correct_answer"],
+             json.dumps(list(r["incorrect_answers"])))
+            for r in results
+            if r.get("type", "multiple") == "multiple" and len(r.get("incorrect_answers", ())) == 3
+        ]
+        # grouped so each filter's new rows get consecutive ids: one run per filter per batch
+        rows.sort(key=lambda row: (row[0], row[1]))
+        with self._lock:
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM questions").fetchone()[0]
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO questions (category, difficulty, question, correct, incorrect) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+            added = conn.total_changes - before
+            # new rows get ids past the old maximum, so only they need ranges
+            new = conn.execute(
+                "SELECT id, category, difficulty FROM questions WHERE id > ? ORDER BY id", (last_id,)
+            ).fetchall() if added else []
+            for qid, cat, diff in new:
+                self._add_run(self._runs, cat, diff, qid, qid)
+        self._compact_if_fragmented()
+        return added
+
+    def _compact_if_fragmented(self):
+        # aggregate filters like (None, "easy") span several categories, so
+        # even a freshly renumbered table has a few runs for them
+        if any(len(r.starts) > self._compacted_runs.get(key, 1) + COMPACT_RUNS
+               for key, r in self._runs.items()):
+            self.compact()
+
+    def compact(self):
+        """Renumber ids so every (category, difficulty) is one contiguous range"""
+        conn = self._db()
+        with self._lock:
+            conn.executescript("""
+                BEGIN;
+                CREATE TEMP TABLE q_sorted AS
+                    SELECT category, difficulty, question, correct, incorrect FROM questions
+                    ORDER BY category, difficulty, id;
+                DELETE FROM questions;
+                INSERT INTO questions (id, category, difficulty, question, correct, incorrect)
+                    SELECT rowid, category, difficulty, question, correct, incorrect FROM q_sorted;
+                DROP TABLE q_sorted;
+                COMMIT;
+            """)
+        self._build_ranges()
+        self._compacted_runs = {key: len(r.starts) for key, r in self._runs.items()}
+
+    def import_json(self, path: str) -> int:
+        """Import an opentdb dump: an API response, a list of them, or a bare results list"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [data]
+        results = []
+        for item in data:
+            results.extend(item.get("results", []) if isinstance(item, dict) and "results" in item else [item])
+        unescaped = [unescape_result(r) for r in results]
+        added = self.add_many(unescaped)
+        self.compact()
+        return added
+
+
+trivia_bank = TriviaBank()
+
+
+if __name__ == "__main__":
+    # python -m storage.trivia_bank dump1.json [dump2.json ...]
+    for dump in sys.argv[1:]:
+        print(f"{dump}: {trivia_bank.import_json(dump)} new questions")
+    print(f"{trivia_bank.count()} questions in {trivia_bank.path}")
+    trivia_bank.close()
@@ -0,0 +1,248 @@
+# storage/trivia_stats.py
+import json
+import os
+import random
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+DB_FILE = "storage/trivia_stats.db"
+LEGACY_FILE = "storage/trivia.json"
+MIN_ATTEMPTS = 10  # to appear on the accuracy board
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trivia_stats (
+    guild_id INTEGER NOT NULL,
+    user_id  INTEGER NOT NULL,
+    correct  INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id)
+)
+"""
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Optional[tuple], levels: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * levels
+        self.width: List[int] = [1] * levels   # level-0 steps to next[level]
+
+
+class _Board:
+    """Ranked (key, user_id) entries in an indexable skip list.
+
+    Every link records how many entries it jumps over, so an update (one
+    removal, one insertion) and a rank lookup are both expected O(log n),
+    and the top ``n`` is a walk along the bottom level.
+    """
+
+    LEVELS = 24   # plenty for 2**24 players per guild
+
+    def __init__(self):
+        self._head = _Node(None, self.LEVELS)
+        self._keys: Dict[int, tuple] = {}
+
+    def _path(self, item: tuple) -> Tuple[List[_Node], List[int]]:
+        """Last node before ``item`` on each level, and the entries each level's walk passed"""
+        chain: List[_Node] = [self._head] * self.LEVELS
+        steps = [0] * self.LEVELS
+        node = self._head
+        for level in reversed(range(self.LEVELS)):
+            nxt = node.next[level]
+            while nxt is not None and nxt.key < item:
+                steps[level] += node.width[level]
+                node, nxt = nxt, nxt.next[level]
+            chain[level] = node
+        return chain, steps
+
+    def _insert(self, item: tuple):
+        levels = 1
+        while levels < self.LEVELS and random.random() < 0.5:
+            levels += 1
+        chain, steps = self._path(item)
+        new = _Node(item, levels)
+        passed = 0   # entries between chain[level] and the new node
+        for level in range(levels):
+            prev = chain[level]
+            new.next[level], prev.next[level] = prev.next[level], new
+            new.width[level] = prev.width[level] - passed
+            prev.width[level] = passed + 1
+            passed += steps[level]
+        for level in range(levels, self.LEVELS):
+            chain[level].width[level] += 1
+
+    def _remove(self, item: tuple):
+        chain, _ = self._path(item)
+        target = chain[0].next[0]
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), self.LEVELS):
+            chain[level].width[level] -= 1
+
+    def update(self, uid: int, key: Optional[tuple]):
+        old = self._keys.pop(uid, None)
+        if old is not None:
+            self._remove(old + (uid,))
+        if key is not None:
+            self._keys[uid] = key
+            self._insert(key + (uid,))
+
+    def top(self, n: int) -> List[int]:
+        out: List[int] = []
+        node = self._head.next[0]
+        while node is not None and len(out) < n:
+            out.append(node.key[-1])
+            node = node.next[0]
+        return out
+
+    def rank(self, uid: int) -> Optional[int]:
+        key = self._keys.get(uid)
+        if key is None:
+            return None
+        _, steps = self._path(key + (uid,))
+        return sum(steps) + 1
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class TriviaStats:
+    """Per-guild trivia counters kept in memory, written to SQLite in batches.
+
+    Answers only touch the in-memory counters and mark the row dirty;
+    ``flush`` upserts every dirty row in one transaction. Each guild keeps
+    two ranked boards (by correct answers, and by accuracy for players with
+    at least ``MIN_ATTEMPTS``), skip lists updated in O(log n) per answer.
+    """
+
+    def __init__(self, path: str = DB_FILE, min_attempts: int = MIN_ATTEMPTS):
+        self.path = path
+        self.min_attempts = min_attempts
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats: Dict[int, Dict[int, List[int]]] = {}  # guild -> user -> [correct, attempts]
+        self._by_correct: Dict[int, _Board] = {}
+        self._by_accuracy: Dict[int, _Board] = {}
+        self._dirty: Set[Tuple[int, int]] = set()
+        self._lock = threading.Lock()
+
+    # ---------- lifecycle ----------
+    def open(self):
+        if self._conn is not None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(_SCHEMA)
+        conn.commit()
+        self._conn = conn
+        rows = conn.execute("SELECT guild_id, user_id, correct, attempts FROM trivia_stats").fetchall()
+        if not rows:
+            rows = self._legacy_rows()
+            self._dirty.update((gid, uid) for gid, uid, _, _ in rows)
+        for gid, uid, correct, attempts in rows:
+            self._stats.setdefault(gid, {})[uid] = [correct, attempts]
+            self._reindex(gid, uid)
+        self.flush()
+
+    def close(self):
+        if self._conn is not None:
+            self.flush()
+            self._conn.close()
+            self._conn = None
+
+    def _legacy_rows(self) -> List[Tuple[int, int, int, int]]:
+        """One-time import of the old trivia.json counters"""
+        try:
+            with open(LEGACY_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+        rows = []
+        for gid, users in data.items():
+            for uid, s in users.items():
+                try:
+                    rows.append((int(gid), int(uid), int(s.get("correct", 0)), int(s.get("attempts", 0))))
+                except (ValueError, AttributeError):
+                    continue
+        return rows
+
+    def _reindex(self, gid: int, uid: int):
+        correct, attempts = self._stats[gid][uid]
+        self._by_correct.setdefault(gid, _Board()).update(uid, (-correct, attempts))
+        acc_key = (-correct / attempts, -attempts) if attempts >= self.min_attempts else None
+        self._by_accuracy.setdefault(gid, _Board()).update(uid, acc_key)
+
+    # ---------- reads ----------
+    def get(self, guild_id: int, user_id: int) -> Dict[str, int]:
+        if self._conn is None:
+            self.open()
+        correct, attempts = self._stats.get(int(guild_id), {}).get(int(user_id), (0, 0))
+        return {"correct": correct, "attempts": attempts}
+
+    def top(self, guild_id: int, n: int = 10, by: str = "correct") -> List[Tuple[int, int, int]]:
+        """[(user_id, correct, attempts), ...] best first; ``by`` is "correct" or "accuracy"."""
+        if self._conn is None:
+            self.open()
+        gid = int(guild_id)
+        boards = self._by_accuracy if by == "accuracy" else self._by_correct
+        board = boards.get(gid)
+        if board is None:
+            return []
+        users = self._stats[gid]
+        return [(uid, *users[uid]) for uid in board.top(n)]
+
+    def rank(self, guild_id: int, user_id: int, by: str = "correct") -> Optional[int]:
+        boards = self._by_accuracy if by == "accuracy" else self._by_correct
+        board = boards.get(int(guild_id))
+        return board.rank(int(user_id)) if board else None
+
+    # ---------- writes ----------
+    def record(self, guild_id: int, user_id: int, correct: bool) -> Dict[str, int]:
+        if self._conn is None:
+            self.open()
+        gid, uid = int(guild_id), int(user_id)
+        s = self._stats.setdefault(gid, {}).setdefault(uid, [0, 0])
+        s[1] += 1
+        if correct:
+            s[0] += 1
+        self._reindex(gid, uid)
+        self._dirty.add((gid, uid))
+        return {"correct": s[0], "attempts": s[1]}
+
+    def record_many(self, guild_id: int, results: Iterable[Tuple[int, bool]]) -> None:
+        """Apply a whole round of (user_id, correct) answers at once"""
+        if self._conn is None:
+            self.open()
+        gid = int(guild_id)
+        users = self._stats.setdefault(gid, {})
+        for uid, correct in results:
+            uid = int(uid)
+            s = users.setdefault(uid, [0, 0])
+            s[1] += 1
+            if correct:
+                s[0] += 1
+            self._reindex(gid, uid)
+            self._dirty.add((gid, uid))
+        self.flush()
+
+    def flush(self):
+        """Write every changed counter in one transaction"""
+        if self._conn is None or not self._dirty:
+            return
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            rows = [(gid, uid, *self._stats[gid][uid]) for gid, uid in dirty]
+            self._conn.executemany(
+                "INSERT INTO trivia_stats (guild_id, user_id, correct, attempts) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(guild_id, user_id) DO UPDATE SET correct = excluded.correct, attempts = excluded.attempts",
+                rows,
+            )
+            self._conn.commit()
+
+
+trivia_stats = TriviaStats()